@@ -5,39 +5,15 @@ import sys
 ninjackalytics_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(ninjackalytics_path)
 
-from ninjackalytics.services.battle_parsing import BattleParser, Battle, BattlePokemon
-from ninjackalytics.services.database_interactors.battle_data_uploader import (
-    BattleDataUploader,
-)
 from ninjackalytics.services.database_interactors.table_accessor import TableAccessor
+from ninjackalytics.services.auto_replay_pulls.crawl_cursors import CrawlCursorStore
+from ninjackalytics.services.auto_replay_pulls.ingest_pipeline import IngestPipeline
 from ninjackalytics.services.auto_replay_pulls.script import (
     get_battle_urls_selenium,
     get_replay_urls,
 )
 import traceback
 from tqdm import tqdm
-import re
-
-
-def find_function_with_error_from_traceback(tb: str) -> str:
-    # Regex pattern to match the function name
-    pattern = r"\b(?P<function>\w+)\("
-
-    # Find all matches in the traceback
-    matches = re.findall(pattern, tb)
-
-    # Regex pattern to match the function name
-    pattern = r"\b(?P<function>\w+)\("
-
-    # Find all matches in the traceback
-    matches = re.findall(pattern, tb)
-
-    # The function name is the last match that does not contain "Error"
-    for match in reversed(matches):
-        if "Error" not in match:
-            return match
-
-    return None
 
 
 # ======= first get all the replay urls =======
@@ -55,61 +31,39 @@ try:
     ]
     print("prepare to pull URLS...")
 
+    # incremental crawl: each format is only listed back to the newest replay seen last run. run with
+    # --backfill to walk further back into each format's history instead
+    backfill = "--backfill" in sys.argv
+    cursor_store = CrawlCursorStore()
+
     all_urls = []
     for battle_format in tqdm(battle_formats):
         pages = 5
-        urls = get_replay_urls(battle_format, pages)
+        urls = get_replay_urls(
+            battle_format, pages, cursor_store=cursor_store, backfill=backfill
+        )
         all_urls.extend(urls)
     print(f"Found {len(all_urls)} urls")
     print("Prepare to begin uploading...")
 
     # ========= now check the database and find only the ones that are not in the database ========
+    # only the candidate urls are looked up, not the whole battle_info/errors history
     ta = TableAccessor()
-    battles = ta.get_battle_info()
-    battles = battles["Battle_ID"].tolist()
-    battles = [f"https://replay.pokemonshowdown.com/{battle}" for battle in battles]
-    errors = ta.get_errors()
-    errors = errors["Battle_URL"].tolist()
-
-    # only now run the new urls
-    all_urls = [url for url in all_urls if url not in battles and url not in errors]
+    all_urls = ta.get_unseen_battle_urls(all_urls)
     print(f"Found {len(all_urls)} new urls")
     if len(all_urls) != 0:
-        total_errors = 0
-        errors_update_threshold = 10
-        battle_parsers = []
-        uploader = BattleDataUploader()
-        for url in tqdm((all_urls), desc="Parsing Battles"):
-            try:
-                success = False
-                tries = 0
-                while not success and tries < 5:
-                    try:
-                        tries += 1
-                        battle = Battle(url)
-                        success = True
-                    except:
-                        tries += 1
-                        continue
-                battle_pokemon = BattlePokemon(battle)
-                parser = BattleParser(battle, battle_pokemon)
-                parser.analyze_battle()
-                uploader.upload_battle(parser)
-            except Exception as e:
-                total_errors += 1
-                tb = traceback.format_exc()
-                function = find_function_with_error_from_traceback(tb)
-                uploader.upload_error(
-                    battle_url=url,
-                    error_message=str(e),
-                    traceback=tb,
-                    function=function,
-                )
-                if total_errors > errors_update_threshold:
-                    print(f"Total Errors: {total_errors}")
-                    errors_update_threshold += 10
-                continue
-
+        # fetching, parsing (one process per core) and uploading run concurrently
+        pipeline = IngestPipeline()
+        stats = pipeline.run(tqdm(all_urls, desc="Ingesting Battles"))
+
+        total_errors = sum(stats[stage]["errors"] for stage in ["fetch", "parse", "write"])
+        for stage in ["fetch", "parse", "write"]:
+            print(
+                f"{stage}: {stats[stage]['processed']} processed, "
+                f"{stats[stage]['errors']} errors, "
+                f"{round(stats[stage]['per_second'], 2)}/s"
+            )
+        print(f"Uploaded {stats['uploaded']} battles")
         print(f"Total Errors: {total_errors}")
         print(f"Total Error Percentage: {round(total_errors/len(all_urls)*100, 2)}")
 
@@ -0,0 +1,87 @@
+import os
+import sys
+
+# Append Ninjackalytics/ninjackalytics folder to sys path
+ninjackalytics_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ninjackalytics_path)
+
+import argparse
+
+from ninjackalytics.services.battle_parsing import parser_benchmark
+
+
+"""
+Benchmarks the battle parsing stages (BattlePokemon, BattleData, PivotData, ActionData and
+HpEventsHandler) on the prepared test battles plus, optionally, replays from the local replay store.
+
+Save a baseline before a change and check against it after:
+
+    python database_scripts/benchmark_parser.py --repeat 50 --save-baseline parser_baseline.json
+    python database_scripts/benchmark_parser.py --repeat 50 --check parser_baseline.json
+
+--check exits with status 1 when a stage got slower (or allocates more) than the tolerance allows.
+"""
+
+
+def benchmark_parser(
+    repeat: int = 20,
+    store_limit: int = 0,
+    measure_memory: bool = True,
+    save_baseline: str = None,
+    check: str = None,
+    tolerance: float = parser_benchmark.DEFAULT_TOLERANCE,
+) -> int:
+    corpus = parser_benchmark.get_seed_corpus()
+    if store_limit:
+        from ninjackalytics.services.replay_store import ReplayStore
+
+        corpus += parser_benchmark.get_store_corpus(ReplayStore(), store_limit)
+
+    report = parser_benchmark.run_benchmark(
+        corpus, repeat=repeat, measure_memory=measure_memory
+    )
+    print(parser_benchmark.format_report(report))
+
+    if save_baseline:
+        parser_benchmark.save_baseline(report, save_baseline)
+        print(f"Baseline saved to {save_baseline}")
+
+    if check:
+        regressions = parser_benchmark.find_regressions(
+            report, parser_benchmark.load_baseline(check), tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {check}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the battle parser stages")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--store-limit",
+        type=int,
+        default=0,
+        help="also parse up to this many replays from the replay store",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    parser.add_argument("--save-baseline", default=None)
+    parser.add_argument("--check", default=None, help="baseline json to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=parser_benchmark.DEFAULT_TOLERANCE
+    )
+    args = parser.parse_args()
+
+    sys.exit(
+        benchmark_parser(
+            repeat=args.repeat,
+            store_limit=args.store_limit,
+            measure_memory=not args.no_memory,
+            save_baseline=args.save_baseline,
+            check=args.check,
+            tolerance=args.tolerance,
+        )
+    )
@@ -0,0 +1,116 @@
+import os
+import sys
+
+# Append Ninjackalytics/ninjackalytics folder to sys path
+ninjackalytics_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ninjackalytics_path)
+
+from ninjackalytics.database.database import get_engine
+from ninjackalytics.database.models import teams, battle_info
+from sqlalchemy import inspect, select, update, delete, bindparam, text
+from tqdm import tqdm
+
+
+"""
+One-off migration that makes the teams table content-addressed:
+
+1. adds the teams.Fingerprint column if the table predates it
+2. fingerprints every stored team (hash of the sorted mons)
+3. points battle_info.P1_team / P2_team at the lowest id of each identical composition
+4. deletes the now unreferenced duplicate teams
+5. creates the unique index on teams.Fingerprint
+
+Each step is safe to re-run.
+"""
+
+
+def add_fingerprint_column(engine) -> None:
+    columns = [c["name"] for c in inspect(engine).get_columns(teams.__tablename__)]
+    if "Fingerprint" in columns:
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"ALTER TABLE {teams.__tablename__} ADD COLUMN Fingerprint VARCHAR(64)")
+        )
+
+
+def get_duplicate_team_map(conn) -> tuple:
+    """
+    Returns the fingerprint for every kept team and the mapping of each duplicate team id to the id
+    of the team it will be merged into (the lowest id sharing its composition).
+    """
+    pok_columns = [getattr(teams, f"Pok{i}") for i in range(1, 7)]
+    rows = conn.execute(select(teams.id, *pok_columns).order_by(teams.id))
+
+    kept = {}  # fingerprint -> kept team id
+    duplicates = {}  # duplicate id -> kept id
+    for row in tqdm(rows, desc="Fingerprinting teams"):
+        mons = [mon for mon in row[1:] if mon is not None]
+        fingerprint = teams.make_fingerprint(mons)
+        if fingerprint in kept:
+            duplicates[row.id] = kept[fingerprint]
+        else:
+            kept[fingerprint] = row.id
+    return kept, duplicates
+
+
+def dedupe_teams(batch_size: int = 1000) -> dict:
+    engine = get_engine()
+    add_fingerprint_column(engine)
+
+    with engine.begin() as conn:
+        kept, duplicates = get_duplicate_team_map(conn)
+        merge_rows = [
+            {"old_id": old_id, "new_id": new_id}
+            for old_id, new_id in duplicates.items()
+        ]
+
+        for start in tqdm(
+            range(0, len(merge_rows), batch_size), desc="Rewriting battle_info"
+        ):
+            batch = merge_rows[start : start + batch_size]
+            for column in ["P1_team", "P2_team"]:
+                conn.execute(
+                    update(battle_info)
+                    .where(getattr(battle_info, column) == bindparam("old_id"))
+                    .values({column: bindparam("new_id")})
+                    .execution_options(synchronize_session=False),
+                    batch,
+                )
+
+        duplicate_ids = list(duplicates)
+        for start in tqdm(
+            range(0, len(duplicate_ids), batch_size), desc="Deleting duplicates"
+        ):
+            conn.execute(
+                delete(teams).where(
+                    teams.id.in_(duplicate_ids[start : start + batch_size])
+                )
+            )
+
+        fingerprint_rows = [
+            {"team_id": team_id, "fingerprint": fingerprint}
+            for fingerprint, team_id in kept.items()
+        ]
+        for start in tqdm(
+            range(0, len(fingerprint_rows), batch_size), desc="Storing fingerprints"
+        ):
+            conn.execute(
+                update(teams)
+                .where(teams.id == bindparam("team_id"))
+                .values(Fingerprint=bindparam("fingerprint"))
+                .execution_options(synchronize_session=False),
+                fingerprint_rows[start : start + batch_size],
+            )
+
+    for index in teams.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    return {"teams_kept": len(kept), "teams_removed": len(duplicates)}
+
+
+if __name__ == "__main__":
+    results = dedupe_teams()
+    print(
+        f"Kept {results['teams_kept']} teams, removed {results['teams_removed']} duplicates"
+    )
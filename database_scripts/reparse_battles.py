@@ -0,0 +1,71 @@
+import os
+import sys
+
+# Append Ninjackalytics/ninjackalytics folder to sys path
+ninjackalytics_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ninjackalytics_path)
+
+import argparse
+from tqdm import tqdm
+
+from ninjackalytics.services.database_interactors.battle_reparser import (
+    BattleReparser,
+)
+
+
+"""
+Re-derives actions, damages, healing and pivots for every uploaded battle whose raw replay is in the
+local replay store and rewrites only the battles whose rows changed. Run it after fixing a parsing
+bug. Progress is checkpointed so an interrupted run picks up where it stopped; pass --restart to
+start over.
+"""
+
+
+def reparse_battles(
+    workers: int = None,
+    batch_size: int = 100,
+    progress_path: str = "reparse_progress.json",
+    restart: bool = False,
+) -> dict:
+    reparser = BattleReparser(
+        workers=workers, batch_size=batch_size, progress_path=progress_path
+    )
+    if restart:
+        reparser.progress.reset()
+
+    battle_ids = reparser.get_battle_ids()
+    with tqdm(total=len(battle_ids), desc="Reparsing battles") as progress_bar:
+        report = reparser.reparse(battle_ids, progress_callback=progress_bar.update)
+
+    print(
+        f"Processed {report['processed']} battles in {round(report['elapsed'], 1)}s "
+        f"({round(report['per_second'], 1)} battles/s)"
+    )
+    print(
+        f"Changed: {report['changed']}, unchanged: {report['unchanged']}, "
+        f"failed: {report['failed']}"
+    )
+    print(
+        f"Rows deleted: {report['rows_deleted']}, rows inserted: {report['rows_inserted']}"
+    )
+    for table_name, count in report["tables_changed"].items():
+        print(f"  {table_name}: {count} battles changed")
+    for battle_id, message in list(reparser.failures.items())[:20]:
+        print(f"  failed {battle_id}: {message}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reparse stored battles")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--progress-file", default="reparse_progress.json")
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
+    reparse_battles(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        progress_path=args.progress_file,
+        restart=args.restart,
+    )
@@ -1,61 +1,53 @@
-from ninjackalytics.services.database_interactors.database_error_retriever import (
-    ErrorDataRetriever,
-)
-from ninjackalytics.services.battle_parsing import BattleParser, Battle, BattlePokemon
-from ninjackalytics.services.database_interactors.battle_data_uploader import (
-    BattleDataUploader,
-)
-from ninjackalytics.database import get_sessionlocal
-from ninjackalytics.database.models.battles import errors
+import os
+import sys
+
+# Append Ninjackalytics/ninjackalytics folder to sys path
+ninjackalytics_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ninjackalytics_path)
+
+import argparse
 from tqdm import tqdm
-import traceback
-import re
-
-
-def retry_errors():
-    error_retriever = ErrorDataRetriever()
-    db_errors = error_retriever.get_errors()
-    uploader = BattleDataUploader()
-    errors_removed = 0
-    errors_changed = 0
-    for url in tqdm(db_errors["Battle_URL"].unique()):
-        try:
-            battle = Battle(url)
-            battle_pokemon = BattlePokemon(battle)
-            battle_parser = BattleParser(battle, battle_pokemon)
-            battle_parser.analyze_battle()
-            uploader.upload_battle(battle_parser)
-            # Delete row from error database if upload was successful
-            session = get_sessionlocal()
-            error = session.query(errors).filter_by(Battle_URL=url).first()
-            session.delete(error)
-            session.commit()
-            session.close()
-            errors_removed += 1
-        except Exception as e:
-            # handle case where there is a new error for this battle. sometimes we may fix the original error
-            # but now have a new error to fix
-            # first, check if e is the same as the error in the database
-            session = get_sessionlocal()
-            error = session.query(errors).filter_by(Battle_URL=url).first()
-
-            if not error.Error_Message == str(e):
-                # if the error is different, delete the error and re-run everything to update it
-                session.delete(error)
-                session.commit()
-                session.close()
-                # now re-run everything
-                try:
-                    battle = Battle(url)
-                    battle_pokemon = BattlePokemon(battle)
-                    battle_parser = BattleParser(battle, battle_pokemon)
-                    battle_parser.analyze_battle()
-                    # will fail here, but updates db with new error
-                    uploader.upload_battle(battle_parser)
-                    errors_changed += 1
-                except:
-                    # continue
-                    pass
-
-    print(f"Errors removed: {errors_removed}")
-    print(f"Errors changed: {errors_changed}")
+
+from ninjackalytics.services.database_interactors.error_retrier import ErrorRetrier
+
+
+def print_signatures(retrier: ErrorRetrier, limit: int = 25) -> None:
+    for function, message, count in retrier.get_signatures()[:limit]:
+        print(f"{count:>6}  {function}  {message}")
+
+
+def retry_errors(
+    function: str = None, message: str = None, workers: int = None
+) -> dict:
+    """
+    Retries the errored battles, optionally only those with the given Function / Error_Message, and
+    prints the outcome of every signature.
+    """
+    retrier = ErrorRetrier(workers=workers)
+    total = len(retrier.get_errors(function, message))
+    with tqdm(total=total, desc="Retrying errors") as progress_bar:
+        report = retrier.retry(function, message, progress_callback=progress_bar.update)
+
+    for (error_function, error_message), outcomes in report["signatures"].items():
+        print(f"{error_function}  {error_message}: {outcomes}")
+    print(f"Errors removed: {report['deleted']}")
+    print(f"Errors changed: {report['changed']}")
+    print(f"Errors unchanged: {report['unchanged']}")
+    print(f"{round(report['per_second'], 1)} errors/s")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retry the battles in the errors table")
+    parser.add_argument("--function", default=None, help="only retry errors from this Function")
+    parser.add_argument("--message", default=None, help="only retry errors with this message")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--list", action="store_true", help="list the most common error signatures and exit"
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        print_signatures(ErrorRetrier(workers=args.workers))
+    else:
+        retry_errors(args.function, args.message, args.workers)
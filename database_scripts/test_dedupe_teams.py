@@ -0,0 +1,64 @@
+import os
+
+os.environ["FLASK_ENV"] = "testing"
+
+import unittest
+from datetime import datetime
+from ninjackalytics.database import Base, get_engine, get_sessionlocal
+from ninjackalytics.database.models import teams, battle_info
+from .dedupe_teams import dedupe_teams
+
+
+class TestDedupeTeams(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(bind=get_engine())
+        Base.metadata.create_all(bind=get_engine())
+        self.session = get_sessionlocal()
+        team_a = {f"Pok{i}": mon for i, mon in enumerate(["A", "B", "C"], start=1)}
+        team_b = {f"Pok{i}": mon for i, mon in enumerate(["D", "E", "F"], start=1)}
+        # rows written before fingerprints existed: the same composition stored 3 times
+        self.session.add_all(
+            [teams(**team_a), teams(**team_b), teams(**team_a), teams(**team_a)]
+        )
+        self.session.commit()
+        for i, (p1_team, p2_team) in enumerate([(1, 2), (3, 2), (2, 4)]):
+            self.session.add(
+                battle_info(
+                    Battle_ID=f"gen9ou-{i}",
+                    Date_Submitted=datetime.utcnow(),
+                    Format="gen9ou",
+                    P1="p1",
+                    P1_team=p1_team,
+                    P2="p2",
+                    P2_team=p2_team,
+                    Winner="p1",
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(bind=get_engine())
+
+    def test_dedupe_teams(self):
+        results = dedupe_teams()
+        self.assertEqual(results, {"teams_kept": 2, "teams_removed": 2})
+
+        self.assertEqual(
+            sorted(team.id for team in self.session.query(teams).all()), [1, 2]
+        )
+        battles = self.session.query(battle_info).order_by(battle_info.id).all()
+        self.assertEqual(
+            [(b.P1_team, b.P2_team) for b in battles], [(1, 2), (1, 2), (2, 1)]
+        )
+        team1 = self.session.query(teams).filter(teams.id == 1).first()
+        self.assertEqual(team1.Fingerprint, teams.make_fingerprint(["A", "B", "C"]))
+
+    def test_dedupe_teams_is_rerunnable(self):
+        dedupe_teams()
+        results = dedupe_teams()
+        self.assertEqual(results, {"teams_kept": 2, "teams_removed": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
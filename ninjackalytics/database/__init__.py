@@ -1 +1,7 @@
-from .database import Base, get_engine, get_sessionlocal
+from .database import (
+    Base,
+    get_engine,
+    get_sessionlocal,
+    get_pool_stats,
+    dispose_engine,
+)
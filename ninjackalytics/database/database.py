@@ -1,14 +1,18 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from .config import (
     DevelopmentConfig,
     TestingConfig,
     ProductionConfig,
     RemoteProductionConfig,
 )
+import atexit
 import os
-import sshtunnel
+import threading
+import time
+from .ssh_tunnel import get_tunnel_manager
 
 Base = declarative_base()
 
@@ -28,33 +32,299 @@ else:
     config = TestingConfig
 
 
+# pool defaults used when the active config does not define its own values
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 3600
+DEFAULT_POOL_PRE_PING = True
+DEFAULT_POOL_TIMEOUT = 30
+
+
 def get_db_uri():
     if env != "remote-production":
         return config.SQLALCHEMY_DATABASE_URI
     else:
-        tunnel = sshtunnel.SSHTunnelForwarder(
-            (RemoteProductionConfig.SSH_HOST),
-            ssh_username=RemoteProductionConfig.SSH_USERNAME,
-            ssh_password=RemoteProductionConfig.SSH_PASSWORD,
-            remote_bind_address=RemoteProductionConfig.REMOTE_BIND_ADDRESS,
-        )
-        tunnel.start()
+        # the tunnel is shared by every engine in the process, see ssh_tunnel.SSHTunnelManager
+        local_port = get_tunnel_manager(RemoteProductionConfig).get_local_port()
         db_uri = (
             f"mysql+mysqldb://{RemoteProductionConfig.DB_USERNAME}"
-            + f":{RemoteProductionConfig.DB_PASSWORD}@127.0.0.1:{tunnel.local_bind_port}"
+            + f":{RemoteProductionConfig.DB_PASSWORD}@127.0.0.1:{local_port}"
             + f"/{RemoteProductionConfig.DB_NAME}"
         )
 
     return db_uri
 
 
-def get_engine():
+def get_pool_settings() -> dict:
+    """
+    Returns the connection pool settings for the active config. Any value not set on the config
+    class falls back to the module defaults.
+
+    Config attributes
+    -----------------
+    SQLALCHEMY_POOL_SIZE, SQLALCHEMY_MAX_OVERFLOW, SQLALCHEMY_POOL_RECYCLE,
+    SQLALCHEMY_POOL_PRE_PING, SQLALCHEMY_POOL_TIMEOUT
+    """
+    return {
+        "pool_size": getattr(config, "SQLALCHEMY_POOL_SIZE", DEFAULT_POOL_SIZE),
+        "max_overflow": getattr(
+            config, "SQLALCHEMY_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW
+        ),
+        "pool_recycle": getattr(
+            config, "SQLALCHEMY_POOL_RECYCLE", DEFAULT_POOL_RECYCLE
+        ),
+        "pool_pre_ping": getattr(
+            config, "SQLALCHEMY_POOL_PRE_PING", DEFAULT_POOL_PRE_PING
+        ),
+        "pool_timeout": getattr(
+            config, "SQLALCHEMY_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT
+        ),
+    }
+
+
+# ----------------- pool statistics -----------------
+class PoolStats:
+    """
+    Running counters for the process' connection pool so it can be sized under load.
+
+    Attributes
+    ----------
+    connects : int
+        new DBAPI connections opened by the pool
+    checkouts : int
+        connections handed out by the pool
+    checkins : int
+        connections returned to the pool
+    waits : int
+        checkouts that had to block because every connection the pool may open was checked out
+    wait_time : float
+        total seconds spent blocked waiting on the pool
+    overflow_checkouts : int
+        checkouts that were served by an overflow connection (beyond pool_size)
+    peak_checked_out : int
+        the most connections that were checked out at the same time
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.waits = 0
+            self.wait_time = 0.0
+            self.overflow_checkouts = 0
+            self.peak_checked_out = 0
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self, checked_out: int, pool_size: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if checked_out > pool_size:
+                self.overflow_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_time += seconds
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times the checkouts made while the pool is at capacity, so waits show up in
+    pool_stats. Checkouts with room left in the pool may still take a while to open a new DBAPI
+    connection (e.g. through the SSH tunnel) but that is connection setup, not contention.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # a negative max_overflow means the pool never runs out of connections
+        self.max_overflow = max_overflow
+
+    def is_at_capacity(self) -> bool:
+        if self.max_overflow < 0:
+            return False
+        return self.checkedout() >= self.size() + self.max_overflow
+
+    def connect(self):
+        if not self.is_at_capacity():
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+
+def _attach_tunnel_listener(engine) -> None:
+    # health-check the tunnel before every new DBAPI connection. if the tunnel had to be restarted it
+    # may be listening on a different local port, so always connect through the current one
+    @event.listens_for(engine, "do_connect")
+    def _on_do_connect(dialect, conn_rec, cargs, cparams):
+        cparams["port"] = get_tunnel_manager(RemoteProductionConfig).get_local_port()
+
+
+def _attach_pool_listeners(engine) -> None:
+    pool = engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_stats.record_connect()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_stats.record_checkout(pool.checkedout(), pool.size())
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_stats.record_checkin()
+
+
+# ----------------- engine registry -----------------
+# one engine (and one pool) per process. the pid is stored alongside the engine so that a forked
+# worker never reuses the sockets it inherited from its parent.
+_engine = None
+_engine_pid = None
+_sessionlocal = None
+_registry_lock = threading.Lock()
+_shutdown_registered = False
+
+
+def _create_engine():
     db_uri = get_db_uri()
-    engine = create_engine(db_uri)
+    settings = get_pool_settings()
+    engine = create_engine(
+        db_uri,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_recycle=settings["pool_recycle"],
+        pool_pre_ping=settings["pool_pre_ping"],
+        pool_timeout=settings["pool_timeout"],
+    )
+    _attach_pool_listeners(engine)
+    if env == "remote-production":
+        _attach_tunnel_listener(engine)
     return engine
 
 
+def get_engine():
+    """
+    Returns the engine for the current process, creating it on first use. Every caller in the
+    process shares this engine and its connection pool.
+    """
+    global _engine, _engine_pid, _sessionlocal
+    pid = os.getpid()
+    if _engine is not None and _engine_pid == pid:
+        return _engine
+
+    with _registry_lock:
+        if _engine is not None and _engine_pid != pid:
+            # inherited from a parent process: drop the pool without closing the parent's sockets
+            _engine.dispose(close=False)
+            _engine = None
+            _sessionlocal = None
+            pool_stats.reset()
+        if _engine is None:
+            _engine = _create_engine()
+            _engine_pid = pid
+            _register_shutdown()
+    return _engine
+
+
+def _register_shutdown() -> None:
+    # registered after the first engine (and so after any ssh tunnel) exists. atexit runs handlers in
+    # reverse order, so pooled connections are closed before the tunnel underneath them is stopped
+    global _shutdown_registered
+    if not _shutdown_registered:
+        atexit.register(dispose_engine)
+        _shutdown_registered = True
+
+
 def get_sessionlocal():
+    global _sessionlocal
     engine = get_engine()
-    sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return sessionlocal()
+    if _sessionlocal is None:
+        _sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return _sessionlocal()
+
+
+def get_pool_stats() -> dict:
+    """
+    Returns the pool counters for the current process along with a snapshot of the pool's state.
+
+    Returns
+    -------
+    dict
+        pool_stats counters plus pool_size, checked_out, checked_in and overflow
+    """
+    stats = pool_stats.as_dict()
+    if _engine is not None and _engine_pid == os.getpid():
+        pool = _engine.pool
+        stats.update(
+            {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    return stats
+
+
+def dispose_engine() -> None:
+    """
+    Closes every pooled connection and forgets the process' engine. The next get_engine call
+    creates a fresh one.
+    """
+    global _engine, _engine_pid, _sessionlocal
+    with _registry_lock:
+        if _engine is not None and _engine_pid == os.getpid():
+            _engine.dispose()
+        _engine = None
+        _engine_pid = None
+        _sessionlocal = None
+        pool_stats.reset()
+
+
+def _reset_after_fork() -> None:
+    global _engine, _engine_pid, _sessionlocal, _registry_lock
+    # the lock may have been held by another thread at fork time
+    _registry_lock = threading.Lock()
+    pool_stats._lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
+    _engine = None
+    _engine_pid = None
+    _sessionlocal = None
+    pool_stats.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -9,6 +9,8 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import List
+import hashlib
 from ninjackalytics.database import Base
 
 
@@ -26,20 +28,30 @@ class teams(BattleDbBase):
     Pok4 = Column(String(length=70))
     Pok5 = Column(String(length=70))
     Pok6 = Column(String(length=70))
+    # sha256 of the sorted mon names so each composition is stored once (see make_fingerprint)
+    Fingerprint = Column(String(length=64), unique=True, index=True)
 
+    # teams are shared by every battle with the same composition, so deleting a team must never
+    # delete its battles
     Battles_as_P1 = relationship(
         "battle_info",
-        cascade="all, delete",
         backref="team_as_P1",
         primaryjoin="teams.id == battle_info.P1_team",
     )
     Battles_as_P2 = relationship(
         "battle_info",
-        cascade="all, delete",
         backref="team_as_P2",
         primaryjoin="teams.id == battle_info.P2_team",
     )
 
+    @staticmethod
+    def make_fingerprint(mon_names: List[str]) -> str:
+        """
+        Returns the content address of a team composition. Order does not matter and names can never
+        contain "|" (see Team._verify_mon_names) so it is safe to use as the separator.
+        """
+        return hashlib.sha256("|".join(sorted(mon_names)).encode("utf-8")).hexdigest()
+
     def __repr__(self):
         return "<Team: %r>" % [getattr(self, f"Pok{i}") for i in range(1, 7)]
 
@@ -135,3 +147,28 @@ class errors(BattleDbBase):
 
     def __repr__(self):
         return "<Error: %r>" % self.Error_Message
+
+
+class crawl_cursors(BattleDbBase):
+    """
+    Per format replay search positions so that get_replay_urls only lists replays it has not seen.
+    Upload times are the unix timestamps used by the showdown replay search.
+    """
+
+    __tablename__ = "crawl_cursors"
+    Format = Column(String(length=100), nullable=False, unique=True)
+    # newest replay listed so far, incremental crawls stop once they reach it
+    Newest_Upload = Column(Integer, nullable=True)
+    Newest_ID = Column(String(length=255), nullable=True)
+    # oldest replay listed so far, backfill crawls continue from before it
+    Oldest_Upload = Column(Integer, nullable=True)
+    # an incremental crawl that ran out of pages before reaching Newest_Upload leaves a gap. the
+    # next crawls continue from before Gap_Before until they reach it, then the newest replay of
+    # the gap (Gap_Newest_Upload, Gap_Newest_ID) becomes the high-water mark
+    Gap_Before = Column(Integer, nullable=True)
+    Gap_Newest_Upload = Column(Integer, nullable=True)
+    Gap_Newest_ID = Column(String(length=255), nullable=True)
+    Date_Updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return "<Crawl Cursor: %r>" % self.Format
@@ -0,0 +1,128 @@
+import atexit
+import os
+import threading
+import time
+
+import sshtunnel
+
+
+class SSHTunnelManager:
+    """
+    Keeps a single SSH tunnel to the production database open for the lifetime of a process.
+
+    Every engine created in the process shares the tunnel. The tunnel is health-checked (at most once
+    every check_interval seconds) whenever a new database connection is opened and is restarted if it
+    has dropped. A forked worker opens its own tunnel instead of reusing the parent's.
+
+    Parameters
+    ----------
+    tunnel_config : object
+        A config class providing SSH_HOST, SSH_USERNAME, SSH_PASSWORD and REMOTE_BIND_ADDRESS
+    check_interval : float
+        Minimum number of seconds between two health checks of a running tunnel
+    """
+
+    def __init__(self, tunnel_config: object, check_interval: float = 30):
+        self.tunnel_config = tunnel_config
+        self.check_interval = check_interval
+        self.restarts = 0
+        self._tunnel = None
+        self._tunnel_pid = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _create_tunnel(self) -> sshtunnel.SSHTunnelForwarder:
+        return sshtunnel.SSHTunnelForwarder(
+            (self.tunnel_config.SSH_HOST),
+            ssh_username=self.tunnel_config.SSH_USERNAME,
+            ssh_password=self.tunnel_config.SSH_PASSWORD,
+            remote_bind_address=self.tunnel_config.REMOTE_BIND_ADDRESS,
+        )
+
+    def _start(self) -> None:
+        self._tunnel = self._create_tunnel()
+        self._tunnel.start()
+        self._tunnel_pid = os.getpid()
+        self._last_check = time.monotonic()
+
+    def _is_healthy(self) -> bool:
+        if not self._tunnel.is_active:
+            return False
+        self._tunnel.check_tunnels()
+        return all(self._tunnel.tunnel_is_up.values())
+
+    def ensure_tunnel(self) -> None:
+        """
+        Starts the tunnel if this process does not have one yet and restarts it if the latest health
+        check finds it down.
+        """
+        with self._lock:
+            if self._tunnel is None or self._tunnel_pid != os.getpid():
+                # a tunnel inherited through fork belongs to the parent, leave it alone
+                self._start()
+                return
+
+            if time.monotonic() - self._last_check < self.check_interval:
+                return
+
+            self._last_check = time.monotonic()
+            if not self._is_healthy():
+                self._stop_tunnel()
+                self._start()
+                self.restarts += 1
+
+    def get_local_port(self) -> int:
+        """
+        Returns the local port the tunnel is bound to, ensuring the tunnel is up first.
+
+        Returns
+        -------
+        int
+            The local port forwarding to the remote database
+        """
+        self.ensure_tunnel()
+        return self._tunnel.local_bind_port
+
+    def _stop_tunnel(self) -> None:
+        try:
+            self._tunnel.stop()
+        except Exception:
+            # a dead tunnel may fail to stop cleanly, we are replacing it either way
+            pass
+        self._tunnel = None
+
+    def stop(self) -> None:
+        """
+        Stops this process' tunnel, if there is one.
+        """
+        with self._lock:
+            if self._tunnel is not None and self._tunnel_pid == os.getpid():
+                self._stop_tunnel()
+            self._tunnel = None
+            self._tunnel_pid = None
+
+
+_tunnel_manager = None
+
+
+def get_tunnel_manager(tunnel_config: object) -> SSHTunnelManager:
+    """
+    Returns the process-wide SSHTunnelManager, creating it on first use. The tunnel is stopped when the
+    interpreter exits.
+    """
+    global _tunnel_manager
+    if _tunnel_manager is None:
+        _tunnel_manager = SSHTunnelManager(tunnel_config)
+        atexit.register(_tunnel_manager.stop)
+    return _tunnel_manager
+
+
+def _reset_after_fork() -> None:
+    # the manager's lock may have been held by another thread at fork time. the tunnel itself is
+    # replaced on next use because its pid no longer matches
+    if _tunnel_manager is not None:
+        _tunnel_manager._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
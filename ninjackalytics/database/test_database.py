@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+import os
+import threading
+
+os.environ["FLASK_ENV"] = "testing"
+
+from sqlalchemy import text
+
+from ninjackalytics.database import database
+from ninjackalytics.database import (
+    get_engine,
+    get_sessionlocal,
+    get_pool_stats,
+    dispose_engine,
+)
+
+
+class TestEngineRegistry(unittest.TestCase):
+    def setUp(self):
+        dispose_engine()
+
+    def tearDown(self):
+        dispose_engine()
+
+    def test_get_engine_is_cached(self):
+        self.assertIs(get_engine(), get_engine())
+
+    def test_sessions_share_engine(self):
+        session1 = get_sessionlocal()
+        session2 = get_sessionlocal()
+        self.assertIs(session1.get_bind(), session2.get_bind())
+        self.assertIs(session1.get_bind(), get_engine())
+        session1.close()
+        session2.close()
+
+    def test_get_db_uri_called_once(self):
+        with patch.object(
+            database, "get_db_uri", wraps=database.get_db_uri
+        ) as mock_uri:
+            for _ in range(3):
+                with get_sessionlocal() as session:
+                    session.execute(text("SELECT 1"))
+            self.assertEqual(mock_uri.call_count, 1)
+
+    def test_pool_settings_from_config(self):
+        with patch.object(database.config, "SQLALCHEMY_POOL_SIZE", 3, create=True):
+            with patch.object(
+                database.config, "SQLALCHEMY_MAX_OVERFLOW", 2, create=True
+            ):
+                engine = get_engine()
+                self.assertEqual(engine.pool.size(), 3)
+                self.assertEqual(engine.pool._max_overflow, 2)
+
+    def test_pool_stats(self):
+        for _ in range(3):
+            with get_sessionlocal() as session:
+                session.execute(text("SELECT 1"))
+
+        stats = get_pool_stats()
+        self.assertEqual(stats["checkouts"], 3)
+        self.assertEqual(stats["checkins"], 3)
+        # connections are reused rather than reopened per session
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["overflow_checkouts"], 0)
+        # opening the first connection is not a wait on the pool
+        self.assertEqual(stats["waits"], 0)
+
+    def test_pool_stats_overflow(self):
+        with patch.object(database.config, "SQLALCHEMY_POOL_SIZE", 1, create=True):
+            engine = get_engine()
+            conn1 = engine.connect()
+            conn2 = engine.connect()
+            stats = get_pool_stats()
+            self.assertEqual(stats["overflow_checkouts"], 1)
+            self.assertEqual(stats["peak_checked_out"], 2)
+            conn1.close()
+            conn2.close()
+
+    def test_pool_stats_wait_at_capacity(self):
+        with patch.object(database.config, "SQLALCHEMY_POOL_SIZE", 1, create=True):
+            with patch.object(
+                database.config, "SQLALCHEMY_MAX_OVERFLOW", 0, create=True
+            ):
+                engine = get_engine()
+                conn1 = engine.connect()
+                self.assertTrue(engine.pool.is_at_capacity())
+                timer = threading.Timer(0.05, conn1.close)
+                timer.start()
+                conn2 = engine.connect()
+                timer.join()
+                stats = get_pool_stats()
+                self.assertEqual(stats["waits"], 1)
+                self.assertGreater(stats["wait_time"], 0)
+                conn2.close()
+
+    def test_new_engine_after_fork(self):
+        parent_engine = get_engine()
+        with patch.object(database.os, "getpid", return_value=os.getpid() + 1):
+            child_engine = get_engine()
+        self.assertIsNot(parent_engine, child_engine)
+
+    def test_dispose_engine(self):
+        engine = get_engine()
+        dispose_engine()
+        self.assertIsNot(engine, get_engine())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+
+from ninjackalytics.database import ssh_tunnel
+from ninjackalytics.database.ssh_tunnel import SSHTunnelManager
+
+
+class MockTunnelConfig:
+    SSH_HOST = "example.com"
+    SSH_USERNAME = "user"
+    SSH_PASSWORD = "password"
+    REMOTE_BIND_ADDRESS = ("127.0.0.1", 3306)
+
+
+def make_tunnel(port: int) -> MagicMock:
+    tunnel = MagicMock()
+    tunnel.local_bind_port = port
+    tunnel.is_active = True
+    tunnel.tunnel_is_up = {("127.0.0.1", port): True}
+    return tunnel
+
+
+class TestSSHTunnelManager(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(ssh_tunnel.sshtunnel, "SSHTunnelForwarder")
+        self.mock_forwarder = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tunnels = [make_tunnel(5001), make_tunnel(5002)]
+        self.mock_forwarder.side_effect = self.tunnels
+        self.manager = SSHTunnelManager(MockTunnelConfig, check_interval=0)
+
+    def test_single_tunnel_per_process(self):
+        for _ in range(5):
+            self.assertEqual(self.manager.get_local_port(), 5001)
+        self.assertEqual(self.mock_forwarder.call_count, 1)
+        self.tunnels[0].start.assert_called_once()
+        self.tunnels[1].start.assert_not_called()
+
+    def test_reconnects_dead_tunnel(self):
+        self.manager.get_local_port()
+        first_tunnel = self.manager._tunnel
+        first_tunnel.is_active = False
+
+        self.assertEqual(self.manager.get_local_port(), 5002)
+        first_tunnel.stop.assert_called_once()
+        self.assertEqual(self.manager.restarts, 1)
+
+    def test_reconnects_when_forward_is_down(self):
+        self.manager.get_local_port()
+        self.manager._tunnel.tunnel_is_up = {("127.0.0.1", 5001): False}
+
+        self.assertEqual(self.manager.get_local_port(), 5002)
+        self.assertEqual(self.manager.restarts, 1)
+
+    def test_health_check_is_throttled(self):
+        manager = SSHTunnelManager(MockTunnelConfig, check_interval=3600)
+        manager.get_local_port()
+        manager._tunnel.is_active = False
+
+        self.assertEqual(manager.get_local_port(), 5001)
+        self.assertEqual(self.mock_forwarder.call_count, 1)
+
+    def test_new_tunnel_after_fork(self):
+        self.manager.get_local_port()
+        parent_tunnel = self.manager._tunnel
+        with patch.object(ssh_tunnel.os, "getpid", return_value=os.getpid() + 1):
+            self.assertEqual(self.manager.get_local_port(), 5002)
+        # the parent's tunnel is not stopped by the child
+        parent_tunnel.stop.assert_not_called()
+
+    def test_stop(self):
+        self.manager.get_local_port()
+        tunnel = self.manager._tunnel
+        self.manager.stop()
+        tunnel.stop.assert_called_once()
+        self.assertIsNone(self.manager._tunnel)
+
+
+if __name__ == "__main__":
+    unittest.main()
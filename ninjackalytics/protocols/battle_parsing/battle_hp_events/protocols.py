@@ -5,7 +5,13 @@ class HealData(Protocol):
     def get_heal_data(self, event: str, turn: object) -> None:
         ...
 
+    def handle_event(self, event: object, turn: object) -> None:
+        ...
+
 
 class DamageData(Protocol):
     def get_damage_data(self, event: str, turn: object) -> None:
         ...
+
+    def handle_event(self, event: object, turn: object) -> None:
+        ...
@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple, Protocol
+from typing import Dict, List, Mapping, Optional, Tuple, Protocol
 
 
 class Line(Protocol):
@@ -6,16 +6,36 @@ class Line(Protocol):
     number: int
 
 
+class Event(Protocol):
+    tag: str
+    actor: Optional[str]
+    target: Optional[str]
+    hp: Optional[str]
+    kwargs: Mapping[str, str]
+    from_kind: Optional[str]
+    args: Tuple[str, ...]
+    turn: int
+    line: int
+    index: int
+    text: str
+
+
 class Turn(Protocol):
     number: int
     text: str
     lines: List[Line]
 
+    def source_range(self) -> Tuple[str, int, int]:
+        ...
+
 
 class Battle(Protocol):
     def get_turns(self) -> List[Turn]:
         ...
 
+    def get_events(self) -> List[Event]:
+        ...
+
 class BattlePokemon(Protocol):
     def get_pnum_and_name(self) -> Tuple[int, str]:
         ...
\ No newline at end of file
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from ninjackalytics.database import get_sessionlocal
+from ninjackalytics.database.models import crawl_cursors
+
+
+@contextmanager
+def session_scope(session):
+    """Provide a transactional scope around a series of operations."""
+    try:
+        yield session
+        session.commit()
+    except:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+class CrawlCursorStore:
+    """
+    Reads and writes the per format replay search positions in the crawl_cursors table.
+
+    Parameters
+    ----------
+    engine : object
+        Optional engine to use instead of the FLASK_ENV based one
+    """
+
+    def __init__(self, *, engine: object = None):
+        # prepare a session_maker either by the get_sessionlocal function (which handles engine creation
+        # based on the FLASK_ENV environ) or by the engine passed in (which is used more manually)
+        if engine is None:
+            self.session_maker = get_sessionlocal
+        else:
+            sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            self.session_maker = lambda: sessionlocal()
+
+    def get_cursor(self, battle_format: str) -> Optional[Dict]:
+        """
+        Returns the cursor of a format as a dictionary with Newest_Upload, Newest_ID,
+        Oldest_Upload, Gap_Before, Gap_Newest_Upload and Gap_Newest_ID, or None if the format has
+        never been crawled.
+        """
+        with session_scope(self.session_maker()) as session:
+            row = session.execute(
+                select(
+                    crawl_cursors.Newest_Upload,
+                    crawl_cursors.Newest_ID,
+                    crawl_cursors.Oldest_Upload,
+                    crawl_cursors.Gap_Before,
+                    crawl_cursors.Gap_Newest_Upload,
+                    crawl_cursors.Gap_Newest_ID,
+                ).where(crawl_cursors.Format == battle_format)
+            ).first()
+            return None if row is None else dict(row._mapping)
+
+    def update_cursor(self, battle_format: str, **values) -> None:
+        """
+        Sets the given columns (any of the keys returned by get_cursor) of a format's cursor,
+        creating the cursor if needed.
+        """
+        with session_scope(self.session_maker()) as session:
+            cursor = (
+                session.query(crawl_cursors)
+                .filter(crawl_cursors.Format == battle_format)
+                .first()
+            )
+            if cursor is None:
+                cursor = crawl_cursors(Format=battle_format)
+                session.add(cursor)
+            for column, value in values.items():
+                setattr(cursor, column, value)
@@ -0,0 +1,340 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+
+from ninjackalytics.services.battle_parsing.battle_parser import (
+    BattleError,
+    ParsedBattle,
+    ParseResult,
+    find_function_with_error_from_traceback,
+    get_parse_context,
+    init_parse_worker,
+    parse_replay,
+)
+from ninjackalytics.services.database_interactors.battle_data_uploader import (
+    BattleDataUploader,
+)
+from ninjackalytics.services.replay_store import ReplayStore
+from .replay_fetcher import ReplayFetcher
+
+
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_BATCH_SIZE = 50
+# seconds the writer waits for more battles before uploading a partial batch
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# marks the end of a stage's output on the queue feeding the next stage
+_DONE = object()
+
+
+class StageStats:
+    """
+    Throughput counters for one pipeline stage.
+
+    Attributes
+    ----------
+    processed : int
+        items that left the stage, successful or not
+    errors : int
+        items that failed in the stage
+    busy_time : float
+        seconds spent doing the stage's work (summed over its workers)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.started = time.monotonic()
+
+    def finish(self) -> None:
+        self.finished = time.monotonic()
+
+    def record(self, seconds: float, error: bool = False, count: int = 1) -> None:
+        with self._lock:
+            self.processed += count
+            self.busy_time += seconds
+            if error:
+                self.errors += count
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            if self.started is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self.finished or time.monotonic()) - self.started
+            return {
+                "processed": self.processed,
+                "errors": self.errors,
+                "busy_time": self.busy_time,
+                "elapsed": elapsed,
+                "per_second": self.processed / elapsed if elapsed else 0.0,
+            }
+
+
+class IngestPipeline:
+    """
+    Fetches, parses and uploads replays with the three stages running at the same time:
+
+    fetch  - fetch_workers threads share a ReplayFetcher (keep-alive session, rate limited)
+    parse  - a process pool runs BattlePokemon and BattleParser.analyze_battle on every core
+    write  - a single writer uploads parsed battles in batches with BattleDataUploader.upload_battles
+
+    Stages are connected by bounded queues and the parse stage holds at most two battles per worker,
+    so a slow stage makes the stages before it wait instead of piling up replays in memory.
+
+    Calling stop (or hitting ctrl-c while run is executing) stops fetching new urls. Everything that
+    was already fetched is still parsed and uploaded before run returns.
+
+    Parameters
+    ----------
+    fetcher : ReplayFetcher
+        Fetcher used by the fetch threads. If None a default ReplayFetcher that keeps every replay
+        in the local ReplayStore
+    uploader : BattleDataUploader
+        Uploader used by the writer, a default BattleDataUploader if None
+    fetch_workers : int
+        Number of fetch threads
+    parse_workers : int
+        Number of parse processes, defaults to the number of cores
+    queue_size : int
+        Capacity of the queues between stages
+    batch_size : int
+        Number of battles uploaded per transaction
+    flush_interval : float
+        Seconds the writer waits for a batch to fill before uploading it partially
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[ReplayFetcher] = None,
+        uploader: Optional[BattleDataUploader] = None,
+        fetch_workers: int = DEFAULT_FETCH_WORKERS,
+        parse_workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        if fetcher is None:
+            fetcher = ReplayFetcher(max_workers=fetch_workers, store=ReplayStore())
+        self.fetcher = fetcher
+        self.uploader = uploader if uploader is not None else BattleDataUploader()
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.fetch_stats = StageStats("fetch")
+        self.parse_stats = StageStats("parse")
+        self.write_stats = StageStats("write")
+        self.uploaded = 0
+        # parsed battles waiting to be uploaded by the writer
+        self._batch = []
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        """
+        Stops fetching new urls, already fetched replays are still parsed and uploaded.
+        """
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the counters of every stage plus the number of newly uploaded battles.
+        """
+        return {
+            "fetch": self.fetch_stats.as_dict(),
+            "parse": self.parse_stats.as_dict(),
+            "write": self.write_stats.as_dict(),
+            "uploaded": self.uploaded,
+        }
+
+    # ----------------- fetch stage -----------------
+    def _fetch_worker(self, urls, urls_lock, fetched: queue.Queue) -> None:
+        try:
+            while not self._stop_event.is_set():
+                with urls_lock:
+                    url = next(urls, None)
+                if url is None:
+                    break
+                start = time.perf_counter()
+                result = self.fetcher.fetch_json(url)
+                self.fetch_stats.record(time.perf_counter() - start, error=not result.ok)
+                fetched.put(result)
+        finally:
+            fetched.put(_DONE)
+
+    # ----------------- parse stage -----------------
+    def _forward_parsed(self, futures, parsed: queue.Queue) -> None:
+        for future in futures:
+            url = future.url
+            try:
+                result = future.result()
+            except Exception as e:
+                # the worker process died (BrokenProcessPool) rather than the parse failing
+                result = ParseResult(url, error=BattleError.from_exception(e))
+            self.parse_stats.record(result.seconds, error=result.error is not None)
+            parsed.put(result)
+
+    def _parse_dispatcher(self, fetched: queue.Queue, parsed: queue.Queue) -> None:
+        max_pending = self.parse_workers * 2
+        pending = set()
+        fetchers_done = 0
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=get_parse_context(),
+                initializer=init_parse_worker,
+            ) as pool:
+                while fetchers_done < self.fetch_workers:
+                    result = fetched.get()
+                    if result is _DONE:
+                        fetchers_done += 1
+                        continue
+                    if not result.ok:
+                        parsed.put(
+                            ParseResult(
+                                result.url, error=BattleError.from_exception(result.error)
+                            )
+                        )
+                        continue
+
+                    future = pool.submit(parse_replay, result.url, result.data)
+                    future.url = result.url
+                    pending.add(future)
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        self._forward_parsed(done, parsed)
+
+                self._forward_parsed(wait(pending).done, parsed)
+        except Exception as e:
+            # the pool could not be used at all. stop fetching and report everything still in
+            # flight as failed so that no stage is left blocked on a full queue
+            self.stop()
+            error = BattleError.from_exception(e)
+            for future in pending:
+                parsed.put(ParseResult(future.url, error=error))
+            while fetchers_done < self.fetch_workers:
+                result = fetched.get()
+                if result is _DONE:
+                    fetchers_done += 1
+                else:
+                    parsed.put(ParseResult(result.url, error=error))
+        finally:
+            self.parse_stats.finish()
+            parsed.put(_DONE)
+
+    # ----------------- write stage -----------------
+    def _upload_error(self, url: str, error: BattleError) -> None:
+        self.uploader.upload_error(
+            battle_url=url,
+            error_message=error.message,
+            traceback=error.traceback,
+            function=error.function,
+        )
+
+    def _flush(self) -> None:
+        batch = self._batch
+        if not batch:
+            return
+        start = time.perf_counter()
+        parsed = [result.parsed for result in batch]
+        try:
+            self.uploaded += self.uploader.upload_battles(
+                parsed, batch_size=len(parsed)
+            )
+            self.write_stats.record(time.perf_counter() - start, count=len(batch))
+        except Exception:
+            # one bad battle rolls back its whole batch, retry one at a time to isolate it
+            for result in batch:
+                start = time.perf_counter()
+                try:
+                    self.uploaded += self.uploader.upload_battles([result.parsed])
+                    self.write_stats.record(time.perf_counter() - start)
+                except Exception as e:
+                    self._upload_error(result.url, BattleError.from_exception(e))
+                    self.write_stats.record(time.perf_counter() - start, error=True)
+        self._batch = []
+
+    def _write(self, parsed: queue.Queue) -> None:
+        while True:
+            try:
+                result = parsed.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush()
+                continue
+            if result is _DONE:
+                break
+            if result.error is not None:
+                self._upload_error(result.url, result.error)
+            else:
+                self._batch.append(result)
+                if len(self._batch) >= self.batch_size:
+                    self._flush()
+        self._flush()
+
+    def run(self, urls: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Ingests every url and returns the pipeline stats once all stages have drained.
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            Replay urls to ingest, expected to be new to the database
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            See stats
+        """
+        fetched = queue.Queue(maxsize=self.queue_size)
+        parsed = queue.Queue(maxsize=self.queue_size)
+        urls = iter(urls)
+        urls_lock = threading.Lock()
+
+        for stage_stats in [self.fetch_stats, self.parse_stats, self.write_stats]:
+            stage_stats.start()
+
+        fetch_threads = [
+            threading.Thread(
+                target=self._fetch_worker,
+                args=(urls, urls_lock, fetched),
+                name=f"ingest-fetch-{i}",
+                daemon=True,
+            )
+            for i in range(self.fetch_workers)
+        ]
+        parse_thread = threading.Thread(
+            target=self._parse_dispatcher,
+            args=(fetched, parsed),
+            name="ingest-parse",
+            daemon=True,
+        )
+        for thread in fetch_threads + [parse_thread]:
+            thread.start()
+
+        try:
+            self._write(parsed)
+        except KeyboardInterrupt:
+            # graceful shutdown: stop fetching and drain what is already in flight. a second ctrl-c
+            # while draining aborts
+            self.stop()
+            self._write(parsed)
+
+        for thread in fetch_threads:
+            thread.join()
+        parse_thread.join()
+        self.fetch_stats.finish()
+        self.write_stats.finish()
+        return self.stats()
@@ -0,0 +1,267 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ninjackalytics.services.replay_store import ReplayStore
+
+
+DEFAULT_MAX_WORKERS = 8
+# requests per second sent to any single host
+DEFAULT_RATE_LIMIT = 5.0
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+DEFAULT_TIMEOUT = 10.0
+
+# status codes worth retrying, anything else in the 4xx range is treated as final
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Spaces out requests to the same host so that no more than rate requests per second are sent to it,
+    regardless of how many threads are fetching.
+
+    Parameters
+    ----------
+    rate : float
+        Maximum requests per second per host. None or 0 disables rate limiting.
+    """
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str) -> None:
+        """
+        Blocks until the next request slot for host is available and claims it.
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FetchResult:
+    """
+    The outcome of fetching a single replay.
+
+    Attributes
+    ----------
+    url : str
+        The replay url that was fetched
+    data : dict
+        The replay json, None if the fetch failed
+    error : Exception
+        The error raised by the final attempt, None if the fetch succeeded
+    attempts : int
+        Number of requests sent for this url
+    """
+
+    def __init__(
+        self,
+        url: str,
+        data: Optional[dict] = None,
+        error: Optional[Exception] = None,
+        attempts: int = 0,
+    ):
+        self.url = url
+        self.data = data
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return f"<FetchResult {self.url} ok={self.ok} attempts={self.attempts}>"
+
+
+class ReplayFetcher:
+    """
+    Fetches replay json from showdown concurrently.
+
+    All requests go through one keep-alive requests.Session whose connection pool is sized to the
+    number of workers, so connections are reused across replays instead of reopened per battle.
+    Failed requests (connection errors, timeouts, 429 and 5xx responses) are retried with exponential
+    backoff and full jitter.
+
+    Parameters
+    ----------
+    max_workers : int
+        Maximum number of replays fetched at the same time
+    rate_limit : float
+        Maximum requests per second sent to a single host, None to disable
+    max_retries : int
+        Number of retries after the first attempt before a url is reported as failed
+    backoff_base : float
+        Backoff in seconds before the first retry, doubled for every further retry
+    backoff_max : float
+        Upper bound in seconds for a single backoff
+    timeout : float
+        Timeout in seconds for a single request
+    session : requests.Session
+        Optional session to use instead of creating one
+    store : ReplayStore
+        Optional local store of raw replays, checked before downloading and filled with every
+        downloaded replay
+    max_in_flight : int
+        Maximum number of urls submitted but not yet yielded by fetch_all, which bounds the
+        replays held in memory when the consumer is slower than the fetching. Defaults to twice
+        max_workers.
+
+    Example
+    -------
+    with ReplayFetcher(max_workers=8) as fetcher:
+        for result in fetcher.fetch_all(urls):
+            if result.ok:
+                battle = Battle.from_json(result.data, url=result.url)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        timeout: float = DEFAULT_TIMEOUT,
+        session: Optional[requests.Session] = None,
+        store: Optional[ReplayStore] = None,
+        max_in_flight: Optional[int] = None,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_in_flight = max(max_in_flight or 2 * max_workers, max_workers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.session = session if session is not None else self._create_session()
+        self.store = store
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.max_workers, pool_maxsize=self.max_workers
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _get_backoff(self, retry: int) -> float:
+        # full jitter: anywhere between 0 and the capped exponential backoff
+        cap = min(self.backoff_max, self.backoff_base * 2**retry)
+        return random.uniform(0, cap)
+
+    def fetch_json(self, url: str) -> FetchResult:
+        """
+        Fetches the json for a single replay url, retrying transient failures. With a store, replays
+        already in it are read locally (attempts is 0) and downloaded replays are added to it.
+
+        Parameters
+        ----------
+        url : str
+            The replay url, without the .json suffix
+
+        Returns
+        -------
+        FetchResult
+            The replay json or the error of the final attempt
+        """
+        if self.store is None:
+            return self._download(url)
+
+        battle_id = url.rstrip("/").split("/")[-1]
+        if battle_id in self.store:
+            return FetchResult(url, data=self.store.get(battle_id))
+        result = self._download(url)
+        if result.ok:
+            try:
+                self.store.put(result.data)
+            except OSError:
+                # failing to keep a local copy should not fail the fetch itself
+                pass
+        return result
+
+    def _download(self, url: str) -> FetchResult:
+        host = urlsplit(url).netloc
+        attempts = 0
+        while True:
+            attempts += 1
+            self.rate_limiter.wait(host)
+            try:
+                response = self.session.get(f"{url}.json", timeout=self.timeout)
+                if response.status_code in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                elif response.status_code >= 400:
+                    # the replay does not exist (or is private), retrying will not help
+                    return FetchResult(
+                        url,
+                        error=ValueError(
+                            f"An error occurred while trying to access the URL\n---\n"
+                            f"{response.status_code} {response.reason}\n---\n"
+                        ),
+                        attempts=attempts,
+                    )
+                return FetchResult(url, data=response.json(), attempts=attempts)
+            except (requests.RequestException, ValueError) as e:
+                if attempts > self.max_retries:
+                    return FetchResult(url, error=e, attempts=attempts)
+            time.sleep(self._get_backoff(attempts - 1))
+
+    def fetch_all(self, urls: Iterable[str]) -> Iterator[FetchResult]:
+        """
+        Fetches every url using up to max_workers threads. Results are yielded as soon as they
+        complete, so they are not necessarily in the order of urls. At most max_in_flight urls are
+        submitted ahead of the consumer, urls is read lazily as results are taken.
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            The replay urls to fetch
+
+        Yields
+        ------
+        FetchResult
+            One result per url
+        """
+        urls = iter(urls)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {
+                executor.submit(self.fetch_json, url)
+                for url in islice(urls, self.max_in_flight)
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    # the slot of every yielded result is refilled from urls
+                    url = next(urls, None)
+                    if url is not None:
+                        pending.add(executor.submit(self.fetch_json, url))
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "ReplayFetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
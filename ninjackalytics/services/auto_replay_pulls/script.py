@@ -50,53 +50,157 @@ def get_battle_urls_selenium(format_string, pages=25):
     return battle_urls
 
 
-def get_replay_urls(battle_format: str, pages: int = 24):
-    # Define the base URL for the replay search API
-    base_url = "https://replay.pokemonshowdown.com/search.json"
+SEARCH_URL = "https://replay.pokemonshowdown.com/search.json"
+REPLAY_URL = "https://replay.pokemonshowdown.com/"
+# the search returns one replay more than a full page to signal that another page exists
+SEARCH_PAGE_SIZE = 51
 
-    # Define the search parameters for the API
-    params = {"format": battle_format, "page": 1}
 
-    success = False
+def _get_search_page(params: dict, max_tries: int = 5) -> list:
     tries = 0
-    while not success:
+    while True:
         try:
             tries += 1
             # Send a GET request to the API with the search parameters
-            response = requests.get(base_url, params=params)
-            replays = response.json()
-            success = True
+            response = requests.get(SEARCH_URL, params=params)
+            response.raise_for_status()
+            return response.json()
         except:
-            if tries > 5:
+            if tries >= max_tries:
                 raise Exception("Too many tries")
 
-    # # Send a GET request to the API with the search parameters
-    # response = requests.get(base_url, params=params)
 
-    # # Parse the JSON response from the API to extract the replay URLs
-    # replays = response.json()
-    replay_urls = [
-        f"https://replay.pokemonshowdown.com/{replay['id']}" for replay in replays
-    ]
-
-    # Repeat steps 3-5 for each page of results until there are no more results or until the max pages are hit
-    while len(replays) == 51 and params["page"] <= pages:
-        params["page"] += 1
-        success = False
-        tries = 0
-        try:
-            tries += 1
-            # Send a GET request to the API with the search parameters
-            response = requests.get(base_url, params=params)
-            replays = response.json()
-            success = True
-        except:
-            if tries > 5:
-                raise Exception("Too many tries")
-
-        replay_urls += [
-            f"https://replay.pokemonshowdown.com/{replay['id']}" for replay in replays
-        ]
-
-    # Save the replay URLs to a file or process them in some other way
-    return replay_urls
+def _list_replays(
+    battle_format: str,
+    pages: int,
+    before: int = None,
+    newest_upload: int = None,
+    newest_id: str = None,
+) -> tuple:
+    """
+    Lists replays newest first, paging with the before cursor.
+
+    Listing stops after pages requests, when the search runs out of replays, or as soon as it reaches
+    the replay newest_id or anything uploaded before newest_upload.
+
+    Returns
+    -------
+    tuple
+        (replays, reached_newest) where reached_newest tells whether the listing caught up with
+        newest_upload/newest_id
+    """
+    params = {"format": battle_format}
+    if before is not None:
+        params["before"] = before
+
+    replays = []
+    seen_ids = set()
+    for _ in range(pages):
+        page = _get_search_page(params)
+        new_replays = [replay for replay in page if replay["id"] not in seen_ids]
+        for replay in new_replays:
+            if replay["id"] == newest_id or (
+                newest_upload is not None and replay["uploadtime"] < newest_upload
+            ):
+                return replays, True
+            seen_ids.add(replay["id"])
+            replays.append(replay)
+
+        if len(page) < SEARCH_PAGE_SIZE or not new_replays:
+            break
+        # before is exclusive, step one second past the last upload time so replays sharing it are
+        # not skipped (the repeats are dropped through seen_ids)
+        params["before"] = page[-1]["uploadtime"] + 1
+
+    return replays, False
+
+
+def get_replay_urls(
+    battle_format: str,
+    pages: int = 24,
+    cursor_store: object = None,
+    backfill: bool = False,
+) -> list:
+    """
+    Returns the replay urls listed by the showdown replay search for a format, newest first.
+
+    Without a cursor_store the first pages of the search are listed on every call. With one, the
+    crawl is incremental:
+
+    - by default only replays newer than the stored high-water mark are listed and paging stops as
+      soon as the mark is reached, after which the mark is moved to the newest replay. If the page
+      budget runs out first the unlisted gap is stored: the following calls continue from before
+      the oldest replay listed so far until they reach the mark, and only then move it to the
+      newest replay of the gap. Replays uploaded meanwhile are listed once the gap is closed
+    - with backfill the search continues from before the oldest replay listed so far, walking
+      further back in history on each call
+
+    Parameters
+    ----------
+    battle_format : str
+        The format to list, e.g. gen9ou
+    pages : int
+        Maximum number of search requests to make
+    cursor_store : CrawlCursorStore
+        Store holding the per format crawl positions
+    backfill : bool
+        List older replays instead of new ones
+
+    Returns
+    -------
+    list
+        The replay urls
+    """
+    if cursor_store is None:
+        replays, _ = _list_replays(battle_format, pages)
+        return [f"{REPLAY_URL}{replay['id']}" for replay in replays]
+
+    cursor = cursor_store.get_cursor(battle_format) or {}
+    updates = {}
+    if backfill:
+        before = cursor.get("Oldest_Upload")
+        replays, _ = _list_replays(
+            battle_format, pages, before=None if before is None else before + 1
+        )
+        if replays:
+            updates["Oldest_Upload"] = replays[-1]["uploadtime"]
+    elif cursor.get("Gap_Before") is not None:
+        # continue the gap left by an earlier crawl that ran out of pages
+        replays, reached_newest = _list_replays(
+            battle_format,
+            pages,
+            before=cursor["Gap_Before"] + 1,
+            newest_upload=cursor.get("Newest_Upload"),
+            newest_id=cursor.get("Newest_ID"),
+        )
+        if reached_newest or not replays:
+            updates["Newest_Upload"] = cursor["Gap_Newest_Upload"]
+            updates["Newest_ID"] = cursor["Gap_Newest_ID"]
+            updates.update(Gap_Before=None, Gap_Newest_Upload=None, Gap_Newest_ID=None)
+        else:
+            updates["Gap_Before"] = replays[-1]["uploadtime"]
+    else:
+        replays, reached_newest = _list_replays(
+            battle_format,
+            pages,
+            newest_upload=cursor.get("Newest_Upload"),
+            newest_id=cursor.get("Newest_ID"),
+        )
+        if replays and (reached_newest or cursor.get("Newest_Upload") is None):
+            updates["Newest_Upload"] = replays[0]["uploadtime"]
+            updates["Newest_ID"] = replays[0]["id"]
+        elif replays:
+            updates["Gap_Before"] = replays[-1]["uploadtime"]
+            updates["Gap_Newest_Upload"] = replays[0]["uploadtime"]
+            updates["Gap_Newest_ID"] = replays[0]["id"]
+
+    # the first crawl of a format sets both ends
+    if replays and cursor.get("Newest_Upload") is None:
+        updates["Newest_Upload"] = replays[0]["uploadtime"]
+        updates["Newest_ID"] = replays[0]["id"]
+    if replays and cursor.get("Oldest_Upload") is None:
+        updates["Oldest_Upload"] = replays[-1]["uploadtime"]
+    if updates:
+        cursor_store.update_cursor(battle_format, **updates)
+
+    return [f"{REPLAY_URL}{replay['id']}" for replay in replays]
@@ -0,0 +1,185 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+os.environ["FLASK_ENV"] = "testing"
+
+from sqlalchemy import create_engine
+
+from ninjackalytics.database import Base
+from ninjackalytics.services.auto_replay_pulls import script
+from ninjackalytics.services.auto_replay_pulls.crawl_cursors import CrawlCursorStore
+from ninjackalytics.services.auto_replay_pulls.script import (
+    REPLAY_URL,
+    SEARCH_PAGE_SIZE,
+    get_replay_urls,
+)
+
+
+class FakeSearch:
+    """
+    Stands in for search.json. Replays are kept newest first and pages honour the before cursor the
+    way the real search does (uploadtime strictly less than before).
+    """
+
+    def __init__(self, count: int):
+        self.replays = []
+        self.requests = 0
+        self.add_replays(count)
+
+    def add_replays(self, count: int) -> None:
+        newest = self.replays[0]["uploadtime"] if self.replays else 1000
+        new_replays = [
+            {"id": f"gen9ou-{newest + i}", "uploadtime": newest + i}
+            for i in range(count, 0, -1)
+        ]
+        self.replays = new_replays + self.replays
+
+    def get(self, url, params=None):
+        self.requests += 1
+        before = params.get("before")
+        replays = [
+            replay
+            for replay in self.replays
+            if before is None or replay["uploadtime"] < before
+        ]
+        response = Mock()
+        response.json.return_value = replays[:SEARCH_PAGE_SIZE]
+        return response
+
+    def urls(self, start: int, stop: int) -> list:
+        return [f"{REPLAY_URL}{replay['id']}" for replay in self.replays[start:stop]]
+
+
+class TestCrawlCursors(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        Base.metadata.create_all(bind=self.engine)
+        self.store = CrawlCursorStore(engine=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.db_path)
+
+    def crawl(self, search: FakeSearch, **kwargs) -> list:
+        with patch.object(script.requests, "get", side_effect=search.get):
+            return get_replay_urls("gen9ou", cursor_store=self.store, **kwargs)
+
+    def test_store(self):
+        self.assertIsNone(self.store.get_cursor("gen9ou"))
+        self.store.update_cursor("gen9ou", Newest_Upload=10, Newest_ID="gen9ou-10")
+        self.store.update_cursor("gen9ou", Oldest_Upload=1)
+        self.assertEqual(
+            self.store.get_cursor("gen9ou"),
+            {
+                "Newest_Upload": 10,
+                "Newest_ID": "gen9ou-10",
+                "Oldest_Upload": 1,
+                "Gap_Before": None,
+                "Gap_Newest_Upload": None,
+                "Gap_Newest_ID": None,
+            },
+        )
+        self.assertIsNone(self.store.get_cursor("gen9uu"))
+
+    def test_without_store(self):
+        search = FakeSearch(200)
+        with patch.object(script.requests, "get", side_effect=search.get):
+            urls = get_replay_urls("gen9ou", pages=2)
+        self.assertEqual(urls, search.urls(0, 101))
+        self.assertEqual(search.requests, 2)
+
+    def test_incremental(self):
+        search = FakeSearch(200)
+        urls = self.crawl(search, pages=2)
+        self.assertEqual(urls, search.urls(0, 101))
+
+        # nothing new: a single request that stops at the high-water mark
+        search.requests = 0
+        self.assertEqual(self.crawl(search, pages=2), [])
+        self.assertEqual(search.requests, 1)
+
+        # only the new replays are listed
+        search.add_replays(10)
+        search.requests = 0
+        self.assertEqual(self.crawl(search, pages=2), search.urls(0, 10))
+        self.assertEqual(search.requests, 1)
+        self.assertEqual(
+            self.store.get_cursor("gen9ou")["Newest_ID"], search.replays[0]["id"]
+        )
+
+    def test_mark_kept_until_caught_up(self):
+        search = FakeSearch(10)
+        self.crawl(search)
+        mark = self.store.get_cursor("gen9ou")
+
+        # more new replays than one page can hold
+        search.add_replays(120)
+        urls = self.crawl(search, pages=1)
+        self.assertEqual(urls, search.urls(0, 51))
+        cursor = self.store.get_cursor("gen9ou")
+        self.assertEqual(cursor["Newest_ID"], mark["Newest_ID"])
+        self.assertEqual(cursor["Gap_Newest_ID"], search.replays[0]["id"])
+
+        # the next crawl continues the gap instead of listing the newest pages again
+        urls = self.crawl(search, pages=5)
+        self.assertEqual(urls, search.urls(50, 120))
+        cursor = self.store.get_cursor("gen9ou")
+        self.assertEqual(cursor["Newest_ID"], search.replays[0]["id"])
+        self.assertIsNone(cursor["Gap_Before"])
+
+    def test_gap_larger_than_page_budget(self):
+        search = FakeSearch(10)
+        self.crawl(search)
+
+        # every crawl has a budget of 2 pages, the backlog needs about 6
+        search.add_replays(300)
+        listed = set(self.crawl(search, pages=2))
+        crawls = 1
+        while self.store.get_cursor("gen9ou")["Gap_Before"] is not None:
+            # replays keep arriving while the gap is worked through
+            search.add_replays(5)
+            search.requests = 0
+            listed.update(self.crawl(search, pages=2))
+            self.assertLessEqual(search.requests, 2)
+            crawls += 1
+            self.assertLess(crawls, 10)
+
+        # the whole backlog was listed and the mark moved to its newest replay
+        backlog_start = 5 * (crawls - 1)
+        self.assertTrue(set(search.urls(backlog_start, backlog_start + 300)) <= listed)
+        self.assertEqual(
+            self.store.get_cursor("gen9ou")["Newest_ID"],
+            search.replays[backlog_start]["id"],
+        )
+
+        # the replays uploaded while the gap was closed are listed next
+        self.assertEqual(self.crawl(search, pages=2), search.urls(0, backlog_start))
+
+    def test_backfill(self):
+        search = FakeSearch(300)
+        first = self.crawl(search, pages=1)
+        self.assertEqual(first, search.urls(0, 51))
+
+        older = self.crawl(search, pages=2, backfill=True)
+        # the boundary replay is listed again, everything after it is older history
+        self.assertEqual(older, search.urls(50, 151))
+        self.assertEqual(
+            self.store.get_cursor("gen9ou")["Oldest_Upload"],
+            search.replays[150]["uploadtime"],
+        )
+        # the high-water mark is untouched by backfills
+        self.assertEqual(
+            self.store.get_cursor("gen9ou")["Newest_ID"], search.replays[0]["id"]
+        )
+
+        rest = self.crawl(search, pages=10, backfill=True)
+        self.assertEqual(rest, search.urls(150, 300))
+        self.assertEqual(self.crawl(search, backfill=True), search.urls(299, 300))
+
+
+if __name__ == "__main__":
+    unittest.main()
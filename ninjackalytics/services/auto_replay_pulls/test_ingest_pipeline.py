@@ -0,0 +1,167 @@
+import os
+import tempfile
+import threading
+import unittest
+
+os.environ["FLASK_ENV"] = "testing"
+
+from sqlalchemy import create_engine, func, select
+
+from ninjackalytics.database import Base
+from ninjackalytics.database.models import battle_info, errors
+from ninjackalytics.services.auto_replay_pulls.ingest_pipeline import (
+    IngestPipeline,
+    StageStats,
+    find_function_with_error_from_traceback,
+    parse_replay,
+)
+from ninjackalytics.services.auto_replay_pulls.replay_fetcher import FetchResult
+from ninjackalytics.services.database_interactors import BattleDataUploader
+from ninjackalytics.test_utilities.preppared_battle_objects.battle_vars import (
+    log,
+    b_format,
+)
+
+
+class StubFetcher:
+    """
+    Serves replays without the network. urls ending in "missing" fail to fetch and urls ending in
+    "broken" return a replay without a log, which fails to parse.
+    """
+
+    def __init__(self, stop_after: int = None, on_stop=None):
+        self.fetched = 0
+        self.stop_after = stop_after
+        self.on_stop = on_stop
+        self._lock = threading.Lock()
+
+    def fetch_json(self, url: str) -> FetchResult:
+        with self._lock:
+            self.fetched += 1
+            if self.stop_after is not None and self.fetched == self.stop_after:
+                self.on_stop()
+        replay_id = url.split("/")[-1]
+        if replay_id.endswith("missing"):
+            return FetchResult(url, error=ValueError("404 Not Found"), attempts=1)
+        data = {"id": replay_id, "format": b_format}
+        if not replay_id.endswith("broken"):
+            data["log"] = log
+        return FetchResult(url, data=data, attempts=1)
+
+
+class TestIngestPipeline(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        Base.metadata.create_all(bind=self.engine)
+        self.uploader = BattleDataUploader(engine=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.db_path)
+
+    def count(self, table) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(table)).scalar()
+
+    def get_urls(self, names):
+        return [f"https://replay.pokemonshowdown.com/{name}" for name in names]
+
+    def test_run(self):
+        urls = self.get_urls(
+            [f"gen9ou-{i}" for i in range(7)] + ["gen9ou-missing", "gen9ou-broken"]
+        )
+        pipeline = IngestPipeline(
+            fetcher=StubFetcher(),
+            uploader=self.uploader,
+            fetch_workers=3,
+            parse_workers=2,
+            queue_size=2,
+            batch_size=3,
+            flush_interval=0.1,
+        )
+        stats = pipeline.run(urls)
+
+        self.assertEqual(self.count(battle_info), 7)
+        self.assertEqual(self.count(errors), 2)
+        self.assertEqual(stats["uploaded"], 7)
+
+        self.assertEqual(stats["fetch"]["processed"], 9)
+        self.assertEqual(stats["fetch"]["errors"], 1)
+        # fetch errors skip the parse stage
+        self.assertEqual(stats["parse"]["processed"], 8)
+        self.assertEqual(stats["parse"]["errors"], 1)
+        self.assertEqual(stats["write"]["processed"], 7)
+        self.assertEqual(stats["write"]["errors"], 0)
+        self.assertGreater(stats["parse"]["per_second"], 0)
+
+        with self.engine.connect() as conn:
+            functions = dict(
+                conn.execute(select(errors.Battle_URL, errors.Function)).all()
+            )
+        # a failed parse is attributed to the last call in its traceback
+        self.assertEqual(functions[urls[-1]], "Response")
+
+    def test_existing_battles_skipped(self):
+        urls = self.get_urls(["gen9ou-1", "gen9ou-2"])
+        pipeline_args = dict(
+            uploader=self.uploader, fetch_workers=1, parse_workers=1, flush_interval=0.1
+        )
+        IngestPipeline(fetcher=StubFetcher(), **pipeline_args).run(urls)
+        stats = IngestPipeline(fetcher=StubFetcher(), **pipeline_args).run(urls)
+        self.assertEqual(stats["uploaded"], 0)
+        self.assertEqual(self.count(battle_info), 2)
+
+    def test_stop(self):
+        urls = self.get_urls([f"gen9ou-{i}" for i in range(50)])
+        pipeline = IngestPipeline(
+            uploader=self.uploader, fetch_workers=1, parse_workers=1, flush_interval=0.1
+        )
+        pipeline.fetcher = StubFetcher(stop_after=5, on_stop=pipeline.stop)
+        stats = pipeline.run(urls)
+
+        # the replay being fetched when stop was called is still ingested
+        self.assertEqual(stats["fetch"]["processed"], 5)
+        self.assertEqual(self.count(battle_info), 5)
+
+    def test_parse_replay(self):
+        result = parse_replay("some_url", {"id": "gen9ou-1", "format": b_format, "log": log})
+        self.assertIsNone(result.error)
+        self.assertEqual(result.parsed.general_info["Battle_ID"], "gen9ou-1")
+        self.assertEqual(len(result.parsed.teams), 2)
+
+        result = parse_replay("some_url", {"id": "gen9ou-1", "format": b_format})
+        self.assertIsNone(result.parsed)
+        self.assertIn("KeyError", result.error.traceback)
+
+
+class TestStageStats(unittest.TestCase):
+    def test_record(self):
+        stats = StageStats("parse")
+        stats.start()
+        stats.record(0.5)
+        stats.record(0.25, error=True)
+        stats.record(1.0, count=3)
+        stats.finish()
+
+        as_dict = stats.as_dict()
+        self.assertEqual(as_dict["processed"], 5)
+        self.assertEqual(as_dict["errors"], 1)
+        self.assertEqual(as_dict["busy_time"], 1.75)
+
+
+class TestFindFunctionWithError(unittest.TestCase):
+    def test_find_function(self):
+        tb = (
+            "Traceback (most recent call last):\n"
+            '  File "battle.py", line 10, in get_turns\n'
+            "    self.parse_turn(turn)\n"
+            "ValueError: bad turn\n"
+        )
+        self.assertEqual(find_function_with_error_from_traceback(tb), "parse_turn")
+        self.assertIsNone(find_function_with_error_from_traceback("ValueError()"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ninjackalytics.services.auto_replay_pulls.replay_fetcher import (
+    RateLimiter,
+    ReplayFetcher,
+)
+from ninjackalytics.services.battle_parsing import Battle
+from ninjackalytics.services.replay_store import ReplayStore
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local stand in for replay.pokemonshowdown.com.
+
+    /<id>.json          returns a replay for <id>
+    /flaky-<n>-<id>.json  returns 503 for the first n requests then the replay
+    anything under /missing returns 404
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0):
+        super().__init__(("127.0.0.1", 0), ReplayHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so connections are kept alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+            count = server.requests[self.path]
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            replay_id = self.path.strip("/").replace(".json", "")
+            if replay_id.startswith("missing"):
+                self._send(404, {"error": "not found"})
+            elif replay_id.startswith("flaky") and count <= int(replay_id.split("-")[1]):
+                self._send(503, {"error": "unavailable"})
+            else:
+                self._send(
+                    200,
+                    {
+                        "id": replay_id,
+                        "format": "gen9ou",
+                        "log": "|start\n|turn|1\n|move|p1a: Fox|Flamethrower|p2a: Moustachio",
+                    },
+                )
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class TestReplayFetcher(unittest.TestCase):
+    def start_server(self, delay: float = 0) -> ReplayServer:
+        server = ReplayServer(delay)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def get_fetcher(self, **kwargs) -> ReplayFetcher:
+        kwargs.setdefault("rate_limit", None)
+        kwargs.setdefault("backoff_base", 0.01)
+        fetcher = ReplayFetcher(**kwargs)
+        self.addCleanup(fetcher.close)
+        return fetcher
+
+    def test_fetch_json(self):
+        server = self.start_server()
+        fetcher = self.get_fetcher()
+
+        result = fetcher.fetch_json(f"{server.base_url}/gen9ou-1")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 1)
+        self.assertEqual(result.data["id"], "gen9ou-1")
+
+        battle = Battle.from_json(result.data, url=result.url)
+        self.assertEqual(battle.get_id(), "gen9ou-1")
+
+    def test_fetch_all(self):
+        server = self.start_server()
+        fetcher = self.get_fetcher(max_workers=4)
+        urls = [f"{server.base_url}/gen9ou-{i}" for i in range(20)]
+
+        results = list(fetcher.fetch_all(urls))
+        self.assertEqual(sorted(result.url for result in results), sorted(urls))
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_fetch_all_bounded(self):
+        server = self.start_server()
+        fetcher = self.get_fetcher(max_workers=2, max_in_flight=4)
+        consumed = []
+
+        def urls():
+            for i in range(20):
+                consumed.append(i)
+                yield f"{server.base_url}/gen9ou-{i}"
+
+        results = fetcher.fetch_all(urls())
+        next(results)
+        # the first result frees one slot, no more than max_in_flight + 1 urls were read
+        self.assertLessEqual(len(consumed), 5)
+        self.assertEqual(len(list(results)), 19)
+
+    def test_connections_reused(self):
+        server = self.start_server()
+        fetcher = self.get_fetcher(max_workers=1)
+        urls = [f"{server.base_url}/gen9ou-{i}" for i in range(10)]
+
+        list(fetcher.fetch_all(urls))
+        self.assertEqual(len(server.connections), 1)
+
+    def test_max_concurrency(self):
+        server = self.start_server(delay=0.1)
+        fetcher = self.get_fetcher(max_workers=3)
+        urls = [f"{server.base_url}/gen9ou-{i}" for i in range(9)]
+
+        list(fetcher.fetch_all(urls))
+        self.assertLessEqual(server.peak_in_flight, 3)
+        self.assertGreater(server.peak_in_flight, 1)
+
+    def test_retries_transient_errors(self):
+        server = self.start_server()
+        fetcher = self.get_fetcher(max_retries=3)
+
+        result = fetcher.fetch_json(f"{server.base_url}/flaky-2-gen9ou-1")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 3)
+
+        result = fetcher.fetch_json(f"{server.base_url}/flaky-10-gen9ou-2")
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, 4)
+
+    def test_missing_replay_not_retried(self):
+        server = self.start_server()
+        fetcher = self.get_fetcher(max_retries=3)
+
+        result = fetcher.fetch_json(f"{server.base_url}/missing-1")
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, ValueError)
+        self.assertEqual(result.attempts, 1)
+
+    def test_connection_error(self):
+        fetcher = self.get_fetcher(max_retries=1, timeout=1)
+        # nothing listens on port 9 locally
+        result = fetcher.fetch_json("http://127.0.0.1:9/gen9ou-1")
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, 2)
+
+    def test_store(self):
+        server = self.start_server()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        store = ReplayStore(root)
+        fetcher = self.get_fetcher(store=store)
+        url = f"{server.base_url}/gen9ou-1"
+
+        downloaded = fetcher.fetch_json(url)
+        self.assertEqual(downloaded.attempts, 1)
+        self.assertEqual(store.get("gen9ou-1"), downloaded.data)
+
+        # the second fetch is served from the store
+        stored = fetcher.fetch_json(url)
+        self.assertEqual(stored.attempts, 0)
+        self.assertEqual(stored.data, downloaded.data)
+        self.assertEqual(server.requests["/gen9ou-1.json"], 1)
+
+        # failed fetches are not stored
+        fetcher.fetch_json(f"{server.base_url}/missing-1")
+        self.assertNotIn("missing-1", store)
+
+    def test_backoff(self):
+        fetcher = self.get_fetcher(backoff_base=1, backoff_max=5)
+        for retry in range(6):
+            backoff = fetcher._get_backoff(retry)
+            self.assertGreaterEqual(backoff, 0)
+            self.assertLessEqual(backoff, min(5, 2**retry))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_limit_per_host(self):
+        limiter = RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait("host1")
+        # 5 requests at 20/s need at least 4 intervals of 0.05s
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+        # a different host has its own budget
+        start = time.monotonic()
+        limiter.wait("host2")
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_disabled(self):
+        limiter = RateLimiter(None)
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.wait("host")
+        self.assertLess(time.monotonic() - start, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
 from .battle_parser import BattleParser
 from .battle_data.battle import Battle
 from .battle_data.battle_pokemon import BattlePokemon
+from .streaming_parser import StreamingBattleParser
+from .header_parser import HeaderParser
@@ -0,0 +1,190 @@
+from typing import Dict, Iterable, List, Optional
+
+
+# per battle tables, with the BattleParser attribute holding their rows and their columns (the
+# database columns other than id and Battle_ID)
+TABLE_COLUMNS = {
+    "actions": ("action_info", ("Player_Number", "Turn", "Action")),
+    "damages": (
+        "damages_info",
+        (
+            "Damage",
+            "Dealer",
+            "Dealer_Player_Number",
+            "Source_Name",
+            "Receiver",
+            "Receiver_Player_Number",
+            "Turn",
+            "Type",
+        ),
+    ),
+    "healing": (
+        "heals_info",
+        (
+            "Healing",
+            "Receiver",
+            "Receiver_Player_Number",
+            "Source_Name",
+            "Turn",
+            "Type",
+        ),
+    ),
+    "pivots": ("pivot_info", ("Pokemon_Enter", "Player_Number", "Source_Name", "Turn")),
+}
+
+# per battle tables the parsers already produce as columns, with the attribute holding them, so
+# they are used as they are instead of being converted back from their rows
+COLUMN_ATTRIBUTES = {"actions": "action_columns"}
+
+
+def rows_to_columns(rows: List[dict], columns: Iterable[str]) -> Dict[str, list]:
+    """
+    Converts a list of row dictionaries into a dictionary of columns. Keys missing from a row are
+    filled with None and keys not in columns are dropped.
+    """
+    return {column: [row.get(column) for row in rows] for column in columns}
+
+
+def columns_to_rows(columns: Dict[str, list]) -> List[dict]:
+    """
+    Converts a dictionary of columns into a list of row dictionaries.
+    """
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def get_parser_columns(parser, table: str) -> Dict[str, list]:
+    """
+    Returns one per battle table of an analyzed BattleParser (or ParsedBattle) as columns, the
+    parser's own columns for the tables in COLUMN_ATTRIBUTES and its rows converted otherwise.
+    """
+    if table in COLUMN_ATTRIBUTES:
+        return getattr(parser, COLUMN_ATTRIBUTES[table])
+    attr, columns = TABLE_COLUMNS[table]
+    return rows_to_columns(getattr(parser, attr), columns)
+
+
+def get_table_columns(parser) -> Dict[str, Dict[str, list]]:
+    """
+    Returns the per battle tables of an analyzed BattleParser (or ParsedBattle) as columns.
+
+    Parameters
+    ----------
+    parser : BattleParser
+        A BattleParser that has already analyzed its battle
+
+    Returns
+    -------
+    Dict[str, Dict[str, list]]
+        table name -> column name -> values, for the actions, damages, healing and pivots tables
+    """
+    return {table: get_parser_columns(parser, table) for table in TABLE_COLUMNS}
+
+
+class BattleColumns:
+    """
+    Column oriented parser output of many battles, ready to be handed to a bulk insert.
+
+    Every per battle table is a dictionary of equally long lists with an extra Battle_ID column
+    holding the replay's Battle_ID (e.g. gen9ou-1968330098). The uploader swaps it for the
+    battle_info id once the battles are inserted. The teams and general info stay one entry per
+    battle since there are only a few of them.
+
+    Attributes
+    ----------
+    general_info : List[Dict[str, str]]
+        The general info of every battle, in the order they were added
+    teams : List[list]
+        The two teams of every battle, in the same order
+    tables : Dict[str, Dict[str, list]]
+        table name -> column name -> values
+    """
+
+    def __init__(self, parsers: Optional[Iterable] = None):
+        self.general_info = []
+        self.teams = []
+        self.tables = {
+            table: {column: [] for column in ("Battle_ID",) + columns}
+            for table, (_, columns) in TABLE_COLUMNS.items()
+        }
+        self._battle_ids = set()
+        for parser in parsers or []:
+            self.add(parser)
+
+    def __len__(self) -> int:
+        return len(self.general_info)
+
+    def battle_ids(self) -> List[str]:
+        return [info["Battle_ID"] for info in self.general_info]
+
+    def add(self, parser) -> bool:
+        """
+        Appends an analyzed battle. A battle whose Battle_ID was already added is skipped.
+
+        Parameters
+        ----------
+        parser : BattleParser
+            A BattleParser (or ParsedBattle) that has already analyzed its battle
+
+        Returns
+        -------
+        bool
+            True if the battle was added
+        """
+        battle_id = parser.general_info["Battle_ID"]
+        if battle_id in self._battle_ids:
+            return False
+        self._battle_ids.add(battle_id)
+        self.general_info.append(parser.general_info)
+        self.teams.append(parser.teams)
+
+        for table, (_, columns) in TABLE_COLUMNS.items():
+            parser_columns = get_parser_columns(parser, table)
+            table_columns = self.tables[table]
+            table_columns["Battle_ID"].extend(
+                [battle_id] * len(parser_columns[columns[0]])
+            )
+            for column in columns:
+                table_columns[column].extend(parser_columns[column])
+        return True
+
+    def extend(self, other: "BattleColumns") -> None:
+        """
+        Concatenates the battles of another BattleColumns onto this one, skipping the battles that
+        were already added.
+        """
+        other = other.select(set(other.battle_ids()) - self._battle_ids)
+        self.general_info.extend(other.general_info)
+        self.teams.extend(other.teams)
+        self._battle_ids.update(other._battle_ids)
+        for table, table_columns in self.tables.items():
+            for column, values in table_columns.items():
+                values.extend(other.tables[table][column])
+
+    def select(self, battle_ids: set) -> "BattleColumns":
+        """
+        Returns a new BattleColumns holding only the given battles.
+        """
+        selected = BattleColumns()
+        for info, teams in zip(self.general_info, self.teams):
+            if info["Battle_ID"] in battle_ids:
+                selected.general_info.append(info)
+                selected.teams.append(teams)
+                selected._battle_ids.add(info["Battle_ID"])
+
+        for table, table_columns in self.tables.items():
+            keep = [battle_id in battle_ids for battle_id in table_columns["Battle_ID"]]
+            selected.tables[table] = {
+                column: [value for value, kept in zip(values, keep) if kept]
+                for column, values in table_columns.items()
+            }
+        return selected
+
+    def to_frames(self) -> Dict[str, "pandas.DataFrame"]:
+        """
+        Returns every per battle table as a pandas DataFrame, e.g. for analysis or for writing to
+        parquet.
+        """
+        # imported here so parse workers do not have to load pandas
+        import pandas as pd
+
+        return {table: pd.DataFrame(columns) for table, columns in self.tables.items()}
@@ -2,6 +2,7 @@ import requests
 import re
 from typing import Optional, List
 
+from ninjackalytics.services.replay_store import ReplayStore
 from .sub_modules import Response, Turn, Line
 
 
@@ -19,6 +20,57 @@ class Battle:
         self.url = url
         self.response = Response(self._get_json_response())
 
+    @classmethod
+    def from_json(cls, json_response: dict, url: Optional[str] = None) -> "Battle":
+        """
+        Initialize a Battle object from an already fetched JSON response, e.g. one returned by
+        ReplayFetcher, without requesting the URL again.
+
+        Parameters:
+        -----------
+        json_response: dict
+            The JSON response of the battle, containing at least the id, format and log keys
+        url: str, optional
+            The URL of the Pokemon battle, defaults to the showdown replay URL for the battle id
+
+        Returns:
+        --------
+        Battle:
+            The initialized Battle object
+        """
+        battle = cls.__new__(cls)
+        if url is None:
+            url = f"https://replay.pokemonshowdown.com/{json_response['id']}"
+        battle.url = url
+        battle.response = Response(json_response)
+        return battle
+
+    @classmethod
+    def from_store(cls, battle_id: str, store: Optional[ReplayStore] = None) -> "Battle":
+        """
+        Initialize a Battle object from the local replay store instead of downloading it.
+
+        Parameters:
+        -----------
+        battle_id: str
+            The ID of the battle, e.g. gen9ou-1968330098
+        store: ReplayStore, optional
+            The store to read from, defaults to the store in the configured REPLAY_STORE_DIR
+
+        Returns:
+        --------
+        Battle:
+            The initialized Battle object
+
+        Raises:
+        -------
+        KeyError:
+            If the battle is not in the store
+        """
+        if store is None:
+            store = ReplayStore()
+        return cls.from_json(store.get(battle_id))
+
     def _get_json_response(self) -> dict:
         """
         Try to get a JSON response from the URL.
@@ -89,6 +141,18 @@ class Battle:
         """
         return self.response.turns
 
+    def get_events(self) -> list:
+        """
+        Get the tokenized event stream of the battle. Parsing models should iterate this rather
+        than re-splitting turn or line text.
+
+        Returns:
+        --------
+        List[Event]:
+            One event per Line, in the order they occur in the battle.
+        """
+        return self.response.events
+
     def get_id(self) -> str:
         """
         Get the battle ID.
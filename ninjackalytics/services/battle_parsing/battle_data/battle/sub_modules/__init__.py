@@ -1,3 +1,4 @@
 from .response import Response
 from .turn import Turn
 from .line import Line
+from .event import Event, tokenize_line, tokenize_turns
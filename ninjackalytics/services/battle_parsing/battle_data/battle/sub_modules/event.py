@@ -0,0 +1,158 @@
+import re
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+
+# e.g. p1a: Garchomp, p2: Moustachio, p1
+_IDENT_PATTERN = re.compile(r"p\d[a-z]?(?::|$)")
+
+# position of the hp field in the positional args of the events that report one
+# e.g. |switch|p2a: Slowbro|Slowbro, F|100/100 -> args[2]
+#      |-damage|p2a: Garchomp|50/100 tox|[from] psn -> args[1]
+_HP_POSITION = {
+    "switch": 2,
+    "drag": 2,
+    "replace": 2,
+    "-damage": 1,
+    "-heal": 1,
+    "-sethp": 1,
+}
+
+# shared by every event without kwargs so they do not each hold an empty dict
+_NO_KWARGS = MappingProxyType({})
+
+
+class Event(NamedTuple):
+    """
+    A single tokenized battle event.
+
+    Attributes:
+    -----------
+    tag: str
+        The event type, e.g. move, switch, -damage. Empty for lines that are not events.
+    actor: str or None
+        The pokemon (or side) performing / affected by the event, e.g. p1a: Garchomp
+    target: str or None
+        The target of a move event, e.g. p2a: Moustachio
+    hp: str or None
+        The hp and status field of switch, drag, replace, -damage, -heal and -sethp
+        events, e.g. 50/100 tox
+    kwargs: Mapping[str, str]
+        The bracketed trailing arguments, e.g. {"from": "item: Leftovers"}. Flags without a
+        value such as [silent] map to an empty string.
+    from_kind: str or None
+        The kind of the [from] argument, the part before its colon, e.g. item for
+        [from] item: Leftovers. Values without a colon are their own kind, e.g. psn or
+        Stealth Rock. None when the event has no [from].
+    args: Tuple[str, ...]
+        All positional arguments after the tag
+    turn: int
+        The number of the turn the event occurred on
+    line: int
+        The number of the line within its turn, the same as Line.number
+    index: int
+        The position of the event in the battle's event stream
+    text: str
+        The raw line. Unlike Turn and Line, which keep offsets into the battle log, an event holds
+        its own copy of the line (and of its args), so a battle's event stream holds the text of
+        its event lines alongside the log.
+    """
+
+    tag: str
+    actor: Optional[str]
+    target: Optional[str]
+    hp: Optional[str]
+    kwargs: Mapping[str, str]
+    from_kind: Optional[str]
+    args: Tuple[str, ...]
+    turn: int
+    line: int
+    index: int
+    text: str
+
+
+def tokenize_line(text: str, turn: int = 0, line: int = 0, index: int = 0) -> Event:
+    """
+    Tokenizes a single log line into an Event.
+
+    Parameters:
+    -----------
+    text: str
+        The log line, e.g. |-heal|p2a: Garchomp|100/100|[from] item: Leftovers
+    turn: int
+        The number of the turn containing the line
+    line: int
+        The number of the line within its turn
+    index: int
+        The position of the line in the battle's event stream
+
+    Returns:
+    --------
+    Event:
+        The tokenized event
+    """
+    if not text.startswith("|"):
+        return Event("", None, None, None, _NO_KWARGS, None, (), turn, line, index, text)
+
+    parts = text.split("|")
+    tag = parts[1]
+    args = []
+    kwargs = None
+    for part in parts[2:]:
+        if part.startswith("["):
+            end = part.find("]")
+            if end != -1:
+                if kwargs is None:
+                    kwargs = {}
+                kwargs[part[1:end]] = part[end + 1 :].strip()
+                continue
+        args.append(part)
+
+    actor = args[0] if args and _IDENT_PATTERN.match(args[0]) else None
+    target = None
+    if tag == "move" and len(args) > 2 and _IDENT_PATTERN.match(args[2]):
+        target = args[2]
+    hp_position = _HP_POSITION.get(tag)
+    hp = None
+    if hp_position is not None and len(args) > hp_position:
+        hp = args[hp_position]
+    from_kind = None
+    if kwargs is not None and "from" in kwargs:
+        from_kind = kwargs["from"].partition(":")[0]
+
+    return Event(
+        tag,
+        actor,
+        target,
+        hp,
+        kwargs if kwargs is not None else _NO_KWARGS,
+        from_kind,
+        tuple(args),
+        turn,
+        line,
+        index,
+        text,
+    )
+
+
+def tokenize_turns(turns: Iterable) -> List[Event]:
+    """
+    Tokenizes every line of the given turns, in order, into a single event stream.
+
+    Parameters:
+    -----------
+    turns: Iterable[Turn]
+        The turns of a battle
+
+    Returns:
+    --------
+    List[Event]:
+        One event per Line, in the order they occur in the battle
+    """
+    events = []
+    for turn in turns:
+        for line in turn.lines:
+            events.append(
+                tokenize_line(line.text, turn.number, line.number, len(events))
+            )
+    return events
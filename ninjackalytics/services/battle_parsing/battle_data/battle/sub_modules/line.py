@@ -1,4 +1,6 @@
 class Line:
+    __slots__ = ("number", "_source", "_start", "_end")
+
     def __init__(self, line_num: int, line_str: str):
         """
         Initialize a Line object from a line number and a string containing a single battle event.
@@ -14,5 +16,43 @@ class Line:
             A string containing a single battle event.
 
         """
-        self.text = line_str
         self.number = line_num
+        self._source = line_str
+        self._start = 0
+        self._end = len(line_str)
+
+    @classmethod
+    def from_source(cls, line_num: int, source: str, start: int, end: int) -> "Line":
+        """
+        Initialize a Line object as the range [start, end) of a larger string, e.g. the battle
+        log, without copying the line's text.
+
+        Parameters:
+        -----------
+        line_num: int
+            The line number for the Line object.
+        source: str
+            The string containing the line.
+        start: int
+            The offset of the line's first character in source.
+        end: int
+            The offset just past the line's last character in source.
+
+        Returns:
+        --------
+        Line:
+            The initialized Line object
+        """
+        line = cls.__new__(cls)
+        line.number = line_num
+        line._source = source
+        line._start = start
+        line._end = end
+        return line
+
+    @property
+    def text(self) -> str:
+        """
+        The text of the line, sliced from its source on access.
+        """
+        return self._source[self._start : self._end]
@@ -1,4 +1,5 @@
 from .turn import Turn
+from .event import tokenize_turns
 
 
 class Response:
@@ -16,14 +17,59 @@ class Response:
         self._battle_id = response["id"]
         self._format = response["format"]
 
-        try:
-            battle_start = self.log.split("|start\n")[1]
-            log_turns = battle_start.split("|turn|")
-            self.turns = [
-                Turn(turn_num, turn_str) for turn_num, turn_str in enumerate(log_turns)
-            ]
-        except:
-            self.turns = []
+        self.turns = [
+            Turn.from_source(turn_num, self._log, start, end)
+            for turn_num, (start, end) in enumerate(self._get_turn_bounds(self._log))
+        ]
+        self._events = None
+
+    @staticmethod
+    def _get_turn_bounds(log: str) -> list:
+        """
+        Finds where every turn starts and ends in the log, so turns can reference the log instead
+        of holding a copy of their text. Turn 0 starts after |start, every other turn after its
+        |turn| and the battle ends at the end of the log (or a second |start).
+
+        Parameters:
+        -----------
+        log: str
+            The battle log
+
+        Returns:
+        --------
+        List[Tuple[int, int]]:
+            The [start, end) offsets of every turn, empty if the battle never started
+        """
+        start = log.find("|start\n")
+        if start == -1:
+            return []
+        start += len("|start\n")
+        end = log.find("|start\n", start)
+        if end == -1:
+            end = len(log)
+
+        bounds = []
+        while True:
+            turn_end = log.find("|turn|", start, end)
+            if turn_end == -1:
+                bounds.append((start, end))
+                return bounds
+            bounds.append((start, turn_end))
+            start = turn_end + len("|turn|")
+
+    @property
+    def events(self) -> list:
+        """
+        Get the tokenized events of every turn. The log is tokenized once, on first access.
+
+        Returns:
+        --------
+        List[Event]:
+            One event per Line, in the order they occur in the battle.
+        """
+        if self._events is None:
+            self._events = tokenize_turns(self.turns)
+        return self._events
 
     @property
     def battle_id(self) -> str:
@@ -0,0 +1,101 @@
+import unittest
+
+from .event import Event, tokenize_line, tokenize_turns
+from .turn import Turn
+
+
+class TestTokenizeLine(unittest.TestCase):
+    def test_move(self):
+        event = tokenize_line(
+            "|move|p1a: May Day Parade|Fake Out|p2a: AMagicalFox",
+            turn=1,
+            line=3,
+            index=7,
+        )
+        self.assertIsInstance(event, Event)
+        self.assertEqual(event.tag, "move")
+        self.assertEqual(event.actor, "p1a: May Day Parade")
+        self.assertEqual(event.target, "p2a: AMagicalFox")
+        self.assertIsNone(event.hp)
+        self.assertEqual(
+            event.args, ("p1a: May Day Parade", "Fake Out", "p2a: AMagicalFox")
+        )
+        self.assertEqual(dict(event.kwargs), {})
+        self.assertEqual((event.turn, event.line, event.index), (1, 3, 7))
+
+    def test_damage_with_kwargs(self):
+        event = tokenize_line(
+            "|-damage|p2a: Garchomp|50/100 tox"
+            "|[from] item: Rocky Helmet|[of] p1a: Ferrothorn"
+        )
+        self.assertEqual(event.tag, "-damage")
+        self.assertEqual(event.actor, "p2a: Garchomp")
+        self.assertIsNone(event.target)
+        self.assertEqual(event.hp, "50/100 tox")
+        self.assertEqual(
+            dict(event.kwargs), {"from": "item: Rocky Helmet", "of": "p1a: Ferrothorn"}
+        )
+        self.assertEqual(event.args, ("p2a: Garchomp", "50/100 tox"))
+        self.assertEqual(event.from_kind, "item")
+
+    def test_from_kind(self):
+        self.assertEqual(
+            tokenize_line("|-damage|p1a: Rillaboom|94/100 tox|[from] psn").from_kind,
+            "psn",
+        )
+        self.assertEqual(
+            tokenize_line("|-heal|p1a: A|58/100|[from] drain|[of] p2a: B").from_kind,
+            "drain",
+        )
+        self.assertIsNone(tokenize_line("|-heal|p2a: Moltres|96/100").from_kind)
+
+    def test_switch(self):
+        event = tokenize_line(
+            "|switch|p1a: Dragapult|Dragapult, M|28/100|[from] Teleport"
+        )
+        self.assertEqual(event.actor, "p1a: Dragapult")
+        self.assertEqual(event.hp, "28/100")
+        self.assertEqual(event.kwargs["from"], "Teleport")
+
+    def test_flag(self):
+        event = tokenize_line("|-heal|p2a: Garchomp|100/100|[silent]")
+        self.assertEqual(dict(event.kwargs), {"silent": ""})
+
+    def test_non_events(self):
+        for text in ["", "1", "|"]:
+            event = tokenize_line(text)
+            self.assertEqual(event.tag, "")
+            self.assertIsNone(event.actor)
+            self.assertEqual(event.text, text)
+
+    def test_player(self):
+        event = tokenize_line("|player|p1|massivesket|1|1337")
+        self.assertEqual(event.actor, "p1")
+        self.assertEqual(event.args, ("p1", "massivesket", "1", "1337"))
+
+
+class TestTokenizeTurns(unittest.TestCase):
+    def test_tokenize_turns(self):
+        turns = [
+            Turn(
+                0,
+                "|switch|p1a: Kecleon|Kecleon, F|324/324\n"
+                "|switch|p2a: Delphox|Delphox|292/292\n",
+            ),
+            Turn(1, "1\n|c|p1: hi|gl\n|move|p1a: Kecleon|Fake Out|p2a: Delphox\n"),
+        ]
+        events = tokenize_turns(turns)
+
+        self.assertEqual([event.index for event in events], list(range(len(events))))
+        self.assertEqual(
+            [(event.turn, event.line) for event in events],
+            [(turn.number, line.number) for turn in turns for line in turn.lines],
+        )
+        # chat lines are not part of the stream
+        self.assertEqual(
+            [event.tag for event in events], ["switch", "switch", "", "", "move", ""]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
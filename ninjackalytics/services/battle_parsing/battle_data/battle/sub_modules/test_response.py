@@ -27,6 +27,28 @@ class TestResponse(unittest.TestCase):
         self.assertEqual(response.format, "gen8")
         self.assertEqual(len(response.turns), 0)
 
+    def test_turns_match_split_log(self):
+        log = (
+            "|player|p1|a\n|start\n|switch|p1a: A|A|100/100\n|turn|1\n"
+            "|c|a|hi\n|move|p1a: A|Tackle|p2a: B\n|turn|2\n|win|a\n"
+        )
+        response = Response({"id": "1", "format": "gen8", "log": log})
+        expected = log.split("|start\n")[1].split("|turn|")
+        self.assertEqual([turn.text for turn in response.turns], expected)
+        self.assertEqual(
+            [turn.number for turn in response.turns], list(range(len(expected)))
+        )
+        self.assertEqual(
+            [
+                [(line.number, line.text) for line in turn.lines]
+                for turn in response.turns
+            ],
+            [
+                [(line.number, line.text) for line in Turn(i, text).lines]
+                for i, text in enumerate(expected)
+            ],
+        )
+
     def test_battle_id(self):
         json_response = {"id": "1", "format": "gen8", "log": "|start\n"}
         response = Response(json_response)
@@ -24,12 +24,58 @@ class TestTurn(unittest.TestCase):
         self.assertTrue(isinstance(turn.lines, List))
         self.assertEqual(len(turn.lines), 1)
 
-    @patch.object(Line, "__init__", return_value=None)
-    def test_init_skips_c_and_raw_lines(self, mock_line_init: Mock) -> None:
+    def test_init_skips_c_and_raw_lines(self) -> None:
         turn_str = "|turn| 1\n|foo| bar\n|c| baz\n|raw| qux"
         turn = Turn(self.turn_num, turn_str)
 
-        mock_line_init.assert_called_once_with(2, "|foo| bar")
+        self.assertEqual(
+            [(line.number, line.text) for line in turn.lines], [(2, "|foo| bar")]
+        )
+
+    def test_from_source(self) -> None:
+        log = (
+            "|start\n|switch|p1a: Kecleon|Kecleon, F|324/324\n"
+            "|turn|1\n|c| baz\n|foo| bar\n"
+        )
+        start = log.index("|turn|1") + len("|turn|")
+        turn = Turn.from_source(1, log, start, len(log))
+
+        self.assertEqual(turn.number, 1)
+        self.assertEqual(turn.text, "1\n|c| baz\n|foo| bar\n")
+        self.assertEqual(
+            [(line.number, line.text) for line in turn.lines],
+            [(line.number, line.text) for line in Turn(1, turn.text).lines],
+        )
+        # the lines reference the log instead of holding a copy of their text
+        self.assertIs(turn.lines[0]._source, log)
+
+    def test_source_range(self) -> None:
+        log = "|start\n|turn|1\n|foo| bar\n"
+        start = log.index("1\n")
+        turn = Turn.from_source(1, log, start, len(log))
+        source, range_start, range_end = turn.source_range()
+
+        self.assertIs(source, log)
+        self.assertEqual((range_start, range_end), (start, len(log)))
+        self.assertEqual(source[range_start:range_end], turn.text)
+
+    def test_extend(self) -> None:
+        log = "|start\n|turn|1\n|foo| bar\n"
+        turn = Turn.from_source(1, log, log.index("1\n"), len(log))
+        turn.extend("|-damage|p1a: Kecleon|50/100\n")
+
+        self.assertEqual(turn.text, "1\n|foo| bar\n|-damage|p1a: Kecleon|50/100\n")
+        self.assertEqual(
+            [(line.number, line.text) for line in turn.lines],
+            [(line.number, line.text) for line in Turn(1, turn.text).lines],
+        )
+
+    def test_slots(self) -> None:
+        turn = Turn(self.turn_num, self.turn_str)
+        with self.assertRaises(AttributeError):
+            turn.extra = 1
+        with self.assertRaises(AttributeError):
+            Line(1, "|foo| bar").extra = 1
 
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
+from typing import Tuple
+
 from .line import Line
 
 
 class Turn:
+    __slots__ = ("number", "_source", "_start", "_end")
+
     def __init__(self, turn_num: int, turn_str: str):
         """
         Initialize a Turn object from a turn number and a string containing battle events.
@@ -17,12 +21,97 @@ class Turn:
 
         """
         self.number = turn_num
-        self.text = turn_str
-
-        self.lines = [
-            Line(line_num, line_str)
-            for line_num, line_str in enumerate(self.text.split("\n"), start=1)
-            if not line_str.startswith("|c|")
-            and not line_str.startswith("|raw|")
-            and not "|turn|" in line_str
-        ]
+        self._source = turn_str
+        self._start = 0
+        self._end = len(turn_str)
+
+    @classmethod
+    def from_source(cls, turn_num: int, source: str, start: int, end: int) -> "Turn":
+        """
+        Initialize a Turn object as the range [start, end) of the battle log. The turn and its
+        Lines only keep offsets into the log, their text is sliced from it when accessed.
+
+        Parameters:
+        -----------
+        turn_num: int
+            The turn number for the Turn object.
+        source: str
+            The battle log.
+        start: int
+            The offset of the turn's first character in source.
+        end: int
+            The offset just past the turn's last character in source.
+
+        Returns:
+        --------
+        Turn:
+            The initialized Turn object
+        """
+        turn = cls.__new__(cls)
+        turn.number = turn_num
+        turn._source = source
+        turn._start = start
+        turn._end = end
+        return turn
+
+    def extend(self, text: str) -> None:
+        """
+        Appends text to the end of the turn, for a turn whose log is still being written (e.g. the
+        current turn of a streamed battle). The turn then keeps its own text instead of a range of
+        the battle log.
+
+        Parameters:
+        -----------
+        text: str
+            The text to append, whole lines ending with their newline.
+        """
+        self._source = self.text + text
+        self._start = 0
+        self._end = len(self._source)
+
+    def source_range(self) -> Tuple[str, int, int]:
+        """
+        The string holding the text of the turn and the range [start, end) of the text in it. The
+        source is never modified, so the same source and range always hold the same text, which
+        is cheaper to compare than the sliced text.
+
+        Returns:
+        --------
+        Tuple[str, int, int]:
+            The source, start and end of the turn's text.
+        """
+        return self._source, self._start, self._end
+
+    @property
+    def text(self) -> str:
+        """
+        The text of the turn, sliced from the battle log on access.
+        """
+        return self._source[self._start : self._end]
+
+    @property
+    def lines(self) -> list:
+        """
+        The Lines of the turn, every line except chat (|c|), |raw| and |turn| lines. Line numbers
+        count every line of the turn, starting at 1. The Lines are created on every access and not
+        kept, the parsing models read the battle's events rather than its lines. Every access walks
+        the whole turn and creates a new Line per line, so callers keep the list instead of reading
+        the property again (e.g. tokenize_turns reads it once per turn).
+        """
+        source, end = self._source, self._end
+        lines = []
+        line_num = 1
+        position = self._start
+        while True:
+            newline = source.find("\n", position, end)
+            line_end = end if newline == -1 else newline
+            if not (
+                source.startswith("|c|", position, line_end)
+                or source.startswith("|raw|", position, line_end)
+                or source.find("|turn|", position, line_end) != -1
+            ):
+                lines.append(Line.from_source(line_num, source, position, line_end))
+            if newline == -1:
+                return lines
+            position = newline + 1
+            line_num += 1
@@ -143,6 +143,25 @@ class TestBattle(unittest.TestCase):
             if "|turn|" not in log_lines[i]:
                 self.assertEqual(line.text, log_lines[i])
 
+    @patch("requests.get")
+    def test_from_json(self, mock_requests_get):
+        json_response = {
+            "id": "gen9ou-1",
+            "format": "gen9ou",
+            "log": "|start\n|turn|1\n|move|p1a: Fox|Flamethrower|p2a: Moustachio",
+        }
+        battle = Battle.from_json(json_response)
+
+        # the payload is used as is, nothing is fetched
+        mock_requests_get.assert_not_called()
+        self.assertEqual(battle.url, "https://replay.pokemonshowdown.com/gen9ou-1")
+        self.assertEqual(battle.get_id(), "gen9ou-1")
+        self.assertEqual(battle.get_format(), "gen9ou")
+        self.assertEqual(len(battle.get_turns()), 2)
+
+        battle = Battle.from_json(json_response, url="some_url")
+        self.assertEqual(battle.url, "some_url")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -146,7 +146,7 @@ class BattleData:
         """
         pattern = r"\|win\|.*"  # winner pattern
         match = self._findall_regex(pattern)
-        if match is None:
+        if not match:
             winner = "battle resulted in tie"
         else:
             winner = match[0].split("|")[2]
@@ -1,7 +1,7 @@
 import re
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import traceback
-from .sub_modules import Pokemon, PokemonFinder, Team
+from .sub_modules import Pokemon, PokemonFinder, Team, parse_raw_name
 
 
 class BattlePokemon:
@@ -9,6 +9,47 @@ class BattlePokemon:
         self.log = battle.get_log()
         self.pokemon = PokemonFinder(self.log).get_pokemon()
         self.teams = self._create_teams()
+        self._index = self._create_index()
+
+    def refresh(self, log: str) -> None:
+        """
+        Finds the pokemon of a log that has grown since this object was created, e.g. a battle
+        that is still being played where pokemon are only revealed as they enter. The objects of
+        the pokemon already known are kept so their hp is not lost.
+
+        Parameters
+        ----------
+        log : str
+            The battle log, or at least its header and every entrance line seen so far
+        """
+        known = {
+            (mon.player_num, mon.nickname, mon.real_name): mon for mon in self.pokemon
+        }
+        self.log = log
+        self.pokemon = [
+            known.get((mon.player_num, mon.nickname, mon.real_name), mon)
+            for mon in PokemonFinder(log).get_pokemon()
+        ]
+        self.teams = self._create_teams()
+        self._index = self._create_index()
+
+    def _create_index(self) -> Dict[Tuple[int, str], Pokemon]:
+        """
+        Creates the lookup of pokemon objects by (player number, nickname), which is how the log
+        refers to them (p1a: Espeon -> (1, "Espeon")). Nicknames do not change with forms, so
+        form changes keep resolving to the same object. If two pokemon share a key (e.g. a
+        Zoroark whose nickname was taken from its |replace| line) the first one in self.pokemon
+        wins, the same one a linear search would find.
+
+        Returns
+        -------
+        dict
+            (player number, nickname) -> Pokemon
+        """
+        index = {}
+        for mon in self.pokemon:
+            index.setdefault((mon.player_num, mon.nickname), mon)
+        return index
 
     def _create_teams(self) -> List:
         """
@@ -74,10 +115,8 @@ class BattlePokemon:
         object
             The pokemon object that the raw_name refers to
         """
-        mon = next(
-            (mon for mon in self.pokemon if mon.check_if_name_is_self(raw_name)), None
-        )
-        if not mon:
+        mon = self._index.get(parse_raw_name(raw_name))
+        if mon is None:
             raise ValueError(f"Could not find a pokemon named {raw_name}")
         return mon
 
@@ -1,3 +1,3 @@
-from .pokemon import Pokemon
+from .pokemon import Pokemon, parse_raw_name
 from .pokemon_finder import PokemonFinder
 from .team import Team
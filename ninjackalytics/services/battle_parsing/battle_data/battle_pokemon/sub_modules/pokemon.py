@@ -1,7 +1,42 @@
 import re
+from functools import lru_cache
+from typing import Tuple
+
+
+_RAW_NAME_PREFIX = re.compile("[p][1-2][a-z]*: ")
+
+
+@lru_cache(maxsize=4096)
+def parse_raw_name(raw_name: str) -> Tuple[int, str]:
+    """
+    Splits a raw name found in the log into its player number and nickname. The same handful of
+    raw names repeat on every line of a battle so the results are cached.
+
+    Parameters
+    ----------
+    raw_name : str
+        The raw name found in the log, e.g. p1a: Espeon
+
+    Returns
+    -------
+    Tuple[int, str]
+        The player number and nickname, e.g. (1, "Espeon")
+
+    Raises
+    ------
+    ValueError
+        If the raw name does not start with a player prefix
+    """
+    match = _RAW_NAME_PREFIX.search(raw_name)
+    if match is None:
+        raise ValueError(f"Could not find a player number in {raw_name}")
+    prefix = match.group()
+    return int(prefix[1]), raw_name.split(prefix)[1]
 
 
 class Pokemon:
+    __slots__ = ("real_name", "nickname", "player_num", "hp", "hp_change")
+
     def __init__(
         self, real_name: str, nickname: str, player_num: str, hp=100, hp_change=None
     ):
@@ -84,11 +119,5 @@ class Pokemon:
         prefix = the p1[a-d] part (== "p1a" here)
         player_num = prefix[1], i.e. the second character of the prefix, here 1
         """
-        prefix = re.findall("[p][1-2][a-z]*: ", name)[0]
-        player_num = int(prefix[1])
-        name = name.split(prefix)[1]
-
-        if player_num == self.player_num and name == self.nickname:
-            return True
-        else:
-            return False
+        player_num, name = parse_raw_name(name)
+        return player_num == self.player_num and name == self.nickname
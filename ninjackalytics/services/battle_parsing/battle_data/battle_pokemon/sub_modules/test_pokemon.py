@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import patch, Mock, MagicMock
 
-from .pokemon import Pokemon
+from .pokemon import Pokemon, parse_raw_name
 
 
 class TestPokemon(unittest.TestCase):
@@ -37,6 +37,12 @@ class TestPokemon(unittest.TestCase):
         raw_name = "p2a: Espeon"
         self.assertFalse(pokemon.check_if_name_is_self(raw_name))
 
+    def test_parse_raw_name(self):
+        self.assertEqual(parse_raw_name("p1a: Espeon"), (1, "Espeon"))
+        self.assertEqual(parse_raw_name("p2: Mr. Mime: Jr"), (2, "Mr. Mime: Jr"))
+        with self.assertRaises(ValueError):
+            parse_raw_name("Espeon")
+
 
 if __name__ == "__main__":
     unittest.main()
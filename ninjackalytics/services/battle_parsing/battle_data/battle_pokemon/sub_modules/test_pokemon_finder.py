@@ -55,101 +55,77 @@ class TestPokemonFinder(unittest.TestCase):
         |turn|1
         """
 
-    def test_extract_previews(self):
+    def test_iter_sightings_previews(self):
         pf = PokemonFinder(self.preview_log)
         expected_output = [
-            {"player_num": "1", "real_name": "Baxcalibur"},
-            {"player_num": "1", "real_name": "Weavile"},
-            {"player_num": "1", "real_name": "Espeon"},
-            {"player_num": "1", "real_name": "Palossand"},
-            {"player_num": "1", "real_name": "Wo-Chien"},
-            {"player_num": "1", "real_name": "Bellibolt"},
-            {"player_num": "2", "real_name": "Corviknight"},
-            {"player_num": "2", "real_name": "Iron Thorns"},
-            {"player_num": "2", "real_name": "Charizard"},
-            {"player_num": "2", "real_name": "Grafaiai"},
-            {"player_num": "2", "real_name": "Flamigo"},
-            {"player_num": "2", "real_name": "Rotom-Frost"},
+            ("poke", 1, "Baxcalibur", "Baxcalibur"),
+            ("poke", 1, "Weavile", "Weavile"),
+            ("poke", 1, "Espeon", "Espeon"),
+            ("poke", 1, "Palossand", "Palossand"),
+            ("poke", 1, "Wo-Chien", "Wo-Chien"),
+            ("poke", 1, "Bellibolt", "Bellibolt"),
+            ("poke", 2, "Corviknight", "Corviknight"),
+            ("poke", 2, "Iron Thorns", "Iron Thorns"),
+            ("poke", 2, "Charizard", "Charizard"),
+            ("poke", 2, "Grafaiai", "Grafaiai"),
+            ("poke", 2, "Flamigo", "Flamigo"),
+            ("poke", 2, "Rotom-Frost", "Rotom-Frost"),
         ]
-        self.assertEqual(pf._extract_previews(self.preview_log), expected_output)
+        self.assertEqual(list(pf._iter_sightings(self.preview_log)), expected_output)
 
-    def test_extract_entrances(self):
+    def test_iter_sightings_entrances(self):
         pf = PokemonFinder(self.entrance_log)
         expected_output = [
-            {"player_num": "1", "real_name": "Espeon, M", "nickname": "Espeon"},
-            {
-                "player_num": "2",
-                "real_name": "Corviknight, M, shiny",
-                "nickname": "Corviknight",
-            },
+            ("switch", 1, "Espeon", "Espeon"),
+            ("switch", 2, "Corviknight", "Corviknight"),
         ]
-        self.assertEqual(pf._extract_entrances(self.entrance_log), expected_output)
+        self.assertEqual(list(pf._iter_sightings(self.entrance_log)), expected_output)
 
-    def test_create_pokemon_parameters(self):
-        pf = PokemonFinder(self.full_log)
-        pokemon_found = [
-            {"player_num": "1", "real_name": "charizard"},
-            {"player_num": "2", "nickname": "pikachu", "real_name": "PIKACHU"},
-        ]
+    def test_iter_sightings_forms(self):
+        log = """
+        |poke|p1|Urshifu-*, M|
+        |poke|p1|Zoroark-Hisui, M|
+        |teampreview
+        |showteam|p1|Amoonguss||AguavBerry|Regenerator|ClearSmog,Spore|||F|||50|,,,,,Fairy
+        |start
+        |drag|p1a: Urshifu|Urshifu-Rapid-Strike, M|100/100
+        |replace|p1a: ScizorHands|Zoroark-Hisui, M
+        """
         expected_output = [
-            {"player_num": "1", "nickname": "charizard", "real_name": "charizard"},
-            {"player_num": "2", "nickname": "pikachu", "real_name": "PIKACHU"},
+            ("poke", 1, "Urshifu", "Urshifu"),
+            ("poke", 1, "Zoroark", "Zoroark"),
+            ("drag", 1, "Urshifu", "Urshifu-Rapid-Strike"),
+            ("replace", 1, "ScizorHands", "Zoroark-Hisui"),
         ]
-        self.assertEqual(pf._create_pokemon_parameters(pokemon_found), expected_output)
+        self.assertEqual(list(PokemonFinder(log)._iter_sightings(log)), expected_output)
 
-    def test_create_pokemon_objects(self):
+    def test_add_to_roster(self):
         pf = PokemonFinder(self.full_log)
-        pokemon_params = [
-            {"player_num": "1", "nickname": "charizard", "real_name": "charizard"},
-            {"player_num": "2", "nickname": "pikachu", "real_name": "PIKACHU"},
-        ]
-        expected_output = [
-            Pokemon(
-                real_name="charizard",
-                nickname="charizard",
-                hp=100,
-                hp_change=None,
-                player_num="1",
-            ),
-            Pokemon(
-                real_name="PIKACHU",
-                nickname="pikachu",
-                hp=100,
-                hp_change=None,
-                player_num="2",
-            ),
-        ]
-        self.assertEqual(pf._create_pokemon_objects(pokemon_params), expected_output)
+        roster = {}
+        pf._add_to_roster(roster, 1, "charizard", "charizard")
+        pf._add_to_roster(roster, 2, "PIKACHU", "PIKACHU")
+        pikachu = roster[(2, "PIKACHU")]
+        # a nickname replaces the preview's name but not the object
+        pf._add_to_roster(roster, 2, "pikachu", "PIKACHU")
+        pf._add_to_roster(roster, 2, "PIKACHU", "PIKACHU")
 
-    def test_remove_duplicates(self):
-        pf = PokemonFinder(self.full_log)
-        mons = [
-            Pokemon(
-                real_name="charizard",
-                nickname="charizard",
-                hp=100,
-                hp_change=None,
-                player_num="1",
-            ),
-            Pokemon(
-                real_name="PIKACHU",
-                nickname="pikachu",
-                hp=100,
-                hp_change=None,
-                player_num="2",
-            ),
-            Pokemon(
-                real_name="PIKACHU",
-                nickname="pikachu",
-                hp=100,
-                hp_change=None,
-                player_num="2",
-            ),
-        ]
+        self.assertEqual(len(roster), 2)
+        self.assertIs(roster[(2, "PIKACHU")], pikachu)
+        self.assertEqual(pikachu.nickname, "pikachu")
+        self.assertEqual(
+            roster[(1, "charizard")],
+            Pokemon(real_name="charizard", nickname="charizard", player_num="1"),
+        )
 
-        found = pf._remove_duplicates(mons)
+    def test_add_to_roster_forms(self):
+        pf = PokemonFinder(self.full_log)
+        roster = {}
+        pf._add_to_roster(roster, 1, "Urshifu", "Urshifu")
+        pf._add_to_roster(roster, 2, "Urshifu", "Urshifu")
+        pf._add_to_roster(roster, 1, "Urshifu", "Urshifu-Rapid-Strike")
+        pf._add_to_roster(roster, 1, "Urshifu", "Urshifu")
 
-        self.assertTrue(len(found) == 2)
+        self.assertEqual(list(roster), [(2, "Urshifu"), (1, "Urshifu-Rapid-Strike")])
 
     def test_get_pokemon(self):
         expected_output = [
@@ -353,58 +329,6 @@ class TestPokemonFinder(unittest.TestCase):
         amoonguss = [p for p in found if "Amoonguss" in p.real_name][0]
         self.assertEqual(amoonguss.nickname, "The Big Dipper")
 
-    def test_remove_showteam(self):
-        log = """
-        |gen|9
-        |tier|[Gen 9] VGC 2023 Regulation D
-        |rule|Species Clause: Limit one of each Pokémon
-        |rule|Item Clause: Limit one of each item
-        |clearpoke
-        |poke|p1|Amoonguss, L50, F|
-        |poke|p1|Indeedee-F, L50, F|
-        |poke|p1|Armarouge, L50, M|
-        |poke|p1|Ursaluna, L50, F|
-        |poke|p1|Klefki, L50, F|
-        |poke|p1|Decidueye, L50, M|
-        |poke|p2|Iron Jugulis, L50|
-        |poke|p2|Toxtricity, L50, F|
-        |poke|p2|Chi-Yu, L50|
-        |poke|p2|Meowscarada, L50, M|
-        |poke|p2|Dondozo, L50, F|
-        |poke|p2|Tatsugiri, L50, F|
-        |teampreview|4
-        passint0theiris has agreed to open team sheets.
-        Craisans has agreed to open team sheets.
-        |showteam|p1|Amoonguss||AguavBerry|Regenerator|ClearSmog,Spore,RagePowder,StompingTantrum|||F|||50|,,,,,Fairy]Indeedee-F||PsychicSeed|PsychicSurge|TrickRoom,FollowMe,DazzlingGleam,Psychic|||F|||50|,,,,,Fairy]Armarouge||LifeOrb|FlashFire|AuraSphere,TrickRoom,HeatWave,ExpandingForce|||M|||50|,,,,,Fire]Ursaluna||FlameOrb|Guts|Protect,HeadlongRush,Facade,RockSlide|||F|||50|,,,,,Ghost]Klefki||LightClay|Prankster|TrickRoom,Reflect,LightScreen,DazzlingGleam|||F|||50|,,,,,Water]Decidueye||FocusSash|Overgrow|LeafBlade,BraveBird,Protect,KnockOff|||M|||50|,,,,,Flying
-        |showteam|p2|Iron Jugulis||BoosterEnergy|QuarkDrive|Tailwind,AirSlash,EarthPower,Taunt||||||50|,,,,,Ghost]Toxtricity||ThroatSpray|PunkRock|Boomburst,Protect,TeraBlast,Taunt|||F|||50|,,,,,Dark]Chi-Yu||ChoiceSpecs|BeadsofRuin|HeatWave,DarkPulse,Psychic,Snarl||||||50|,,,,,Ghost]Meowscarada||FocusSash|Protean|FlowerTrick,Uturn,Taunt,PlayRough|||M|||50|,,,,,Fairy]Dondozo||Leftovers|Unaware|OrderUp,WaveCrash,Protect,TeraBlast|||F|||50|,,,,,Grass]Tatsugiri||ToxicOrb|Commander|DracoMeteor,Endure,Protect,MuddyWater|||F|||50|,,,,,Grass
-        |c|☆Craisans|glhf!
-        |
-        |t:|1698443913
-        |start
-        |turn|1
-        |
-        |t:|1698443972
-        |-terastallize|p2a: Rockstar Made|Dark
-        |move|p1a: Andromeda|Follow Me|p1a: Andromeda
-        |-singleturn|p1a: Andromeda|move: Follow Me
-        |move|p2b: What the Grouper?|Dark Pulse|p1a: Andromeda
-        |-supereffective|p1a: Andromeda
-        |-damage|p1a: Andromeda|0 fnt
-        |faint|p1a: Andromeda
-        |move|p2a: Rockstar Made|Tera Blast|p1b: Orion|[anim] Tera Blast Dark
-        |-supereffective|p1b: Orion
-        |-damage|p1b: Orion|0 fnt
-        |faint|p1b: Orion
-        |
-        |upkeep
-        |
-        |t:|1698443986
-        |switch|p1a: The Big Dipper|Amoonguss, L50, F|100/100
-        |switch|p1b: Ursa Major|Ursaluna, L50, F|100/100
-        """
-        new_log = PokemonFinder(log)._remove_showteam(log)
-        self.assertTrue("showteam" not in new_log)
-
     def test_nicknames_with_apostraphes(self):
         # https://replay.pokemonshowdown.com/gen9vgc2023regulationd-1967383170
         log = """
@@ -84,6 +84,45 @@ class TestBattlePokemon(unittest.TestCase):
         self.assertEqual(pnum, expected_pnum)
         self.assertEqual(name, expected_name)
 
+    def test_get_mon_obj_matches_linear_search(self):
+        bp = BattlePokemon(self.mock_battle)
+        for mon in bp.pokemon:
+            raw_name = f"p{mon.player_num}a: {mon.nickname}"
+            expected = next(m for m in bp.pokemon if m.check_if_name_is_self(raw_name))
+            self.assertIs(bp.get_mon_obj(raw_name), expected)
+            self.assertIs(bp.get_mon_obj(f"p{mon.player_num}: {mon.nickname}"), expected)
+
+    @patch.object(PokemonFinder, "get_pokemon")
+    def test_get_mon_obj_shared_nickname(self, mock_get_pokemon):
+        # e.g. a Zoroark given the nickname of the pokemon it disguised as
+        scizor = Pokemon("Scizor", "ScizorHands", 1)
+        zoroark = Pokemon("Zoroark", "ScizorHands", 1)
+        mock_get_pokemon.return_value = [scizor, zoroark]
+        bp = BattlePokemon(self.mock_battle)
+
+        self.assertIs(bp.get_mon_obj("p1a: ScizorHands"), scizor)
+        with self.assertRaises(ValueError):
+            bp.get_mon_obj("p2a: ScizorHands")
+
+    def test_refresh_keeps_known_pokemon(self):
+        log = self.mock_battle.get_log()
+        # only the team preview, no pokemon has entered yet
+        header = log.split("|start")[0] + "|start\n"
+        bp = BattlePokemon(Mock(get_log=Mock(return_value=header)))
+        azumarill = next(mon for mon in bp.pokemon if mon.real_name == "Azumarill")
+        azumarill.update_hp(50)
+
+        bp.refresh(log)
+        self.assertEqual(len(bp.pokemon), len(BattlePokemon(self.mock_battle).pokemon))
+        # the nicknamed entrance replaces the preview mon
+        self.assertEqual(bp.get_mon_obj("p1a: Femboy IX").get_hp, 100)
+        # pokemon known before keep their objects
+        great_tusk = bp.get_mon_obj("p2a: Great Tusk")
+        bp.update_hp_for_pokemon("p2a: Great Tusk", 40)
+        bp.refresh(log)
+        self.assertIs(bp.get_mon_obj("p2a: Great Tusk"), great_tusk)
+        self.assertEqual(great_tusk.get_hp, 40)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -68,6 +68,11 @@ class TestBattleData(unittest.TestCase):
         self.assertIn("Winner", winner)
         self.assertEqual(winner["Winner"], "massivesket")
 
+    def test_parse_winner_tie(self):
+        self.battle_data.log = self.battle_data.log.replace("|win|massivesket", "|tie")
+        winner = self.battle_data._parse_winner()
+        self.assertEqual(winner["Winner"], "battle resulted in tie")
+
     def test_findall_regex(self):
         pattern = r"[0-9]+ \&rarr"
         matches = self.battle_data._findall_regex(pattern)
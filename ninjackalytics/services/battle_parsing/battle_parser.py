@@ -1,5 +1,11 @@
+import multiprocessing
+import multiprocessing.pool
+import os
+import signal
+import time
 import traceback
 import re
+from typing import Dict, Iterable, List, Optional
 from .battle_data import BattleData
 from .battle_data.battle_pokemon import BattlePokemon
 from .battle_data.battle import Battle
@@ -7,6 +13,11 @@ from .player_choices import ActionData, PivotData
 from .hp_event_handling import HpEventsHandler
 from .hp_event_handling.damage_models import DamageData
 from .hp_event_handling.heal_models import HealData
+from .battle_columns import columns_to_rows, get_table_columns
+from .header_parser import BattleHeader, HeaderParser
+
+
+REPLAY_URL = "https://replay.pokemonshowdown.com/"
 
 
 class BattleParser:
@@ -27,6 +38,7 @@ class BattleParser:
         self.general_info = None
         self.pivot_info = []
         self.action_info = []
+        self.action_columns = {"Player_Number": [], "Turn": [], "Action": []}
         self.damages_info = []
         self.heals_info = []
 
@@ -37,7 +49,9 @@ class BattleParser:
         """
         battle_info = self.battle_data.get_db_info()
         pivot_info = self.pivot_data.get_pivot_data()
-        action_info = self.action_data.get_action_data()
+        # the actions are found as columns, the rows are only built for the row consumers
+        action_columns = self.action_data.get_action_columns()
+        action_info = columns_to_rows(action_columns)
         self.hp_events_handler.handle_events()
         damages_info = self.hp_events_handler.get_damage_events()
         heals_info = self.hp_events_handler.get_heal_events()
@@ -46,5 +60,199 @@ class BattleParser:
         self.general_info = battle_info
         self.pivot_info = pivot_info
         self.action_info = action_info
+        self.action_columns = action_columns
         self.damages_info = damages_info
         self.heals_info = heals_info
+
+    def get_columns(self) -> Dict[str, Dict[str, list]]:
+        """
+        Returns the analyzed actions, damages, healing and pivots as columns (table name -> column
+        name -> values) instead of lists of row dictionaries. Use BattleColumns to concatenate the
+        output of many battles for a bulk insert.
+        """
+        return get_table_columns(self)
+
+    @staticmethod
+    def create_pool(workers: Optional[int] = None) -> multiprocessing.pool.Pool:
+        """
+        Creates a process pool for parse_many. Passing the same pool to several parse_many calls
+        avoids starting new worker processes for every batch.
+
+        Parameters
+        ----------
+        workers : int
+            Number of worker processes, defaults to the number of cores
+        """
+        return get_parse_context().Pool(
+            workers or os.cpu_count() or 1, initializer=init_parse_worker
+        )
+
+    @staticmethod
+    def parse_many(
+        raw_replays: Iterable[dict],
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        urls: Optional[Iterable[str]] = None,
+        pool: Optional[multiprocessing.pool.Pool] = None,
+        header_only: bool = False,
+    ) -> List["ParseResult"]:
+        """
+        Parses raw replays (the json payloads of the replay urls) on a process pool.
+
+        Parameters
+        ----------
+        raw_replays : Iterable[dict]
+            The replays to parse, each with at least the id, format and log keys
+        workers : int
+            Number of worker processes, defaults to the number of cores. With 1 worker the replays
+            are parsed in this process.
+        chunksize : int
+            Number of replays sent to a worker at a time, by default the replays are split in about
+            4 chunks per worker
+        urls : Iterable[str]
+            The url (or any other key) of every replay, stored on its result. Defaults to the
+            showdown replay url of the replay id.
+        pool : multiprocessing.pool.Pool
+            An existing pool, e.g. from create_pool, used instead of starting one (workers is then
+            ignored)
+        header_only : bool
+            Only parse the general info and teams of every replay with HeaderParser, leaving the
+            per battle tables empty
+
+        Returns
+        -------
+        List[ParseResult]
+            One result per replay, in the order of raw_replays. Failed battles have an error with
+            the message, traceback and the function that raised instead of parsed data.
+        """
+        raw_replays = list(raw_replays)
+        if urls is None:
+            urls = [f"{REPLAY_URL}{replay.get('id')}" for replay in raw_replays]
+        tasks = [(url, replay, header_only) for url, replay in zip(urls, raw_replays)]
+
+        workers = workers or os.cpu_count() or 1
+        if pool is None and (workers == 1 or len(tasks) < 2):
+            return [_parse_task(task) for task in tasks]
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (workers * 4))
+
+        if pool is not None:
+            return pool.map(_parse_task, tasks, chunksize=chunksize)
+        with BattleParser.create_pool(workers) as new_pool:
+            return new_pool.map(_parse_task, tasks, chunksize=chunksize)
+
+
+def find_function_with_error_from_traceback(tb: str) -> str:
+    """
+    Returns the name of the innermost function in a formatted traceback, skipping exception names
+    """
+    # Regex pattern to match the function name
+    pattern = r"\b(?P<function>\w+)\("
+
+    # Find all matches in the traceback
+    matches = re.findall(pattern, tb)
+
+    # The function name is the last match that does not contain "Error"
+    for match in reversed(matches):
+        if "Error" not in match:
+            return match
+
+    return None
+
+
+class BattleError:
+    """
+    A failure to fetch, parse or upload a battle, in the form stored in the errors table.
+    """
+
+    def __init__(self, message: str, traceback: str, function: Optional[str]):
+        self.message = message
+        self.traceback = traceback
+        self.function = function
+
+    @classmethod
+    def from_exception(cls, e: Exception) -> "BattleError":
+        tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+        return cls(str(e), tb, find_function_with_error_from_traceback(tb))
+
+
+class ParsedBattle:
+    """
+    The analyzed data of a BattleParser without the battle and parsing models, so it can be cheaply
+    sent back from a parse worker. It exposes the same attributes the BattleDataUploader reads from a
+    BattleParser.
+    """
+
+    def __init__(self, parser: "BattleParser"):
+        self.teams = parser.teams
+        self.general_info = parser.general_info
+        self.pivot_info = parser.pivot_info
+        self.action_info = parser.action_info
+        self.action_columns = parser.action_columns
+        self.damages_info = parser.damages_info
+        self.heals_info = parser.heals_info
+
+    def get_columns(self) -> Dict[str, Dict[str, list]]:
+        return get_table_columns(self)
+
+
+class ParseResult:
+    def __init__(
+        self,
+        url: str,
+        parsed: Optional[ParsedBattle] = None,
+        error: Optional[BattleError] = None,
+        seconds: float = 0.0,
+    ):
+        self.url = url
+        self.parsed = parsed
+        self.error = error
+        self.seconds = seconds
+
+
+def parse_replay(url: str, data: dict, header_only: bool = False) -> ParseResult:
+    """
+    Parses a fetched replay. Runs inside the parse worker processes so it must stay a module level
+    function. With header_only only the general info and teams are parsed.
+    """
+    start = time.perf_counter()
+    try:
+        if header_only:
+            parser = HeaderParser(BattleHeader.from_json(data))
+        else:
+            battle = Battle.from_json(data, url=url)
+            battle_pokemon = BattlePokemon(battle)
+            parser = BattleParser(battle, battle_pokemon)
+        parser.analyze_battle()
+        parsed = ParsedBattle(parser)
+        return ParseResult(url, parsed=parsed, seconds=time.perf_counter() - start)
+    except Exception as e:
+        return ParseResult(
+            url,
+            error=BattleError.from_exception(e),
+            seconds=time.perf_counter() - start,
+        )
+
+
+def get_parse_context() -> multiprocessing.context.BaseContext:
+    """
+    Returns the multiprocessing context every parse pool starts its workers with. Pools are
+    started while other threads may hold locks (the fetch threads' logging, urllib3 pool and SSL
+    locks, the SSH tunnel threads opened with a database session), and a forked child could
+    inherit one of them locked. forkserver (or spawn where it is not available) starts the
+    workers from a clean single threaded process instead.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def init_parse_worker() -> None:
+    # ctrl-c is handled by the pipeline in the main process, which lets the workers finish the
+    # battles they were already given
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _parse_task(task: tuple) -> ParseResult:
+    url, data, header_only = task
+    return parse_replay(url, data, header_only)
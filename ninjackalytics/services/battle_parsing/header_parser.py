@@ -0,0 +1,107 @@
+import re
+from typing import Optional
+
+from .battle_data import BattleData
+from .battle_data.battle_pokemon import BattlePokemon
+
+
+# the lines that reveal a pokemon during the battle, needed for forms only identified once they
+# enter (e.g. Urshifu-* in the team preview)
+_ENTRANCE_PATTERN = re.compile(r"^[ \t]*\|(?:switch|drag|replace)\|.*$", re.M)
+
+# the lines that end a battle, the ratings follow them
+END_TAGS = ("|win|", "|tie\n")
+
+
+class BattleHeader:
+    """
+    The parts of a battle log needed for its general info and teams, with the same interface as
+    Battle for BattleData and BattlePokemon:
+
+    - the header (everything before |start), which holds the players and the team preview
+    - the entrance lines, from which the nicknames and identified forms are found
+    - the end of the log, from the |win| (or |tie) line on, which holds the winner and ratings
+
+    The turns and events of the battle are never built.
+    """
+
+    def __init__(self, battle_id: str, battle_format: str, log: str):
+        """
+        Parameters:
+        -----------
+        battle_id: str
+            The ID of the battle, e.g. gen9ou-1968330098
+        battle_format: str
+            The battle format, e.g. gen9ou
+        log: str
+            The full battle log
+        """
+        self._battle_id = battle_id
+        self._format = battle_format
+
+        header_end = log.find("|start\n")
+        if header_end == -1:
+            self._log = log
+            return
+        header = log[:header_end]
+
+        # the battle ends near the end of the log, so search from there
+        end_start = max(log.rfind(tag) for tag in END_TAGS)
+        if end_start < header_end:
+            end_start = len(log)
+        entrances = _ENTRANCE_PATTERN.findall(log, header_end, end_start)
+        entrance_lines = "".join(line + "\n" for line in entrances)
+        self._log = header + "|start\n" + entrance_lines + log[end_start:]
+
+    @classmethod
+    def from_json(cls, json_response: dict) -> "BattleHeader":
+        """
+        Initialize a BattleHeader from the JSON response of a replay, containing at least the id,
+        format and log keys.
+        """
+        return cls(json_response["id"], json_response["format"], json_response["log"])
+
+    def get_id(self) -> str:
+        return self._battle_id
+
+    def get_format(self) -> str:
+        return self._format
+
+    def get_log(self) -> str:
+        return self._log
+
+
+class HeaderParser:
+    """
+    Parses only the general info and teams of a battle, for consumers that do not need the damages,
+    healing, pivots and actions (scouting, deduplication, filtering by rank) or that ingest the
+    battle_info and teams tables ahead of them. It has the same attributes as BattleParser, with
+    the per battle tables left empty, so its output can be handed to ParsedBattle and
+    BattleColumns.
+
+    Uploading a header only battle stores its battle_info and teams rows. Its actions, damages,
+    healing and pivots are uploaded later with BattleDataUploader.upload_details, once the battle
+    is parsed in full.
+    """
+
+    def __init__(
+        self, battle: BattleHeader, battle_pokemon: Optional[BattlePokemon] = None
+    ):
+        self.battle = battle
+        self.battle_pokemon = battle_pokemon or BattlePokemon(self.battle)
+        self.battle_data = BattleData(self.battle, self.battle_pokemon)
+        # ------ store battle data for db ------
+        self.teams = []
+        self.general_info = None
+        self.pivot_info = []
+        self.action_info = []
+        self.action_columns = {"Player_Number": [], "Turn": [], "Action": []}
+        self.damages_info = []
+        self.heals_info = []
+
+    def analyze_battle(self) -> None:
+        """
+        Finds the general info and teams of the battle.
+        """
+        self.teams = self.battle_pokemon.teams
+        self.general_info = self.battle_data.get_db_info()
@@ -14,7 +14,16 @@ from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols imp
     Turn,
     Battle,
     BattlePokemon,
+    Event,
 )
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_line,
+)
+
+
+# source type of a damage by the kind of its [from], no [from] means a move did the damage. Any
+# other kind is a status, hazard or passive depending on the full [from] value.
+FROM_KIND_SOURCE_TYPES = {None: "move", "item": "item", "ability": "ability"}
 
 
 class DamageData:
@@ -32,8 +41,32 @@ class DamageData:
             "status": self.status_hazard_data_finder,
             "hazard": self.status_hazard_data_finder,
         }
+        # [from] values that are statuses or hazards, anything else is passive
+        statuses = self.status_hazard_data_finder.statuses
+        hazards = self.status_hazard_data_finder.hazards
+        self.from_source_types = {
+            **{status: "status" for status in statuses},
+            **{hazard: "hazard" for hazard in hazards},
+        }
         self.damage_events = []
 
+    def handle_event(self, event: Event, turn: Turn) -> None:
+        """
+        Stores the data of a tokenized damage event in self.damage_events, routing it with its
+        precomputed [from] kind instead of rescanning its text.
+
+        Parameters:
+        -----------
+        event: Event
+            The tokenized -damage event
+        turn: Turn
+            The turn the event occurred on.
+        """
+        source_data_finder = self._get_source_data_finder(self._get_source_type(event))
+        damage_dict = source_data_finder.get_damage_data(event.text, turn, self.battle)
+
+        self.damage_events.append(damage_dict)
+
     def get_damage_data(self, event: str, turn: Turn) -> None:
         """
         Stores an event's data in the self.damage_events list. This is because heals and damages must be done
@@ -65,30 +98,17 @@ class DamageData:
         ---
         """
 
-        source_type = self._get_source_type(event)
-        source_data_finder = self._get_source_data_finder(source_type)
-        damage_dict = source_data_finder.get_damage_data(event, turn, self.battle)
+        self.handle_event(tokenize_line(event, turn=turn.number), turn)
 
-        self.damage_events.append(damage_dict)
-
-    def _get_source_type(self, event: str) -> str:
-        if "[from]" not in event:
-            return "move"
-        elif "[from] item:" in event:
-            return "item"
-        elif "[from] ability:" in event:
-            return "ability"
-        elif "[from]" in event:
-            # need to check for status, hazard, or passive
-            source = event.split("[from] ")[1]
-            if source in self.status_hazard_data_finder.statuses:
-                return "status"
-            elif source in self.status_hazard_data_finder.hazards:
-                return "hazard"
-            else:
-                return "passive"
-        else:
-            raise Exception("Unknown source type")
+    def _get_source_type(self, event: Event) -> str:
+        """
+        Returns the key of the source data finder for a damage event, e.g.
+        |-damage|p2a: Garchomp|88/100|[from] item: Rocky Helmet|[of] p1a: Ferrothorn -> item
+        """
+        source_type = FROM_KIND_SOURCE_TYPES.get(event.from_kind)
+        if source_type is None:
+            source_type = self.from_source_types.get(event.kwargs["from"], "passive")
+        return source_type
 
     def _get_source_data_finder(self, source_type: str) -> DamageDataFinder:
         return self.source_routing[source_type]
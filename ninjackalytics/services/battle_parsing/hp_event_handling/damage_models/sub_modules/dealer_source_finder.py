@@ -1,10 +1,12 @@
-from typing import Dict, Tuple, List, Protocol
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Tuple, List, Optional, Protocol
 import re
 
 # =================== IMPORT PROTOCOLS ===================
 from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols import (
     Battle,
     BattlePokemon,
+    Event,
     Turn,
 )
 
@@ -12,6 +14,205 @@ from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols imp
 # =================== DEFINE MODEL ===================
 
 
+# the number of turns after their use that delayed moves (Future Sight, Doom Desire) land
+DELAYED_TURNS = 2
+
+
+class _TurnIndex:
+    def __init__(
+        self,
+        turn: Turn,
+        move_patterns: Dict[str, re.Pattern],
+        get_move_type: Callable[[str], Optional[str]],
+    ):
+        """
+        Pre-indexes the lines of a turn so the text before any event, the most recent move type
+        indicator before it and the pattern matches before it are all looked up by line position
+        instead of being rebuilt / rescanned for every damage event of the turn.
+
+        Parameters
+        ----------
+        turn : Turn
+            the turn to index
+        move_patterns : Dict[str, re.Pattern]
+            the DealerSourceFinder move patterns, each is run over the turn at most once (again
+            once the turn grew)
+        get_move_type : Callable[[str], Optional[str]]
+            returns the move type indicated by a line, if any
+        """
+        self.turn = turn
+        self.move_patterns = move_patterns
+        self._get_line_move_type = get_move_type
+
+        # the turn text indexed so far
+        self.source = ""
+        # the same text _get_pre_event_text used to build, so the prefix of any event is a slice
+        self.text = ""
+        self.offsets = [0]
+        # first position of each line, events that are not found use the end of the turn
+        self.positions = {}
+        # move type of the most recent indicator before each position
+        self.move_types = [None]
+        self.end = 0
+        self._matches = {}
+        self._range = turn.source_range()
+        source, start, end = self._range
+        self._add_source(source[start:end])
+
+    def _add_source(self, source: str) -> None:
+        # indexes the lines of source, appended to the turn text indexed so far
+        lines = source.splitlines()
+        self.source += source
+        self.text += "".join(line + "\n" for line in lines)
+
+        move_type = self.move_types.pop()
+        for line in lines:
+            self.positions.setdefault(line, self.end)
+            self.move_types.append(move_type)
+            move_type = self._get_line_move_type(line) or move_type
+            self.offsets.append(self.offsets[-1] + len(line) + 1)
+            self.end += 1
+        self.move_types.append(move_type)
+        # the patterns are run over the grown text once they are needed again
+        self._matches = {}
+
+    def is_for(self, turn: Turn) -> bool:
+        # Turn.text is sliced from the log on every access, so the range of the log it covers is
+        # compared instead
+        if turn is not self.turn:
+            return False
+        source, start, end = turn.source_range()
+        indexed_source, indexed_start, indexed_end = self._range
+        return source is indexed_source and start == indexed_start and end == indexed_end
+
+    def extend(self, turn: Turn) -> bool:
+        """
+        Indexes the lines a turn gained since it was indexed, e.g. the current turn of a streamed
+        battle that keeps growing as its lines arrive.
+
+        Returns
+        -------
+        bool
+            False if the turn did not only grow by whole lines, it has to be indexed again
+        """
+        if turn is not self.turn or (self.source and not self.source.endswith("\n")):
+            return False
+        source, start, end = turn.source_range()
+        new_start = start + len(self.source)
+        if new_start >= end or not source.startswith(self.source, start):
+            return False
+        self._add_source(source[new_start:end])
+        self._range = (source, start, end)
+        return True
+
+    def get_position(self, event: str) -> int:
+        return self.positions.get(event, self.end)
+
+    def get_pre_event_text(self, event: str) -> str:
+        return self.text[: self.offsets[self.get_position(event)]]
+
+    def get_move_type(self, event: str) -> Optional[str]:
+        return self.move_types[self.get_position(event)]
+
+    def get_matches(self, pattern_name: str, event: str) -> List[re.Match]:
+        """
+        Returns the matches of a move pattern in the text before the event, in order. These are
+        the same matches re.finditer would return on the pre event text.
+        """
+        if pattern_name not in self._matches:
+            matches = list(self.move_patterns[pattern_name].finditer(self.text))
+            self._matches[pattern_name] = (matches, [m.end() for m in matches])
+        matches, ends = self._matches[pattern_name]
+
+        offset = self.offsets[self.get_position(event)]
+        count = bisect_right(ends, offset)
+        if count < len(matches) and matches[count].start() < offset:
+            # a match runs across the event line, only scanning the prefix gives its truncated form
+            return list(self.move_patterns[pattern_name].finditer(self.text[:offset]))
+        return matches[:count]
+
+
+class _MoveIndex:
+    def __init__(self, battle: Battle):
+        """
+        Indexes every |move| event of a battle by move name, from the battle's event stream, so
+        delayed moves (Future Sight, Doom Desire) are attributed with a lookup instead of scanning
+        every turn of the battle for every delayed damage event.
+
+        Parameters
+        ----------
+        battle : Battle
+            the battle to index
+        """
+        self.battle = battle
+        events = battle.get_events()
+        # identifies the events indexed, the stream of a battle still being played keeps growing
+        self.stream_state = self._get_stream_state(events)
+        # move name -> the |move| events using it, in battle order
+        self.uses = {}
+        # turn number -> stream index of the first event of the turn
+        self.turn_starts = {}
+        for event in events:
+            self.turn_starts.setdefault(event.turn, event.index)
+            if event.tag == "move" and len(event.args) > 1:
+                self.uses.setdefault(event.args[1], []).append(event)
+        self._use_indexes = {
+            move: [use.index for use in uses] for move, uses in self.uses.items()
+        }
+        self._use_turns = {
+            move: [use.turn for use in uses] for move, uses in self.uses.items()
+        }
+
+    @staticmethod
+    def _get_stream_state(events: List[Event]) -> Tuple[int, Optional[int]]:
+        return len(events), events[-1].index if events else None
+
+    def is_for(self, battle: Battle) -> bool:
+        return self.battle is battle and self.stream_state == self._get_stream_state(
+            battle.get_events()
+        )
+
+    def get_last_use(self, move: str, turn: Turn, receiver: str) -> Optional[Event]:
+        """
+        Returns the use of a delayed move that lands in the given turn. Delayed moves land
+        DELAYED_TURNS turns after they are used, so the uses of that turn come first: the one that
+        targeted the receiver, then one that targeted the receiver's side, otherwise the first one.
+        When the move was not used in that turn (e.g. a log missing turns), the most recent earlier
+        use that targeted the receiver's side is returned, otherwise the most recent earlier use.
+        """
+        uses = self.uses.get(move)
+        if not uses:
+            return None
+        turn_start = self.turn_starts.get(turn.number)
+        count = (
+            len(uses)
+            if turn_start is None
+            else bisect_left(self._use_indexes[move], turn_start)
+        )
+        if count == 0:
+            return None
+
+        side = receiver[:2]
+        use_turns = self._use_turns[move]
+        delayed_turn = turn.number - DELAYED_TURNS
+        first = bisect_left(use_turns, delayed_turn, 0, count)
+        last = bisect_right(use_turns, delayed_turn, first, count)
+        candidates = uses[first:last]
+        if candidates:
+            return next(
+                (use for use in candidates if use.target == receiver),
+                next(
+                    (use for use in candidates if (use.target or "")[:2] == side),
+                    candidates[0],
+                ),
+            )
+
+        earlier = uses[count - 1 :: -1]
+        return next(
+            (use for use in earlier if (use.target or "")[:2] == side), earlier[0]
+        )
+
+
 class DealerSourceFinder:
     def __init__(self, battle_pokemon: BattlePokemon):
         self.battle_pokemon = battle_pokemon
@@ -41,6 +242,8 @@ class DealerSourceFinder:
             "anim": self._get_animated_dealer_and_source,
             "curse": self._get_ghost_curse_dealer_and_source,
         }
+        self._turn_index = None
+        self._move_index = None
 
     def get_dealer_and_source(
         self, event: str, turn: Turn, battle: Battle
@@ -51,16 +254,7 @@ class DealerSourceFinder:
                 event=event, turn=turn, battle=battle
             )
         # look for the most recent move type indicator in the turn lines right before the event
-        pre_event_text = self._get_pre_event_text(event=event, turn=turn)
-        previous_turn_lines = reversed(pre_event_text.splitlines())
-        move_type = next(
-            (
-                move_type
-                for line in previous_turn_lines
-                if (move_type := self._get_move_type(line)) is not None
-            ),
-            None,
-        )
+        move_type = self._get_turn_index(turn).get_move_type(event)
 
         if move_type not in self.move_type_methods:
             raise ValueError(f"Unable to determine move type for event: {event}")
@@ -105,10 +299,7 @@ class DealerSourceFinder:
         |move|p2a: Blissey|Seismic Toss|p1a: Cuss-Tran
         |-damage|p1a: Cuss-Tran|67/100
         """
-        pre_event_text = self._get_pre_event_text(event=event, turn=turn)
-        matches = reversed(
-            list(re.finditer(self.move_patterns["normal"], pre_event_text))
-        )
+        matches = reversed(self._get_matches("normal", event, turn))
         receiver_raw = self._get_receiver_raw_from_event(event)
 
         match = self._get_match(matches, receiver_raw)
@@ -157,17 +348,13 @@ class DealerSourceFinder:
             raise ValueError(f"Could not find |-end| indicator for event: {event}")
         source_name = end_event.group("source")
 
-        # find dealer name (indicated by -start) where source name is the same
-        start_events = [
-            event
-            for turn in reversed(battle.get_turns())
-            for event in re.finditer(self.move_patterns["delayed"], turn.text)
-            if event.group("source") == source_name
-        ]
-        start_event = next(iter(start_events), None)
+        # find dealer name (indicated by the |move| that started it) where source name is the same
+        start_event = self._get_move_index(battle).get_last_use(
+            source_name, turn, end_event.group("receiver")
+        )
         if not start_event:
             raise ValueError(f"Could not find |-start| indicator for event: {event}")
-        dealer = self.battle_pokemon.get_pnum_and_name(start_event.group("dealer"))
+        dealer = self.battle_pokemon.get_pnum_and_name(start_event.actor)
 
         return dealer, source_name
 
@@ -186,10 +373,7 @@ class DealerSourceFinder:
         |-anim|p1b: Dragapult|Dragon Darts|p2b: Incineroar
         |-damage|p2b: Incineroar|31/100
         """
-        pre_event_text = self._get_pre_event_text(event=event, turn=turn)
-        matches = reversed(
-            list(re.finditer(self.move_patterns["anim"], pre_event_text))
-        )
+        matches = reversed(self._get_matches("anim", event, turn))
         receiver_raw = self._get_receiver_raw_from_event(event)
         match = self._get_match(matches, receiver_raw)
         if match:
@@ -218,10 +402,7 @@ class DealerSourceFinder:
         *we assume that by this point the move must be a spread move and that move must be the source of
         the current damage event*
         """
-        pre_event_text = self._get_pre_event_text(event=event, turn=turn)
-        matches = reversed(
-            list(re.finditer(self.move_patterns["spread"], pre_event_text))
-        )
+        matches = reversed(self._get_matches("spread", event, turn))
         # spread moves hit all enemies and thus we can't rely on the receiver of this damage event
         match = next((m for m in matches), None)
 
@@ -248,10 +429,7 @@ class DealerSourceFinder:
         |-start|p2a: Ursaluna|Curse|[of] p1a: Dragapult
         |-damage|p1a: Dragapult|0 fnt
         """
-        pre_event_text = self._get_pre_event_text(event=event, turn=turn)
-        matches = reversed(
-            list(re.finditer(self.move_patterns["curse"], pre_event_text))
-        )
+        matches = reversed(self._get_matches("curse", event, turn))
         receiver_raw = self._get_receiver_raw_from_event(event)
         # ghost curse is tricky as the receiver may be the dealer depending on how the damage is line is formed
         match = next(
@@ -281,6 +459,34 @@ class DealerSourceFinder:
     def _get_receiver_raw_from_event(self, event: str) -> str:
         return event.split("|")[2]
 
+    def _get_turn_index(self, turn: Turn) -> _TurnIndex:
+        """
+        Returns the index of the given turn. Damage events are handled turn by turn, so only the
+        index of the most recent turn is kept, and a turn that grew since (a streamed battle's
+        current turn) only has its new lines indexed.
+        """
+        if self._turn_index is not None and (
+            self._turn_index.is_for(turn) or self._turn_index.extend(turn)
+        ):
+            return self._turn_index
+        self._turn_index = _TurnIndex(turn, self.move_patterns, self._get_move_type)
+        return self._turn_index
+
+    def _get_move_index(self, battle: Battle) -> _MoveIndex:
+        """
+        Returns the move index of the given battle, built once per battle (or again once the
+        events of a streamed battle have changed).
+        """
+        if self._move_index is None or not self._move_index.is_for(battle):
+            self._move_index = _MoveIndex(battle)
+        return self._move_index
+
+    def _get_matches(self, pattern_name: str, event: str, turn: Turn) -> List[re.Match]:
+        """
+        Returns the matches of the named move pattern in the turn text before the event, in order.
+        """
+        return self._get_turn_index(turn).get_matches(pattern_name, event)
+
     def _get_pre_event_text(self, event: str, turn: Turn) -> str:
         """
         because it is possible for the same turn to see the same event string multiple times we need to find a way
@@ -309,12 +515,7 @@ class DealerSourceFinder:
             the text that came before the event string was found in the turn text
         """
 
-        pre_event_text = ""
-        for line in turn.text.splitlines():
-            if line == event:
-                break
-            pre_event_text += line + "\n"
-        return pre_event_text
+        return self._get_turn_index(turn).get_pre_event_text(event)
 
     def _handle_identifying_damages_to_zoroark(
         self, event: str, turn: Turn, battle: Battle
@@ -3,6 +3,10 @@ from unittest.mock import Mock
 
 # ===bring in base test utilities objects===
 from ninjackalytics.test_utilities.utils import MockBattle, MockBattlePokemon, MockTurn
+from ninjackalytics.test_utilities.preppared_battle_objects.base_battle import (
+    TestBattle,
+)
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import Turn
 
 # ===bring in object to test===
 from .dealer_source_finder import DealerSourceFinder
@@ -884,6 +888,166 @@ class TestDealerSourceFinder(unittest.TestCase):
             expected_output,
         )
 
+    def test_turn_index_matches_prefix_scan(self):
+        # the indexed lookups must agree with scanning the text before each event
+        battle = TestBattle()
+        for turn in battle.get_turns():
+            lines = turn.text.splitlines()
+            for event in set(lines):
+                pre_event_text = ""
+                for line in lines:
+                    if line == event:
+                        break
+                    pre_event_text += line + "\n"
+
+                self.assertEqual(
+                    self.move_dealer_finder._get_pre_event_text(event, turn),
+                    pre_event_text,
+                )
+                for name, pattern in self.move_dealer_finder.move_patterns.items():
+                    self.assertEqual(
+                        [
+                            m.groupdict()
+                            for m in self.move_dealer_finder._get_matches(
+                                name, event, turn
+                            )
+                        ],
+                        [m.groupdict() for m in pattern.finditer(pre_event_text)],
+                    )
+
+    def test_turn_index_is_for_log_range(self):
+        log = "|turn|1\n|move|p1a: Mew|Tackle|p2a: Ditto\n|-damage|p2a: Ditto|90/100\n"
+        turn = Turn.from_source(1, log, len("|turn|"), len(log))
+        index = self.move_dealer_finder._get_turn_index(turn)
+        self.assertTrue(index.is_for(turn))
+        # the same text in another turn, or the turn once it grew, is not the indexed turn
+        self.assertFalse(index.is_for(Turn(1, turn.text)))
+        turn.extend("|-damage|p1a: Mew|90/100\n")
+        self.assertFalse(index.is_for(turn))
+
+    def test_turn_index_extends_growing_turn(self):
+        # a streamed turn grows line by line, its index must agree with indexing it whole
+        full_turn = TestBattle().get_turns()[1]
+        lines = full_turn.text.splitlines(keepends=True)
+        turn = Turn(full_turn.number, lines[0])
+        index = self.move_dealer_finder._get_turn_index(turn)
+        for line in lines[1:]:
+            turn.extend(line)
+            # the lines are added to the same index instead of building a new one
+            self.assertIs(self.move_dealer_finder._get_turn_index(turn), index)
+
+        fresh = DealerSourceFinder(MockBattlePokemon())._get_turn_index(full_turn)
+        for attr in ("text", "offsets", "positions", "move_types", "end"):
+            self.assertEqual(getattr(index, attr), getattr(fresh, attr), attr)
+        for line in set(full_turn.text.splitlines()):
+            for name in self.move_dealer_finder.move_patterns:
+                self.assertEqual(
+                    [m.span() for m in index.get_matches(name, line)],
+                    [m.span() for m in fresh.get_matches(name, line)],
+                )
+
+    def test_delayed_move_uses_most_recent_earlier_use(self):
+        battle = MockBattle()
+        start_turn = MockTurn(
+            1,
+            """
+            |move|p2a: Slowking|Future Sight|p1a: Ninetales
+            |move|p2b: Jirachi|Doom Desire|p1b: Ferrothorn
+            |move|p2b: Jirachi|Future Sight|p1b: Ferrothorn
+            """,
+        )
+        end_turn = MockTurn(
+            3,
+            """
+            |-end|p1b: Ferrothorn|move: Future Sight
+            |-damage|p1b: Ferrothorn|44/100
+            |-end|p1a: Ninetales|move: Future Sight
+            |-damage|p1a: Ninetales|40/100
+            |move|p1a: Ninetales|Future Sight|p2a: Slowking
+            """,
+        )
+        # a later use must not be credited for damage that was already dealt
+        later_turn = MockTurn(4, "|move|p1b: Ferrothorn|Future Sight|p2a: Slowking")
+        early_turn = MockTurn(
+            0,
+            """
+            |-end|p1b: Ferrothorn|move: Doom Desire
+            |-damage|p1b: Ferrothorn|50/100
+            """,
+        )
+        battle.turns = [early_turn, start_turn, MockTurn(2, "|"), end_turn, later_turn]
+
+        # (dealer, source)
+        self.assertEqual(
+            self.move_dealer_finder._get_delayed_dealer_and_source(
+                event="|-damage|p1b: Ferrothorn|44/100", turn=end_turn, battle=battle
+            ),
+            ((2, "Jirachi"), "Future Sight"),
+        )
+        self.assertEqual(
+            self.move_dealer_finder._get_delayed_dealer_and_source(
+                event="|-damage|p1a: Ninetales|40/100", turn=end_turn, battle=battle
+            ),
+            ((2, "Slowking"), "Future Sight"),
+        )
+        # only used after the damage
+        with self.assertRaises(ValueError):
+            self.move_dealer_finder._get_delayed_dealer_and_source(
+                event="|-damage|p1b: Ferrothorn|50/100",
+                turn=early_turn,
+                battle=battle,
+            )
+
+    def test_delayed_move_used_by_both_sides_on_consecutive_turns(self):
+        battle = MockBattle()
+        turn1 = MockTurn(1, "|move|p1a: Slowking|Future Sight|p2a: Hatterene")
+        turn2 = MockTurn(2, "|move|p2a: Hatterene|Future Sight|p1a: Slowking")
+        turn3 = MockTurn(
+            3,
+            """
+            |-end|p2a: Hatterene|move: Future Sight
+            |-damage|p2a: Hatterene|60/100
+            """,
+        )
+        turn4 = MockTurn(
+            4,
+            """
+            |-end|p1a: Slowking|move: Future Sight
+            |-damage|p1a: Slowking|70/100
+            """,
+        )
+        battle.turns = [turn1, turn2, turn3, turn4]
+
+        # (dealer, source)
+        self.assertEqual(
+            self.move_dealer_finder._get_delayed_dealer_and_source(
+                event="|-damage|p2a: Hatterene|60/100", turn=turn3, battle=battle
+            ),
+            ((1, "Slowking"), "Future Sight"),
+        )
+        self.assertEqual(
+            self.move_dealer_finder._get_delayed_dealer_and_source(
+                event="|-damage|p1a: Slowking|70/100", turn=turn4, battle=battle
+            ),
+            ((2, "Hatterene"), "Future Sight"),
+        )
+
+    def test_turn_index_match_across_event_line(self):
+        # a malformed move line lets the pattern run into the event line
+        turn = MockTurn(
+            1,
+            """
+            |move|p1a: Ditto|Struggle
+            |-damage|p2a: Mew|50/100
+            """,
+        )
+        self.assertEqual(
+            self.move_dealer_finder._get_matches(
+                "normal", "|-damage|p2a: Mew|50/100", turn
+            ),
+            [],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,9 @@ from ninjackalytics.test_utilities.utils import MockBattle, MockBattlePokemon, M
 
 # ===bring in object to test===
 from .damages import DamageData
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_line,
+)
 
 
 class TestDamageData(unittest.TestCase):
@@ -120,6 +123,31 @@ class TestDamageData(unittest.TestCase):
         self.assertEqual(dmg_data["Turn"], 1)
         self.assertEqual(dmg_data["Type"], "Passive")
 
+    def test_get_source_type(self):
+        events = {
+            "|-damage|p1a: Cuss-Tran|67/100": "move",
+            "|-damage|p2a: BrainCell|50/100|[from] item: Life Orb": "item",
+            "|-damage|p2a: Garchomp|88/100|[from] ability: Rough Skin|[of] p1a: X": (
+                "ability"
+            ),
+            "|-damage|p2a: Ferrothorn|94/100|[from] Stealth Rock": "hazard",
+            "|-damage|p1a: Rillaboom|94/100 tox|[from] psn": "status",
+            "|-damage|p1a: Rillaboom|88/100|[from] Leech Seed|[of] p2a: X": "passive",
+            "|-damage|p1a: Rillaboom|88/100|[from] move: Curse": "passive",
+        }
+        for event, source_type in events.items():
+            self.assertEqual(
+                self.damage_data._get_source_type(tokenize_line(event)),
+                source_type,
+                event,
+            )
+
+    def test_handle_event(self):
+        event = "|-damage|p2a: BrainCell|50/100|[from] item: Life Orb"
+        self.damage_data.handle_event(tokenize_line(event, turn=3), MockTurn(3, event))
+        self.assertEqual(self.damage_data.damage_events[0]["Source_Name"], "Life Orb")
+        self.assertEqual(self.damage_data.damage_events[0]["Turn"], 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -6,8 +6,12 @@ from typing import Dict, List, Tuple, Protocol
 from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols import (
     Battle,
     BattlePokemon,
+    Event,
     Turn,
 )
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_line,
+)
 
 from .sub_modules import (
     HealDataFinder,
@@ -49,10 +53,20 @@ class BattlePokemon(Protocol):
 # ============= END PROTOCOLS =============
 
 
+# source type of a -heal by the kind of its [from], kinds not listed are terrain or passive heals
+FROM_KIND_SOURCE_TYPES = {
+    "move": "move",
+    "item": "item",
+    "ability": "ability",
+    "drain": "drain move",
+}
+
+
 class HealData:
     def __init__(self, battle: Battle, battle_pokemon: BattlePokemon):
         self.battle = battle
 
+        self.battle_pokemon = battle_pokemon
         self.source_routing = {
             "move": MoveHealData(battle_pokemon),
             "passive": PassiveHealData(battle_pokemon),
@@ -88,20 +102,47 @@ class HealData:
                 - Type
         ---
         """
+        self.handle_event(tokenize_line(event, turn=turn.number), turn)
+
+    def handle_event(self, event: Event, turn: Turn) -> None:
+        """
+        Stores the heal data of a tokenized -heal or switch event in self.heal_data, routing it
+        with its tag and precomputed [from] kind instead of rescanning its text. Switches into the
+        hp the pokemon already had cannot be a Regenerator heal and are skipped outright.
+
+        Parameters
+        ----------
+        event : Event
+            - The tokenized -heal or switch event
+        turn : Turn
+            - A turn object containing the event
+        """
         source_type = self._get_source_type(event)
+        if source_type == "regenerator" and not self._is_hp_changed(event):
+            return
         source_data_finder = self._get_source_data_finder(source_type)
-        heal_dict = source_data_finder.get_heal_data(event, turn, self.battle)
+        heal_dict = source_data_finder.get_heal_data(event.text, turn, self.battle)
         if heal_dict:
             self.heal_data.append(heal_dict)
 
-    def _get_source_type(self, event: str) -> str:
+    def _is_hp_changed(self, event: Event) -> bool:
+        """
+        Checks if a pokemon switched in with a different hp than it is known to have, e.g.
+        |switch|p1a: Slowbro|Slowbro, F|90/100 after Slowbro left at 60/100
+        """
+        hp, _, max_hp = event.hp.partition(" ")[0].partition("/")
+        new_hp = float(hp) / float(max_hp) * 100
+        return new_hp != self.battle_pokemon.get_pokemon_current_hp(event.actor)
+
+    def _get_source_type(self, event: Event) -> str:
         """
-        Determines the source type of the heal.
+        Determines the source type of the heal from the event's tag and its first argument after
+        the hp.
 
         Parameters
         ----------
-        event : str
-            - The event where a |-heal| was seen.
+        event : Event
+            - The event where a |-heal| or |switch| was seen.
 
         Returns
         -------
@@ -126,30 +167,24 @@ class HealData:
         regenerator : |switch|p2a: Slowbro||100/100
         ---
         """
-        line_parts = event.split("|")
-        # start with move because it has the shortest length and will cause an IndexError if not first
-        if (
-            len(line_parts) == 4 and "switch" not in line_parts[1]
-        ):  # minimal info = move used, normal len > 4
-            heal_type = "move"
-        elif "move:" in line_parts[4]:
-            heal_type = "move"
-        elif "switch" in line_parts[1]:
-            heal_type = "regenerator"
-        elif "[silent]" in line_parts[4]:
-            heal_type = "passive"
-        elif "item:" in line_parts[4]:
-            heal_type = "item"
-        elif "ability:" in line_parts[4]:
-            heal_type = "ability"
-        elif "drain" in line_parts[4]:
-            heal_type = "drain move"
-        elif "Terrain" in line_parts[4]:
-            heal_type = "terrain"
-        else:
-            heal_type = "passive"  # this indicates something like aqua ring
-
-        return heal_type
+        if event.tag == "switch":
+            return "regenerator"
+        if len(event.args) > 2:
+            # the argument after the hp is not a bracketed one
+            return "passive"
+        if not event.kwargs:
+            # minimal info = move used, e.g. |-heal|p2a: Moltres|100/100
+            return "move"
+        if next(iter(event.kwargs)) != "from":
+            # e.g. [silent] first
+            return "passive"
+        source_type = FROM_KIND_SOURCE_TYPES.get(event.from_kind)
+        if source_type is not None:
+            return source_type
+        if "Terrain" in event.kwargs["from"]:
+            return "terrain"
+        # this indicates something like aqua ring
+        return "passive"
 
     def _get_source_data_finder(self, source_type: str) -> HealDataFinder:
         return self.source_routing[source_type]
@@ -6,6 +6,9 @@ from ninjackalytics.test_utilities.utils import MockBattlePokemon, MockTurn, Moc
 
 # ===bring in object to test===
 from . import HealData
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_line,
+)
 
 """
 NOTE: the mock battle pokemon object assumes all mons start at 100 hp. as a result, we will report the 
@@ -234,6 +237,42 @@ class TestHealData(unittest.TestCase):
         self.assertEqual(heal_data["Turn"], 15)
         self.assertEqual(heal_data["Type"], "Drain Move")
 
+    def test_get_source_type(self):
+        events = {
+            "|-heal|p2a: Bisharp|100/100|[from] item: Leftovers": "item",
+            "|-heal|p2a: Avalugg|100/100|[from] ability: Ice Body": "ability",
+            "|-heal|p2a: Moltres|100/100": "move",
+            "|-heal|p2a: Seismitoad|100/100|[from] move: Wish|[wisher] Clefable": (
+                "move"
+            ),
+            "|-heal|p2a: Venusaur|100/100|[from] drain: Giga Drain": "drain move",
+            "|-heal|p1a: Abomasnow|58/100|[from] drain|[of] p2a: Torkoal": "drain move",
+            "|-heal|p2a: Garchomp|100/100|[silent]": "passive",
+            "|-heal|p2a: Garchomp|100/100|[from] Grassy Terrain": "terrain",
+            "|-heal|p2a: Garchomp|100/100|[from] terrain: Grassy Terrain": "terrain",
+            "|-heal|p1a: Frosmoth|82/100|[from] Leech Seed": "passive",
+            "|switch|p2a: Slowbro|Slowbro, F|100/100": "regenerator",
+        }
+        for event, source_type in events.items():
+            self.assertEqual(
+                self.data_finder._get_source_type(tokenize_line(event)),
+                source_type,
+                event,
+            )
+
+    def test_switch_without_hp_change_skips_regenerator(self):
+        regenerator = Mock()
+        self.data_finder.source_routing["regenerator"] = regenerator
+        event = "|switch|p1a: Slowbro|Slowbro, F|100/100"
+        self.data_finder.handle_event(tokenize_line(event), self.regenerator_turn)
+        regenerator.get_heal_data.assert_not_called()
+
+        event = "|switch|p1a: Slowbro|Slowbro, F|90/100"
+        self.data_finder.handle_event(tokenize_line(event), self.regenerator_turn)
+        regenerator.get_heal_data.assert_called_once_with(
+            event, self.regenerator_turn, self.battle
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,9 @@
 from typing import Dict, List, Tuple, Protocol
 
 from ninjackalytics.protocols import Battle, Turn, HealData, DamageData
+from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols import (
+    Event,
+)
 
 
 class HpEventsHandler:
@@ -8,26 +11,39 @@ class HpEventsHandler:
         self.battle = battle
         self.heal_data = heal_data
         self.damage_data = damage_data
+        # event tag -> the datafinder handling it
+        self.routing = {
+            "-damage": damage_data.handle_event,
+            "-heal": heal_data.handle_event,
+            "switch": heal_data.handle_event,
+        }
 
     def handle_events(self):
         """
-        Iterates linearly through a battle's lines and checks if an hp event (damage or heal) is present.
+        Iterates linearly through a battle's events and checks if an hp event (damage or heal) is present.
         If an hp event is found, calls the corresponding datafinder to analyze the event and store the data.
         This ensures that the hp events are handled linearly such that the battle pokemon object is always
         up to date when called for a respective datafinder.
         """
-        for turn in self.battle.get_turns():
-            for line in turn.lines:
-                if self._is_damage_event(line.text):
-                    self.damage_data.get_damage_data(line.text, turn)
-                elif self._is_heal_event(line.text):
-                    self.heal_data.get_heal_data(line.text, turn)
-
-    def _is_damage_event(self, event: str) -> bool:
-        return "|-damage|" in event
-
-    def _is_heal_event(self, event: str) -> bool:
-        return "|-heal|" in event or "|switch|" in event
+        turns = self.battle.get_turns()
+        for event in self.battle.get_events():
+            self.handle_event(event, turns[event.turn])
+
+    def handle_event(self, event: Event, turn: Turn) -> None:
+        """
+        Calls the corresponding datafinder if the event is an hp event. Events must be handed over
+        in battle order, which lets a streaming parser feed them one at a time as they arrive.
+
+        Parameters
+        ----------
+        event : Event
+            The tokenized event
+        turn : Turn
+            The turn the event occurred on, it only has to contain the lines up to the event
+        """
+        handle = self.routing.get(event.tag)
+        if handle is not None:
+            handle(event, turn)
 
     def get_damage_events(self) -> List[Dict[str, str]]:
         return self.damage_data.damage_events
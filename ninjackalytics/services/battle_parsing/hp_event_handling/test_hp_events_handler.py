@@ -4,6 +4,9 @@ from unittest.mock import Mock
 
 # ===bring in object to test===
 from . import HpEventsHandler
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_line,
+)
 
 
 class TestHpEventsHandler(unittest.TestCase):
@@ -18,28 +21,45 @@ class TestHpEventsHandler(unittest.TestCase):
     def test_handle_damage_events(self):
         damage_event = "|-damage|..."
         turn = Mock()
-        line = Mock()
-        line.text = damage_event
-        turn.lines = [line]
         self.battle.get_turns.return_value = [turn]
+        self.battle.get_events.return_value = [tokenize_line(damage_event)]
 
         self.hp_events_handler.handle_events()
 
-        self.damage_data.get_damage_data.assert_called_once_with(damage_event, turn)
-        self.heal_data.get_heal_data.assert_not_called()
+        self.damage_data.handle_event.assert_called_once_with(
+            tokenize_line(damage_event), turn
+        )
+        self.heal_data.handle_event.assert_not_called()
 
     def test_handle_heal_events(self):
         heal_event = "|-heal|..."
         turn = Mock()
-        line = Mock()
-        line.text = heal_event
-        turn.lines = [line]
         self.battle.get_turns.return_value = [turn]
+        self.battle.get_events.return_value = [tokenize_line(heal_event)]
+
+        self.hp_events_handler.handle_events()
+
+        self.heal_data.handle_event.assert_called_once_with(
+            tokenize_line(heal_event), turn
+        )
+        self.damage_data.handle_event.assert_not_called()
+
+    def test_handle_switch_events(self):
+        switch_event = "|switch|p2a: Slowbro|Slowbro, F|100/100"
+        move_event = "|move|p1a: Garchomp|Earthquake|p2a: Slowbro"
+        turn = Mock()
+        self.battle.get_turns.return_value = [Mock(), turn]
+        self.battle.get_events.return_value = [
+            tokenize_line(move_event, turn=1, index=0),
+            tokenize_line(switch_event, turn=1, index=1),
+        ]
 
         self.hp_events_handler.handle_events()
 
-        self.heal_data.get_heal_data.assert_called_once_with(heal_event, turn)
-        self.damage_data.get_damage_data.assert_not_called()
+        self.heal_data.handle_event.assert_called_once_with(
+            tokenize_line(switch_event, turn=1, index=1), turn
+        )
+        self.damage_data.handle_event.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+import json
+import math
+import time
+import tracemalloc
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+
+from .battle_data import BattleData
+from .battle_data.battle import Battle
+from .battle_data.battle_pokemon import BattlePokemon
+from .player_choices import ActionData, PivotData
+from .hp_event_handling import HpEventsHandler
+from .hp_event_handling.damage_models import DamageData
+from .hp_event_handling.heal_models import HealData
+
+
+# the parsing stages, in the order BattleParser runs them. battle covers building the Battle
+# (splitting the log into turns and lines) and tokenizing its events.
+STAGES = (
+    "battle",
+    "battle_pokemon",
+    "battle_data",
+    "pivot_data",
+    "action_data",
+    "hp_events",
+)
+
+PERCENTILES = (50, 95, 99)
+
+# a stage is flagged when it gets this much slower than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+
+def get_seed_corpus() -> List[dict]:
+    """
+    Returns the replays of the prepared test battles, the corpus every benchmark run includes.
+    """
+    # imported here so the test utilities are only loaded when benchmarking
+    from ninjackalytics.test_utilities.preppared_battle_objects import (
+        battle_vars,
+        db_vars,
+    )
+
+    return [
+        {"id": module.b_id, "format": module.b_format, "log": module.log}
+        for module in (battle_vars, db_vars)
+    ]
+
+
+def get_store_corpus(store, limit: Optional[int] = None) -> List[dict]:
+    """
+    Returns up to limit replays from a ReplayStore.
+    """
+    return [store.get(battle_id) for battle_id in islice(store.battle_ids(), limit)]
+
+
+def _run_stages(replay: dict, record: Callable[[str, Callable], object]) -> None:
+    """
+    Runs a replay through each parsing stage separately, calling record(stage, function) for each
+    so the caller can time or trace it. Later stages get the objects built by earlier ones, as in
+    BattleParser.
+    """
+
+    def build_battle():
+        battle = Battle.from_json(replay)
+        battle.get_events()
+        return battle
+
+    battle = record("battle", build_battle)
+    battle_pokemon = record("battle_pokemon", lambda: BattlePokemon(battle))
+    record("battle_data", lambda: BattleData(battle, battle_pokemon).get_db_info())
+    record("pivot_data", lambda: PivotData(battle, battle_pokemon).get_pivot_data())
+    record("action_data", lambda: ActionData(battle).get_action_data())
+    record(
+        "hp_events",
+        lambda: HpEventsHandler(
+            battle,
+            HealData(battle, battle_pokemon),
+            DamageData(battle, battle_pokemon),
+        ).handle_events(),
+    )
+
+
+def time_stages(replay: dict) -> Dict[str, float]:
+    """
+    Returns the wall time, in seconds, of every stage for one replay.
+    """
+    seconds = {}
+
+    def record(stage, function):
+        start = time.perf_counter()
+        result = function()
+        seconds[stage] = time.perf_counter() - start
+        return result
+
+    _run_stages(replay, record)
+    return seconds
+
+
+def trace_stages(replay: dict) -> Dict[str, int]:
+    """
+    Returns the peak memory, in bytes, allocated by every stage for one replay. Runs separately
+    from time_stages since tracemalloc slows everything down.
+    """
+    peaks = {}
+
+    def record(stage, function):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[stage] = peak - start
+        return result
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        _run_stages(replay, record)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return peaks
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    summary = {
+        "total": sum(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = percentile(values, pct)
+    return summary
+
+
+def run_benchmark(
+    corpus: List[dict], repeat: int = 1, measure_memory: bool = True
+) -> Dict:
+    """
+    Runs every replay of the corpus through the parsing stages repeat times.
+
+    Parameters
+    ----------
+    corpus : List[dict]
+        The replays to parse, each with at least the id, format and log keys
+    repeat : int
+        How many times the corpus is parsed, more repeats give steadier percentiles
+    measure_memory : bool
+        Whether to also trace the allocations of every stage (one extra, slower pass)
+
+    Returns
+    -------
+    Dict
+        - battles: number of battles parsed
+        - battles_per_second
+        - per_battle: total / mean / p50 / p95 / p99 seconds per battle
+        - stages: for every stage, total / mean / p50 / p95 / p99 seconds and, when measured,
+          peak_bytes (the largest peak over the corpus)
+    """
+    stage_seconds = {stage: [] for stage in STAGES}
+    battle_seconds = []
+    for _ in range(repeat):
+        for replay in corpus:
+            seconds = time_stages(replay)
+            for stage, value in seconds.items():
+                stage_seconds[stage].append(value)
+            battle_seconds.append(sum(seconds.values()))
+
+    report = {
+        "battles": len(battle_seconds),
+        "battles_per_second": (
+            len(battle_seconds) / sum(battle_seconds) if sum(battle_seconds) else 0.0
+        ),
+        "per_battle": _summarize(battle_seconds),
+        "stages": {stage: _summarize(stage_seconds[stage]) for stage in STAGES},
+    }
+
+    if measure_memory:
+        for replay in corpus:
+            for stage, peak in trace_stages(replay).items():
+                stage_report = report["stages"][stage]
+                stage_report["peak_bytes"] = max(
+                    stage_report.get("peak_bytes", 0), peak
+                )
+
+    return report
+
+
+def save_baseline(report: Dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_regressions(
+    report: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+    """
+    Compares a report against a baseline report.
+
+    Parameters
+    ----------
+    report : Dict
+        The report of the current run
+    baseline : Dict
+        A report saved earlier with save_baseline
+    tolerance : float
+        The relative slowdown (or memory growth) allowed before a stage is flagged, e.g. 0.25
+
+    Returns
+    -------
+    List[str]
+        A description of every regression found, empty when there are none
+    """
+    regressions = []
+    limit = 1 + tolerance
+
+    def check(name: str, current: float, previous: float, unit: str) -> None:
+        if previous and current > previous * limit:
+            regressions.append(
+                f"{name}: {current:.6g}{unit} vs baseline {previous:.6g}{unit} "
+                f"(+{(current / previous - 1) * 100:.0f}%)"
+            )
+
+    for stage in STAGES:
+        current = report["stages"].get(stage, {})
+        previous = baseline.get("stages", {}).get(stage, {})
+        check(f"{stage} p50", current.get("p50", 0), previous.get("p50", 0), "s")
+        if "peak_bytes" in current:
+            check(
+                f"{stage} peak memory",
+                current["peak_bytes"],
+                previous.get("peak_bytes", 0),
+                "B",
+            )
+    check(
+        "per battle p50",
+        report["per_battle"]["p50"],
+        baseline.get("per_battle", {}).get("p50", 0),
+        "s",
+    )
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    """
+    Returns a human readable table of a report.
+    """
+    lines = [
+        f"{report['battles']} battles, {report['battles_per_second']:.1f} battles/s",
+        f"{'stage':<16}{'total s':>10}"
+        + "".join(f"{f'p{pct} ms':>10}" for pct in PERCENTILES)
+        + f"{'peak KiB':>10}",
+    ]
+    for stage, summary in list(report["stages"].items()) + [
+        ("per battle", report["per_battle"])
+    ]:
+        peak = summary.get("peak_bytes")
+        lines.append(
+            f"{stage:<16}{summary['total']:>10.3f}"
+            + "".join(f"{summary[f'p{pct}'] * 1000:>10.2f}" for pct in PERCENTILES)
+            + (f"{peak / 1024:>10.1f}" if peak is not None else f"{'':>10}")
+        )
+    return "\n".join(lines)
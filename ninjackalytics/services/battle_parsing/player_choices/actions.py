@@ -1,15 +1,19 @@
-from typing import List, Protocol
-import re
+from typing import Dict, List, Protocol
 
+from ..battle_columns import columns_to_rows
 
 # =================== IMPORT PROTOCOLS ===================
 from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols import (
     Battle,
     BattlePokemon,
+    Event,
     Turn,
 )
 
 
+ACTION_TAGS = ("move", "switch")
+
+
 class ActionData:
     def __init__(self, battle: Battle):
         self.battle = battle
@@ -17,79 +21,117 @@ class ActionData:
     def get_action_data(self) -> List[dict]:
         """
         Retuns a list of dictionaries containing the keys:
-        - Battle_ID
         - Player_Number
         - Turn
         - Action
 
+        Returns
+        -------
+        List[dict]
+            - A list of dictionaries containing the above mentioned keys
+        """
+        return columns_to_rows(self.get_action_columns())
+
+    def get_action_columns(self) -> Dict[str, list]:
+        """
+        Returns the action data as columns, one row per player per turn ordered by player then
+        turn, which can be handed to a bulk insert without building a dictionary per row.
+
+        Returns
+        -------
+        Dict[str, list]
+            - The Player_Number, Turn and Action columns
+        """
+        players = self._get_player_numbers()
+        turn_numbers = [turn.number for turn in self.battle.get_turns()]
+        first_actions = self._get_first_actions(self.battle.get_events())
+
+        columns = {"Player_Number": [], "Turn": [], "Action": []}
+        for player in players:
+            columns["Player_Number"].extend([player] * len(turn_numbers))
+            columns["Turn"].extend(turn_numbers)
+            columns["Action"].extend(
+                first_actions.get((turn_number, player), "incapacitated")
+                for turn_number in turn_numbers
+            )
+        return columns
+
+    def get_turn_action_data(self, turn_number: int, events: List[Event]) -> List[dict]:
+        """
+        Returns the action data of a single turn, one row per player, from the events of that
+        turn. Used when the turns of a battle arrive one at a time.
+
         Parameters
         ----------
-        battle_id : int
-            - An integer representing the battle_info.id from the database
+        turn_number : int
+            - The number of the turn
+        events : List[Event]
+            - The tokenized events of the turn
 
         Returns
         -------
         List[dict]
-            - A list of dictionaries containing the above mentioned keys
+            - Dictionaries with the same keys as get_action_data
         """
-        players = self._get_player_numbers()
-        action_data = [
+        first_actions = self._get_first_actions(events)
+        return [
             {
                 "Player_Number": player,
-                "Turn": turn.number,
-                **self._get_player_action(turn.text, player),
+                "Turn": turn_number,
+                "Action": first_actions.get((turn_number, player), "incapacitated"),
             }
-            for player in players
-            for turn in self.battle.get_turns()
+            for player in self._get_player_numbers()
         ]
-        return action_data
 
-    def _get_player_action(self, turn_text: str, player_number: int) -> dict:
+    def _get_first_actions(self, events: List[Event]) -> Dict[tuple, str]:
         """
-        Searches a turn string for a given player's action.
+        Walks the battle's events once and finds every player's first action of each turn.
 
         Parameters
         ----------
-        turn_text : str
-            - A string containing a turn from the battle log
-        player_number : int
-            - An integer representing the player number
+        events : List[Event]
+            - The tokenized events of the battle
 
         Returns
         -------
-        dict
-            - A dictionary containing the following keys:
-                - Player_Number
-                - Action
+        Dict[tuple, str]
+            - (turn number, player number) -> "move" or "switch". Players without an action in a
+            turn are missing, they were incapacitated.
         """
-        pattern = (
-            r"(\|switch\|p["
-            + str(player_number)
-            + r"]|\|move\|p["
-            + str(player_number)
-            + r"])+"
-        )
-
-        turn_info = re.findall(pattern, turn_text)
-
-        if not turn_info:
-            action = "incapacitated"
-        else:
-            # e.g. |move|p1a: -> |move|p1a: -> ["", "move", "p1a:""]
-            action = turn_info[0].split("|")[1]
-
-        return {"Player_Number": player_number, "Action": action}
+        first_actions = {}
+        for event in events:
+            # malformed actors (e.g. |move|| or a missing position) are not a player's action
+            if event.tag in ACTION_TAGS and event.actor and event.actor[1:2].isdigit():
+                # e.g. p1a: Garchomp -> 1
+                key = (event.turn, int(event.actor[1]))
+                if key not in first_actions:
+                    first_actions[key] = event.tag
+        return first_actions
 
     def _get_player_numbers(self) -> List[int]:
         """
-        Finds the number of players in the battle. Almost always going to be 2.
+        Finds the player numbers from the |player| lines of the log header. Almost always going to
+        be [1, 2]. Logs without a header fall back to the players seen acting in the battle.
 
         Returns
         -------
         List[int]
-            A list of integers representing the player numbers found
+            A sorted list of integers representing the player numbers found
         """
-        pattern = r"\|p(?P<p_num>[0-9])[A-z]"
-        player_numbers = re.findall(pattern, self.battle.get_log())
-        player_numbers = [int(x) for x in player_numbers]
-        return list(set(player_numbers))
+        log = self.battle.get_log()
+        header_end = log.find("|start\n")
+        header = log[:header_end] if header_end != -1 else log
+
+        player_numbers = set()
+        for line in header.splitlines():
+            if line.startswith("|player|p"):
+                # e.g. |player|p1|massivesket|clown|1370
+                player_numbers.add(int(line.split("|")[2][1:]))
+
+        if not player_numbers:
+            player_numbers = {
+                int(event.actor[1])
+                for event in self.battle.get_events()
+                if event.actor and event.actor[1].isdigit()
+            }
+        return sorted(player_numbers)
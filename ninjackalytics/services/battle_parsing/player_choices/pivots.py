@@ -1,10 +1,10 @@
-import re
 from typing import Dict, List, Tuple
 
 # =================== IMPORT PROTOCOLS ===================
 from ninjackalytics.protocols.battle_parsing.battle_initialization.protocols import (
     Battle,
     BattlePokemon,
+    Event,
     Turn,
 )
 
@@ -33,43 +33,32 @@ class PivotData:
         - |switch|p2a: Moustachio|Alakazam, M, shiny|252/252
         ---
         """
-        turns = self.battle.get_turns()
-        pivot_data = []
+        return [
+            self.get_pivot(event)
+            for event in self.battle.get_events()
+            if event.tag == "switch"
+        ]
 
-        for turn in turns:
-            # Extract switch events from turn text
-            switch_events = re.findall(r"\|switch\|[^|]+.*", turn.text)
-
-            for event in switch_events:
-                # Parse player number and Pokemon name from switch event
-                (
-                    player_number,
-                    pokemon_name,
-                ) = self.battle_pokemon.get_pnum_and_name(event.split("|")[2])
-
-                # Determine the source of the pivot action
-                source_name = self._get_source_name(event)
-
-                pivot_data.append(
-                    {
-                        "Pokemon_Enter": pokemon_name,
-                        "Player_Number": player_number,
-                        "Source_Name": source_name,
-                        "Turn": turn.number,
-                    }
-                )
+    def get_pivot(self, event: Event) -> Dict[str, str]:
+        """
+        Returns the pivot data of a single switch event, with the keys described in
+        get_pivot_data.
+        """
+        # Parse player number and Pokemon name from switch event
+        player_number, pokemon_name = self.battle_pokemon.get_pnum_and_name(event.actor)
 
-        return pivot_data
+        return {
+            "Pokemon_Enter": pokemon_name,
+            "Player_Number": player_number,
+            # Determine the source of the pivot action
+            "Source_Name": self._get_source_name(event),
+            "Turn": event.turn,
+        }
 
-    def _get_source_name(self, event: str) -> str:
+    def _get_source_name(self, event: Event) -> str:
         """
-        Returns the source of the pivot action based on the given event string.
-        If the event string contains a section with [from], the source name will
-        be the text following [from]. Otherwise, the source name will be "action".
+        Returns the source of the pivot action based on the given switch event.
+        If the event has a [from] argument, the source name will be its value.
+        Otherwise, the source name will be "action".
         """
-        from_match = re.search(r"\[from\] ([^\]]+)", event)
-
-        if from_match:
-            return from_match.group(1)
-        else:
-            return "action"
+        return event.kwargs.get("from") or "action"
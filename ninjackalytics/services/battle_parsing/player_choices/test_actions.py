@@ -3,6 +3,9 @@ from unittest.mock import Mock
 
 # ===bring in base test utilities objects===
 from ninjackalytics.test_utilities.utils import MockBattlePokemon, MockTurn, MockBattle
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_turns,
+)
 
 from . import ActionData
 
@@ -25,25 +28,55 @@ class TestActionData(unittest.TestCase):
     def test_get_player_numbers(self):
         self.assertEqual(self.action_data._get_player_numbers(), [1, 2])
 
-    def test_get_player_action_with_move(self):
-        turn_text = "|move|p1a: pikachu|tackle"
-        expected_output = {"Player_Number": 1, "Action": "move"}
+    def test_get_player_numbers_from_header(self):
+        self.mock_battle.log = (
+            "|player|p1|player1|1|1500\n|player|p2|player2|2|1500\n"
+            "|start\n|switch|p1a: pikachu|Pikachu|100/100\n"
+        )
+        self.assertEqual(self.action_data._get_player_numbers(), [1, 2])
+
+    def test_get_first_actions_with_move(self):
+        events = tokenize_turns([MockTurn(1, "|move|p1a: pikachu|tackle")])
+        self.assertEqual(self.action_data._get_first_actions(events), {(1, 1): "move"})
+
+    def test_get_first_actions_with_switch(self):
+        events = tokenize_turns(
+            [MockTurn(1, "|switch|p2a: charizard\n|move|p2a: charizard|fly")]
+        )
         self.assertEqual(
-            self.action_data._get_player_action(turn_text, 1), expected_output
+            self.action_data._get_first_actions(events), {(1, 2): "switch"}
         )
 
-    def test_get_player_action_with_switch(self):
-        turn_text = "|switch|p2a: charizard"
-        expected_output = {"Player_Number": 2, "Action": "switch"}
+    def test_get_first_actions_with_no_action(self):
+        events = tokenize_turns([MockTurn(1, "|-damage|p1|25/100")])
+        self.assertEqual(self.action_data._get_first_actions(events), {})
+
+    def test_get_first_actions_with_malformed_actor(self):
+        events = tokenize_turns(
+            [MockTurn(1, "|move|p1a: pikachu|tackle\n|switch|p2a: charizard")]
+        )
+        # events not built by the tokenizer may carry an actor without a player number
+        events[0] = events[0]._replace(actor="pa: pikachu")
         self.assertEqual(
-            self.action_data._get_player_action(turn_text, 2), expected_output
+            self.action_data._get_first_actions(events), {(1, 2): "switch"}
+        )
+
+    def test_get_action_data_incapacitated(self):
+        self.mock_battle.turns.append(MockTurn(4, "|move|p2a: charizard|fly"))
+        action_data = self.action_data.get_action_data()
+        self.assertIn(
+            {"Player_Number": 1, "Turn": 4, "Action": "incapacitated"}, action_data
         )
+        self.assertIn({"Player_Number": 2, "Turn": 4, "Action": "move"}, action_data)
 
-    def test_get_player_action_with_no_action(self):
-        turn_text = "|-damage|p1|25/100"
-        expected_output = {"Player_Number": 1, "Action": "incapacitated"}
+    def test_get_action_columns(self):
         self.assertEqual(
-            self.action_data._get_player_action(turn_text, 1), expected_output
+            self.action_data.get_action_columns(),
+            {
+                "Player_Number": [1, 1, 1, 2, 2, 2],
+                "Turn": [1, 2, 3, 1, 2, 3],
+                "Action": ["move", "move", "move", "switch", "move", "move"],
+            },
         )
 
     def test_get_action_data(self):
@@ -0,0 +1,327 @@
+import os
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .battle_data.battle.sub_modules import Turn, tokenize_line
+from .battle_data.battle_pokemon import BattlePokemon
+from .player_choices import ActionData, PivotData
+from .player_choices.actions import ACTION_TAGS
+from .hp_event_handling import HpEventsHandler
+from .hp_event_handling.damage_models import DamageData
+from .hp_event_handling.heal_models import HealData
+
+
+# events that reveal a pokemon, these lines are kept for the PokemonFinder
+ENTRANCE_TAGS = ("switch", "drag", "replace")
+
+# events of this many previous turns are kept, delayed moves (Future Sight, Doom Desire) land two
+# turns after they were used
+HISTORY_TURNS = 3
+
+
+class StreamingBattle:
+    """
+    A battle whose log arrives one line at a time, with the same interface as Battle for the
+    parsing models. To keep memory bounded while a battle is played only the following is kept:
+
+    - the header (everything before |start), which holds the players and the team preview
+    - the first line of every pokemon entrance, so pokemon can be found again as they are revealed
+    - the lines of the current turn
+    - the events of the current turn and the HISTORY_TURNS turns before it
+
+    Attributes:
+    -----------
+    started: bool
+        Whether the |start line was seen, hp events only occur after it
+    turn_number: int
+        The number of the current turn, 0 before |turn|1
+    """
+
+    def __init__(self, battle_id: str, battle_format: str):
+        """
+        Parameters:
+        -----------
+        battle_id: str
+            The ID of the battle, e.g. gen9ou-1968330098
+        battle_format: str
+            The battle format, e.g. gen9ou
+        """
+        self._battle_id = battle_id
+        self._format = battle_format
+        self.started = False
+        self.turn_number = 0
+        self._header = []
+        self._entrances = {}
+        self._turn = Turn(0, "")
+        # lines of the current turn not yet added to its Turn, with the number of lines seen
+        self._pending_lines = []
+        self._line_count = 0
+        self._events = []
+        self._next_index = 0
+
+    def append(self, text: str) -> Optional[object]:
+        """
+        Appends a line to the log.
+
+        Parameters:
+        -----------
+        text: str
+            The log line, without its newline
+
+        Returns:
+        --------
+        Event or None:
+            The event of the line, None for header lines and lines that only start a new turn
+        """
+        if not self.started:
+            self._header.append(text)
+            self.started = text == "|start"
+            return None
+
+        if text.startswith("|turn|"):
+            # a new turn's text starts with its number, as in Response
+            self.turn_number += 1
+            self._turn = Turn(self.turn_number, "")
+            self._pending_lines = [text[len("|turn|") :]]
+            self._line_count = 1
+            self._events = [
+                event
+                for event in self._events
+                if event.turn >= self.turn_number - HISTORY_TURNS
+            ]
+            return None
+
+        self._pending_lines.append(text)
+        self._line_count += 1
+        if text.startswith("|c|") or text.startswith("|raw|"):
+            # not part of the event stream, but still part of the turn text and line numbering
+            return None
+
+        event = tokenize_line(
+            text, self.turn_number, self._line_count, self._next_index
+        )
+        self._next_index += 1
+        self._events.append(event)
+        if event.tag in ENTRANCE_TAGS and len(event.args) > 1:
+            # the hp of an entrance changes, the pokemon and its details do not
+            self._entrances.setdefault((event.tag, event.actor, event.args[1]), text)
+        return event
+
+    @property
+    def entrance_count(self) -> int:
+        return len(self._entrances)
+
+    def get_current_turn(self) -> Turn:
+        """
+        Returns the current turn, holding the lines seen so far. The same Turn is returned for the
+        whole turn, the lines that arrived since it was last returned are appended to it.
+        """
+        if self._pending_lines:
+            self._turn.extend("".join(line + "\n" for line in self._pending_lines))
+            self._pending_lines = []
+        return self._turn
+
+    def get_turn(self, turn_num: int) -> Optional[Turn]:
+        if turn_num == self.turn_number:
+            return self.get_current_turn()
+        return None
+
+    def get_events(self) -> list:
+        return self._events
+
+    def get_id(self) -> str:
+        return self._battle_id
+
+    def get_format(self) -> str:
+        return self._format
+
+    def get_log(self) -> str:
+        """
+        Returns the header and the entrance lines seen so far, the parts of the log the pokemon
+        and player numbers are found from.
+        """
+        return "".join(
+            line + "\n" for line in self._header + list(self._entrances.values())
+        )
+
+
+class StreamingBattleParser:
+    """
+    Parses a battle while it is being played. Log lines are fed as they arrive (e.g. from
+    tail_lines or the messages of a battle room) and the damages, healing, pivots and actions are
+    returned as soon as they are known, without reparsing the growing log. The pokemon hp state
+    and the hp events handler are the same ones BattleParser uses, they are just fed one event at
+    a time.
+
+    Every record is a (table, row) tuple, where table is one of actions, damages, healing or
+    pivots and row has the same keys as the rows of BattleParser. Damages, healing and pivots are
+    returned by the line that caused them. The actions of a turn are only known once it is over,
+    so they are returned when the next turn starts, the battle ends or close is called.
+    """
+
+    def __init__(self, battle_id: str, battle_format: str):
+        """
+        Parameters
+        ----------
+        battle_id : str
+            The ID of the battle, e.g. gen9ou-1968330098
+        battle_format : str
+            The battle format, e.g. gen9ou
+        """
+        self.battle = StreamingBattle(battle_id, battle_format)
+        self.battle_pokemon = None
+        self.finished = False
+        self._turn_events = []
+        self._entrance_count = 0
+
+    def _start(self) -> None:
+        # the team preview is only complete at |start, the models are created once it is seen
+        self.battle_pokemon = BattlePokemon(self.battle)
+        self.action_data = ActionData(self.battle)
+        self.pivot_data = PivotData(self.battle, self.battle_pokemon)
+        self.damage_data = DamageData(self.battle, self.battle_pokemon)
+        self.heal_data = HealData(self.battle, self.battle_pokemon)
+        self.hp_events_handler = HpEventsHandler(
+            self.battle, self.heal_data, self.damage_data
+        )
+
+    def feed_line(self, text: str) -> List[Tuple[str, dict]]:
+        """
+        Parses a single log line.
+
+        Parameters
+        ----------
+        text : str
+            The log line, with or without its newline
+
+        Returns
+        -------
+        List[Tuple[str, dict]]
+            The records the line completed, usually none or one
+        """
+        text = text.rstrip("\n")
+        was_started = self.battle.started
+        previous_turn = self.battle.turn_number
+        event = self.battle.append(text)
+
+        if not was_started:
+            if self.battle.started:
+                self._start()
+            return []
+
+        records = []
+        if self.battle.turn_number != previous_turn:
+            records.extend(self._end_turn(previous_turn))
+        if event is None:
+            return records
+
+        if event.tag in ENTRANCE_TAGS:
+            self._refresh_pokemon()
+        if event.tag in ACTION_TAGS:
+            self._turn_events.append(event)
+        if event.tag == "switch":
+            records.append(("pivots", self.pivot_data.get_pivot(event)))
+
+        if event.tag in self.hp_events_handler.routing:
+            # only hp events read the turn, the lines are not joined for any other event
+            self.hp_events_handler.handle_event(event, self.battle.get_current_turn())
+            records.extend(self._take_hp_records())
+
+        if event.tag in ("win", "tie"):
+            records.extend(self.close())
+        return records
+
+    def feed(self, lines: Iterable[str]) -> Iterator[Tuple[str, dict]]:
+        """
+        Parses the lines of an iterable, e.g. tail_lines, yielding the records as they are found.
+        The final turn's actions are yielded once the battle ends or the lines run out.
+        """
+        for line in lines:
+            yield from self.feed_line(line)
+        yield from self.close()
+
+    def feed_message(self, message: str) -> List[Tuple[str, dict]]:
+        """
+        Parses a message of a showdown battle room, a block of log lines that starts with the
+        >room id line.
+        """
+        records = []
+        for line in message.split("\n"):
+            if line and not line.startswith(">"):
+                records.extend(self.feed_line(line))
+        return records
+
+    def close(self) -> List[Tuple[str, dict]]:
+        """
+        Ends the battle, returning the actions of the final turn. Calling it again returns
+        nothing.
+        """
+        if not self.battle.started:
+            return []
+        records = self._end_turn(self.battle.turn_number)
+        self.finished = True
+        return records
+
+    def _end_turn(self, turn_number: int) -> List[Tuple[str, dict]]:
+        if self.finished:
+            return []
+        rows = self.action_data.get_turn_action_data(turn_number, self._turn_events)
+        self._turn_events = []
+        return [("actions", row) for row in rows]
+
+    def _refresh_pokemon(self) -> None:
+        # only a new pokemon (or a new form) adds an entrance line
+        entrance_count = self.battle.entrance_count
+        if entrance_count != self._entrance_count:
+            self._entrance_count = entrance_count
+            self.battle_pokemon.refresh(self.battle.get_log())
+
+    def _take_hp_records(self) -> List[Tuple[str, dict]]:
+        records = []
+        for table, rows in (
+            ("damages", self.hp_events_handler.get_damage_events()),
+            ("healing", self.hp_events_handler.get_heal_events()),
+        ):
+            records.extend((table, row) for row in rows)
+            # handed over, the stream does not keep them
+            rows.clear()
+        return records
+
+
+def tail_lines(
+    path: str,
+    poll_interval: float = 0.5,
+    idle_timeout: Optional[float] = None,
+) -> Iterator[str]:
+    """
+    Yields the lines of a file as they are written, like tail -f. A line is only yielded once
+    its newline was written.
+
+    Parameters
+    ----------
+    path : str
+        The file to follow, e.g. a battle log being written by a local bot
+    poll_interval : float
+        Seconds between checks for new lines
+    idle_timeout : float
+        Stop once no new line was written for this many seconds, by default the file is followed
+        until the generator is closed
+    """
+    with open(path) as f:
+        partial = ""
+        last_line = time.monotonic()
+        while True:
+            chunk = f.readline()
+            if chunk:
+                partial += chunk
+                if partial.endswith("\n"):
+                    yield partial[:-1]
+                    partial = ""
+                    last_line = time.monotonic()
+                continue
+            if idle_timeout is not None and time.monotonic() - last_line > idle_timeout:
+                return
+            time.sleep(poll_interval)
+            # the file may have been truncated and rewritten, start again from its end
+            if os.path.getsize(path) < f.tell():
+                f.seek(0, os.SEEK_END)
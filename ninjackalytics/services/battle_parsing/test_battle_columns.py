@@ -0,0 +1,106 @@
+import unittest
+
+from ninjackalytics.test_utilities.preppared_battle_objects.base_battle import (
+    TestBattle,
+)
+from ninjackalytics.test_utilities.preppared_battle_objects.dash_battle import (
+    TestBattle as DashTestBattle,
+)
+from .battle_data.battle_pokemon import BattlePokemon
+from . import BattleParser
+from .battle_parser import ParsedBattle
+from .battle_columns import TABLE_COLUMNS, BattleColumns, rows_to_columns
+
+
+def get_parser(battle_class):
+    battle = battle_class()
+    parser = BattleParser(battle, BattlePokemon(battle))
+    parser.analyze_battle()
+    return parser
+
+
+class TestRowsToColumns(unittest.TestCase):
+    def test_rows_to_columns(self):
+        rows = [{"Turn": 1, "Action": "move", "Extra": 0}, {"Turn": 2}]
+        self.assertEqual(
+            rows_to_columns(rows, ["Turn", "Action"]),
+            {"Turn": [1, 2], "Action": ["move", None]},
+        )
+
+
+class TestBattleColumns(unittest.TestCase):
+    def setUp(self):
+        self.parser = get_parser(TestBattle)
+        self.dash_parser = get_parser(DashTestBattle)
+
+    def test_get_columns_matches_rows(self):
+        columns = self.parser.get_columns()
+        for table, (attr, names) in TABLE_COLUMNS.items():
+            rows = getattr(self.parser, attr)
+            self.assertEqual(
+                [dict(zip(names, row)) for row in zip(*columns[table].values())],
+                [{name: row[name] for name in names} for row in rows],
+            )
+
+    def test_actions_use_parser_columns(self):
+        # the actions are found as columns, they are not converted back from the rows
+        columns = BattleColumns([ParsedBattle(self.parser)])
+        for name, values in self.parser.action_columns.items():
+            self.assertEqual(columns.tables["actions"][name], values)
+        self.assertIs(
+            self.parser.get_columns()["actions"], self.parser.action_columns
+        )
+
+    def test_add(self):
+        columns = BattleColumns([self.parser, self.dash_parser])
+        self.assertEqual(len(columns), 2)
+        self.assertEqual(
+            columns.battle_ids(),
+            [
+                self.parser.general_info["Battle_ID"],
+                self.dash_parser.general_info["Battle_ID"],
+            ],
+        )
+        damages = columns.tables["damages"]
+        self.assertEqual(
+            len(damages["Battle_ID"]),
+            len(self.parser.damages_info) + len(self.dash_parser.damages_info),
+        )
+        # every column of a table is as long as its Battle_ID column
+        for table in columns.tables.values():
+            self.assertEqual(
+                {len(values) for values in table.values()},
+                {len(table["Battle_ID"])},
+            )
+
+    def test_add_skips_repeated_battle(self):
+        columns = BattleColumns([self.parser])
+        self.assertFalse(columns.add(self.parser))
+        self.assertEqual(len(columns), 1)
+        self.assertEqual(
+            len(columns.tables["actions"]["Battle_ID"]), len(self.parser.action_info)
+        )
+
+    def test_extend_and_select(self):
+        columns = BattleColumns([self.parser])
+        columns.extend(BattleColumns([self.parser, self.dash_parser]))
+        self.assertEqual(
+            columns.tables, BattleColumns([self.parser, self.dash_parser]).tables
+        )
+
+        dash_id = self.dash_parser.general_info["Battle_ID"]
+        selected = columns.select({dash_id})
+        self.assertEqual(selected.battle_ids(), [dash_id])
+        self.assertEqual(selected.tables, BattleColumns([self.dash_parser]).tables)
+
+    def test_to_frames(self):
+        frames = BattleColumns([self.parser]).to_frames()
+        self.assertEqual(len(frames["pivots"]), len(self.parser.pivot_info))
+        self.assertEqual(
+            list(frames["healing"].columns),
+            ["Battle_ID"] + list(TABLE_COLUMNS["healing"][1]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,10 +14,15 @@ calling the others correctly as they have already been verified.
 from ninjackalytics.test_utilities.preppared_battle_objects.base_battle import (
     TestBattle,
 )
+from ninjackalytics.test_utilities.preppared_battle_objects import battle_vars, db_vars
 from .battle_data.battle_pokemon import BattlePokemon
 
 # ===bring in object to test===
 from . import BattleParser
+from .battle_parser import (
+    find_function_with_error_from_traceback,
+    get_parse_context,
+)
 
 
 class TestBattleParser(unittest.TestCase):
@@ -36,5 +41,71 @@ class TestBattleParser(unittest.TestCase):
         self.assertTrue(True)
 
 
+class TestParseMany(unittest.TestCase):
+    def setUp(self):
+        self.replays = [
+            {"id": module.b_id, "format": module.b_format, "log": module.log}
+            for module in (battle_vars, db_vars)
+        ]
+        # no log, fails in Response
+        self.broken = {"id": "gen9ou-broken", "format": "gen9ou"}
+
+    def check_results(self, results):
+        self.assertEqual(
+            [result.url for result in results],
+            [
+                "https://replay.pokemonshowdown.com/gen9ou-1968330098",
+                "https://replay.pokemonshowdown.com/gen9ou-broken",
+                "https://replay.pokemonshowdown.com/smogtours-gen9ou-725192",
+            ],
+        )
+        self.assertIsNone(results[0].error)
+        self.assertEqual(
+            results[0].parsed.general_info["Battle_ID"], "gen9ou-1968330098"
+        )
+        self.assertEqual(results[1].error.message, "'log'")
+        self.assertEqual(
+            results[1].error.function,
+            find_function_with_error_from_traceback(results[1].error.traceback),
+        )
+        self.assertIsNotNone(results[1].error.function)
+        self.assertIn("KeyError", results[1].error.traceback)
+        self.assertIsNone(results[1].parsed)
+        self.assertEqual(
+            results[2].parsed.general_info["Battle_ID"], "smogtours-gen9ou-725192"
+        )
+
+    def test_parse_many_in_process(self):
+        results = BattleParser.parse_many(
+            [self.replays[0], self.broken, self.replays[1]], workers=1
+        )
+        self.check_results(results)
+
+    def test_parse_many_pool(self):
+        results = BattleParser.parse_many(
+            [self.replays[0], self.broken, self.replays[1]], workers=2, chunksize=1
+        )
+        self.check_results(results)
+
+    def test_parse_workers_are_not_forked(self):
+        # pools are started while fetch or SSH tunnel threads may hold locks
+        self.assertNotEqual(get_parse_context().get_start_method(), "fork")
+        with BattleParser.create_pool(1) as pool:
+            self.assertEqual(
+                pool._ctx.get_start_method(), get_parse_context().get_start_method()
+            )
+
+    def test_parse_many_shared_pool_and_urls(self):
+        with BattleParser.create_pool(2) as pool:
+            for _ in range(2):
+                results = BattleParser.parse_many(
+                    self.replays, urls=["first", "second"], pool=pool
+                )
+                self.assertEqual(
+                    [result.url for result in results], ["first", "second"]
+                )
+                self.assertTrue(all(result.error is None for result in results))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+from ninjackalytics.test_utilities.preppared_battle_objects import battle_vars, db_vars
+from .battle_data.battle import Battle
+from .battle_data.battle_pokemon import BattlePokemon
+from . import BattleParser
+from .battle_columns import BattleColumns
+from .battle_parser import ParsedBattle
+from .header_parser import BattleHeader, HeaderParser
+
+
+def get_replay(module) -> dict:
+    return {"id": module.b_id, "format": module.b_format, "log": module.log}
+
+
+def get_team_names(teams) -> list:
+    return [[(mon.nickname, mon.real_name) for mon in team.pokemon] for team in teams]
+
+
+class TestBattleHeader(unittest.TestCase):
+    def test_keeps_header_entrances_and_end(self):
+        battle = BattleHeader.from_json(get_replay(battle_vars))
+        log = battle.get_log()
+
+        self.assertEqual(battle.get_id(), battle_vars.b_id)
+        self.assertEqual(battle.get_format(), battle_vars.b_format)
+        self.assertIn("|player|p1|massivesket|clown|1370\n", log)
+        self.assertIn("|poke|p2|Slowking-Galar, F|\n", log)
+        self.assertIn("|switch|p2a: Slowking|Slowking-Galar, F|100/100\n", log)
+        self.assertTrue(log.endswith(battle_vars.log[battle_vars.log.rfind("|win|") :]))
+        # nothing of the turns other than the entrances
+        self.assertNotIn("|turn|", log)
+        self.assertNotIn("|move|", log)
+
+    def test_forms_are_found_from_entrances(self):
+        log = """
+        |player|p1|a|1|
+        |player|p2|b|2|
+        |poke|p1|Urshifu-*, M|
+        |poke|p2|Gliscor, M|
+        |start
+        |switch|p1a: Urshifu|Urshifu-Rapid-Strike, M|100/100
+        |switch|p2a: Gliscor|Gliscor, M|100/100
+        |turn|1
+        |tie
+        """
+        parser = HeaderParser(BattleHeader("gen8ou-1", "gen8ou", log))
+        parser.analyze_battle()
+        self.assertEqual(
+            get_team_names(parser.teams),
+            [[("Urshifu", "Urshifu-Rapid-Strike")], [("Gliscor", "Gliscor")]],
+        )
+        self.assertEqual(parser.general_info["Winner"], "battle resulted in tie")
+
+    def test_log_without_start(self):
+        log = "|player|p1|a|1|\n|poke|p1|Gliscor, M|\n"
+        self.assertEqual(BattleHeader("gen9ou-1", "gen9ou", log).get_log(), log)
+
+
+class TestHeaderParser(unittest.TestCase):
+    def test_matches_battle_parser(self):
+        for module in (battle_vars, db_vars):
+            replay = get_replay(module)
+            header_parser = HeaderParser(BattleHeader.from_json(replay))
+            header_parser.analyze_battle()
+            battle = Battle.from_json(replay)
+            parser = BattleParser(battle, BattlePokemon(battle))
+            parser.analyze_battle()
+
+            for info in (header_parser.general_info, parser.general_info):
+                info.pop("Date_Submitted")
+            self.assertEqual(header_parser.general_info, parser.general_info)
+            self.assertEqual(
+                get_team_names(header_parser.teams), get_team_names(parser.teams)
+            )
+            self.assertEqual(header_parser.damages_info, [])
+
+    def test_columns(self):
+        parser = HeaderParser(BattleHeader.from_json(get_replay(battle_vars)))
+        parser.analyze_battle()
+        columns = BattleColumns([ParsedBattle(parser)])
+
+        self.assertEqual(columns.battle_ids(), [battle_vars.b_id])
+        self.assertEqual(len(columns.teams[0]), 2)
+        self.assertEqual(columns.tables["damages"]["Battle_ID"], [])
+
+    def test_parse_many_header_only(self):
+        replays = [get_replay(battle_vars), get_replay(db_vars)]
+        results = BattleParser.parse_many(replays, workers=1, header_only=True)
+
+        self.assertEqual(
+            [result.parsed.general_info["Battle_ID"] for result in results],
+            [battle_vars.b_id, db_vars.b_id],
+        )
+        self.assertTrue(all(not result.parsed.action_info for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
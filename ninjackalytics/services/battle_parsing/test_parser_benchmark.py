@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from . import parser_benchmark
+
+
+class TestParserBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.corpus = parser_benchmark.get_seed_corpus()
+
+    def test_get_seed_corpus(self):
+        self.assertEqual(len(self.corpus), 2)
+        for replay in self.corpus:
+            self.assertIn("|start\n", replay["log"])
+
+    def test_time_and_trace_stages(self):
+        seconds = parser_benchmark.time_stages(self.corpus[0])
+        self.assertEqual(tuple(seconds), parser_benchmark.STAGES)
+        self.assertTrue(all(value >= 0 for value in seconds.values()))
+
+        peaks = parser_benchmark.trace_stages(self.corpus[0])
+        self.assertEqual(tuple(peaks), parser_benchmark.STAGES)
+        self.assertGreater(peaks["battle"], 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(parser_benchmark.percentile(values, 50), 50)
+        self.assertEqual(parser_benchmark.percentile(values, 95), 95)
+        self.assertEqual(parser_benchmark.percentile(values, 99), 99)
+        self.assertEqual(parser_benchmark.percentile([3.0], 99), 3.0)
+        self.assertEqual(parser_benchmark.percentile([], 50), 0.0)
+
+    def test_run_benchmark(self):
+        report = parser_benchmark.run_benchmark(self.corpus, repeat=2)
+        self.assertEqual(report["battles"], 4)
+        self.assertGreater(report["battles_per_second"], 0)
+        for stage in parser_benchmark.STAGES:
+            summary = report["stages"][stage]
+            self.assertLessEqual(summary["p50"], summary["p95"])
+            self.assertLessEqual(summary["p95"], summary["p99"])
+            self.assertIn("peak_bytes", summary)
+        self.assertIn("per battle", parser_benchmark.format_report(report))
+
+    def test_find_regressions(self):
+        report = parser_benchmark.run_benchmark(self.corpus, measure_memory=False)
+        self.assertEqual(parser_benchmark.find_regressions(report, report), [])
+
+        # a baseline twice as fast in hp_events flags that stage only
+        baseline = {
+            "per_battle": dict(report["per_battle"]),
+            "stages": {
+                stage: dict(summary) for stage, summary in report["stages"].items()
+            },
+        }
+        baseline["stages"]["hp_events"]["p50"] /= 2
+        regressions = parser_benchmark.find_regressions(
+            report, baseline, tolerance=0.5
+        )
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("hp_events p50"))
+
+    def test_save_and_load_baseline(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "baseline.json")
+            report = parser_benchmark.run_benchmark(self.corpus, measure_memory=False)
+            parser_benchmark.save_baseline(report, path)
+            self.assertEqual(parser_benchmark.load_baseline(path), report)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
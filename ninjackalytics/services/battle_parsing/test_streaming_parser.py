@@ -0,0 +1,182 @@
+import os
+import tempfile
+import unittest
+
+from ninjackalytics.test_utilities.preppared_battle_objects import battle_vars, db_vars
+from .battle_data.battle import Battle
+from .battle_data.battle_pokemon import BattlePokemon
+from . import BattleParser
+from .streaming_parser import (
+    HISTORY_TURNS,
+    StreamingBattle,
+    StreamingBattleParser,
+    tail_lines,
+)
+
+
+TABLE_ATTRIBUTES = {
+    "actions": "action_info",
+    "damages": "damages_info",
+    "healing": "heals_info",
+    "pivots": "pivot_info",
+}
+
+
+def get_rows(records):
+    rows = {table: [] for table in TABLE_ATTRIBUTES}
+    for table, row in records:
+        rows[table].append(row)
+    return rows
+
+
+class TestStreamingBattle(unittest.TestCase):
+    def test_turns_and_events(self):
+        battle = StreamingBattle(battle_vars.b_id, battle_vars.b_format)
+        for line in battle_vars.log.splitlines():
+            battle.append(line)
+        full = Battle.from_json(
+            {
+                "id": battle_vars.b_id,
+                "format": battle_vars.b_format,
+                "log": battle_vars.log,
+            }
+        )
+
+        self.assertTrue(battle.started)
+        self.assertEqual(battle.turn_number, full.get_turns()[-1].number)
+        # the current turn is the same as the one built from the whole log
+        self.assertEqual(battle.get_current_turn().text, full.get_turns()[-1].text)
+        self.assertEqual(
+            [(line.number, line.text) for line in battle.get_current_turn().lines],
+            [(line.number, line.text) for line in full.get_turns()[-1].lines],
+        )
+        self.assertIsNone(battle.get_turn(0))
+
+    def test_current_turn_grows(self):
+        battle = StreamingBattle(battle_vars.b_id, battle_vars.b_format)
+        lines = battle_vars.log.split("\n")
+        turn_2 = lines.index("|turn|2")
+        for line in lines[: turn_2 + 2]:
+            battle.append(line)
+        turn = battle.get_current_turn()
+        self.assertEqual(turn.number, 2)
+
+        battle.append(lines[turn_2 + 2])
+        # the same Turn, with the new line appended
+        self.assertIs(battle.get_current_turn(), turn)
+        self.assertTrue(turn.text.endswith(lines[turn_2 + 2] + "\n"))
+
+    def test_events_are_bounded(self):
+        battle = StreamingBattle(db_vars.b_id, db_vars.b_format)
+        for line in db_vars.log.split("\n"):
+            battle.append(line)
+        self.assertGreater(battle.turn_number, HISTORY_TURNS)
+        self.assertTrue(battle.get_events())
+        self.assertGreaterEqual(
+            min(event.turn for event in battle.get_events()),
+            battle.turn_number - HISTORY_TURNS,
+        )
+
+    def test_log_keeps_header_and_entrances(self):
+        battle = StreamingBattle(battle_vars.b_id, battle_vars.b_format)
+        for line in battle_vars.log.split("\n"):
+            battle.append(line)
+        log = battle.get_log()
+        self.assertIn("|player|p1|massivesket|clown|1370\n", log)
+        self.assertIn("|switch|p1a: Femboy IX|Azumarill, M, shiny|100/100\n", log)
+        self.assertNotIn("|move|", log)
+
+
+class TestStreamingBattleParser(unittest.TestCase):
+    def check_matches_battle_parser(self, module):
+        battle = Battle.from_json(
+            {"id": module.b_id, "format": module.b_format, "log": module.log}
+        )
+        parser = BattleParser(battle, BattlePokemon(battle))
+        parser.analyze_battle()
+
+        streaming_parser = StreamingBattleParser(module.b_id, module.b_format)
+        rows = get_rows(streaming_parser.feed(module.log.split("\n")))
+
+        for table, attr in TABLE_ATTRIBUTES.items():
+            expected = getattr(parser, attr)
+            if table == "actions":
+                # streamed turn by turn instead of player by player
+                key = lambda row: (row["Turn"], row["Player_Number"])
+                expected = sorted(expected, key=key)
+            self.assertEqual(rows[table], expected, table)
+
+    def test_matches_battle_parser(self):
+        self.check_matches_battle_parser(battle_vars)
+
+    def test_matches_battle_parser_long_battle(self):
+        self.check_matches_battle_parser(db_vars)
+
+    def test_records_are_returned_by_their_line(self):
+        streaming_parser = StreamingBattleParser(battle_vars.b_id, battle_vars.b_format)
+        lines = battle_vars.log.split("\n")
+        damage_line = lines.index("|-damage|p1a: Femboy IX|50/100")
+        for line in lines[:damage_line]:
+            streaming_parser.feed_line(line)
+
+        records = streaming_parser.feed_line(lines[damage_line])
+        self.assertEqual(len(records), 1)
+        table, row = records[0]
+        self.assertEqual(table, "damages")
+        self.assertEqual(row["Source_Name"], "Belly Drum")
+        self.assertEqual(row["Turn"], 1)
+
+    def test_actions_returned_when_turn_ends(self):
+        streaming_parser = StreamingBattleParser(battle_vars.b_id, battle_vars.b_format)
+        lines = battle_vars.log.split("\n")
+        turn_one, turn_two = lines.index("|turn|1"), lines.index("|turn|2")
+        for line in lines[: turn_one + 1]:
+            streaming_parser.feed_line(line)
+        records = [
+            record
+            for line in lines[turn_one + 1 : turn_two]
+            for record in streaming_parser.feed_line(line)
+        ]
+        self.assertNotIn("actions", [table for table, _ in records])
+
+        actions = get_rows(streaming_parser.feed_line(lines[turn_two]))["actions"]
+        self.assertEqual(
+            [(row["Player_Number"], row["Turn"]) for row in actions], [(1, 1), (2, 1)]
+        )
+        self.assertEqual(streaming_parser.close()[0][0], "actions")
+        self.assertEqual(streaming_parser.close(), [])
+
+    def test_feed_message(self):
+        streaming_parser = StreamingBattleParser(battle_vars.b_id, battle_vars.b_format)
+        records = streaming_parser.feed_message(
+            f">battle-{battle_vars.b_id}\n" + battle_vars.log
+        )
+        expected = get_rows(
+            StreamingBattleParser(battle_vars.b_id, battle_vars.b_format).feed(
+                battle_vars.log.split("\n")
+            )
+        )
+        # the replay ends with |win|, which closes the battle
+        self.assertTrue(streaming_parser.finished)
+        self.assertEqual(get_rows(records), expected)
+
+
+class TestTailLines(unittest.TestCase):
+    def test_tail_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "battle.log")
+            with open(path, "w") as f:
+                f.write("|start\n|switch|p1a: Femboy IX|Azum")
+            lines = tail_lines(path, poll_interval=0.01, idle_timeout=0.05)
+            self.assertEqual(next(lines), "|start")
+
+            with open(path, "a") as f:
+                f.write("arill, M|100/100\n")
+            # the partial line is only yielded once it is complete
+            self.assertEqual(
+                list(lines), ["|switch|p1a: Femboy IX|Azumarill, M|100/100"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
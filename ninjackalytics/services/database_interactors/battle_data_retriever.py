@@ -1,6 +1,7 @@
 from typing import Dict, List
 import pandas as pd
 from contextlib import contextmanager
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 from ninjackalytics.protocols.battle_parsing.protocols import BattleParser
 
@@ -85,15 +86,14 @@ class BattleDataRetriever:
         -------
         pd.DataFrame
             A pandas DataFrame containing information about the battle.
+
+        Raises
+        ------
+        ValueError
+            If the battle is not in the database, as for the other getters.
         """
         with session_scope(self.session_maker()) as session:
-            battle_info_db = (
-                session.query(battle_info)
-                .filter(battle_info.Battle_ID == battle_id)
-                .first()
-            )
-            df = self._drop_unwanted_attrs(pd.DataFrame([battle_info_db.__dict__]))
-            return df
+            return self._get_battle_info_df(self._get_battle_row(session, battle_id))
 
     def get_teams(self, battle_id: str) -> pd.DataFrame:
         """
@@ -110,19 +110,8 @@ class BattleDataRetriever:
             A pandas DataFrame containing information about the teams in the battle.
         """
         with session_scope(self.session_maker()) as session:
-            team1_id = session.query(battle_info.P1_team).filter(
-                battle_info.Battle_ID == battle_id
-            )
-            team2_id = session.query(battle_info.P2_team).filter(
-                battle_info.Battle_ID == battle_id
-            )
-
-            team1 = session.query(teams).filter(teams.id == team1_id).first()
-            team2 = session.query(teams).filter(teams.id == team2_id).first()
-            battle_teams = [team1, team2]
-
-            df = pd.DataFrame([team.__dict__ for team in battle_teams])
-            return self._drop_unwanted_attrs(df)
+            battle_row = self._get_battle_row(session, battle_id)
+            return self._get_teams_df(session, battle_row)
 
     def get_actions(self, battle_id: str) -> pd.DataFrame:
         """
@@ -138,11 +127,7 @@ class BattleDataRetriever:
         pd.DataFrame
             A pandas DataFrame containing information about the actions taken in the battle.
         """
-        with session_scope(self.session_maker()) as session:
-            dbid = self.get_db_id(battle_id)
-            actions_db = session.query(actions).filter(actions.Battle_ID == dbid).all()
-            df = pd.DataFrame([action.__dict__ for action in actions_db])
-            return self._drop_unwanted_attrs(df)
+        return self._get_battle_table(actions, battle_id)
 
     def get_damages(self, battle_id: str) -> pd.DataFrame:
         """
@@ -158,11 +143,7 @@ class BattleDataRetriever:
         pd.DataFrame
             A pandas DataFrame containing information about the damages dealt in the battle.
         """
-        with session_scope(self.session_maker()) as session:
-            db_id = self.get_db_id(battle_id)
-            damages_db = session.query(damages).filter(damages.Battle_ID == db_id).all()
-            df = pd.DataFrame([damage.__dict__ for damage in damages_db])
-            return self._drop_unwanted_attrs(df)
+        return self._get_battle_table(damages, battle_id)
 
     def get_healing(self, battle_id: str) -> pd.DataFrame:
         """
@@ -178,11 +159,7 @@ class BattleDataRetriever:
         pd.DataFrame
             A pandas DataFrame containing information about the healing done in the battle.
         """
-        with session_scope(self.session_maker()) as session:
-            db_id = self.get_db_id(battle_id)
-            healing_db = session.query(healing).filter(healing.Battle_ID == db_id).all()
-            df = pd.DataFrame([heal.__dict__ for heal in healing_db])
-            return self._drop_unwanted_attrs(df)
+        return self._get_battle_table(healing, battle_id)
 
     def get_pivots(self, battle_id: str) -> pd.DataFrame:
         """
@@ -198,11 +175,7 @@ class BattleDataRetriever:
         pd.DataFrame
             A pandas DataFrame containing information about the pivots in the battle.
         """
-        with session_scope(self.session_maker()) as session:
-            db_id = self.get_db_id(battle_id)
-            pivots_db = session.query(pivots).filter(pivots.Battle_ID == db_id).all()
-            df = pd.DataFrame([pivot.__dict__ for pivot in pivots_db])
-            return self._drop_unwanted_attrs(df)
+        return self._get_battle_table(pivots, battle_id)
 
     def get_db_id(self, battle_id: str) -> int:
         """
@@ -219,12 +192,64 @@ class BattleDataRetriever:
             The database ID of the battle.
         """
         with session_scope(self.session_maker()) as session:
-            battle_info_db = (
-                session.query(battle_info)
-                .filter(battle_info.Battle_ID == battle_id)
-                .first()
-            )
-            return battle_info_db.id
+            return self._get_battle_row(session, battle_id).id
+
+    def _get_battle_table(self, table: object, battle_id: str) -> pd.DataFrame:
+        """
+        Retrieves the rows of one of the per-battle tables (actions, damages, healing, pivots) for a
+        battle, resolving the battle and fetching its rows in a single session.
+        """
+        with session_scope(self.session_maker()) as session:
+            db_id = self._get_battle_row(session, battle_id).id
+            return self._get_child_df(session, table, db_id)
+
+    def _get_battle_row(self, session, battle_id: str):
+        """
+        Returns the battle_info row for a battle.
+
+        Raises
+        ------
+        ValueError
+            If the battle is not in the database.
+        """
+        battle_row = session.execute(
+            select(battle_info.__table__).where(battle_info.Battle_ID == battle_id)
+        ).first()
+        if battle_row is None:
+            raise ValueError(f"Battle {battle_id} was not found in the database")
+        return battle_row
+
+    def _get_battle_info_df(self, battle_row) -> pd.DataFrame:
+        return pd.DataFrame([battle_row], columns=list(battle_row._fields))
+
+    def _get_teams_df(self, session, battle_row) -> pd.DataFrame:
+        """
+        Returns a DataFrame with P1's team followed by P2's team. Both players may share the same
+        teams row, in which case it is repeated.
+        """
+        team_ids = [battle_row.P1_team, battle_row.P2_team]
+        result = session.execute(
+            select(teams.__table__).where(teams.id.in_(set(team_ids)))
+        )
+        columns = list(result.keys())
+        team_rows = {row.id: row for row in result}
+        return pd.DataFrame([team_rows[team_id] for team_id in team_ids], columns=columns)
+
+    def _get_child_df(self, session, table: object, db_id: int) -> pd.DataFrame:
+        return self._select_df(
+            session,
+            select(table.__table__)
+            .where(table.Battle_ID == db_id)
+            .order_by(table.id),
+        )
+
+    def _select_df(self, session, query) -> pd.DataFrame:
+        """
+        Executes a Core select and builds a DataFrame straight from the result rows, so no ORM
+        objects (or their _sa_instance_state) are created.
+        """
+        result = session.execute(query)
+        return pd.DataFrame(result.all(), columns=list(result.keys()))
 
     def _drop_unwanted_attrs(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -240,17 +265,14 @@ class BattleDataRetriever:
         pd.DataFrame
             The pandas DataFrame with unwanted attributes dropped.
         """
-        # for some reason the instance state is still getting through
         unwanted_columns = ["FAIL", "_sa_instance_state"]
-        for col in df.columns:
-            if col in unwanted_columns:
-                df.drop(columns=col)
-        return df
+        return df.drop(columns=[col for col in df.columns if col in unwanted_columns])
 
-    # TODO: ADD UNIT TESTS FOR ALL METHODS BELOW
     def get_battle_data(self, battle_id: str) -> Dict[str, pd.DataFrame]:
         """
-        Retrieves all data about a battle from the database.
+        Retrieves all data about a battle from the database. The battle is resolved once and every
+        table is then read within the same session, using a fixed number of queries (one for
+        battle_info, one for both teams and one per child table).
 
         Parameters
         ----------
@@ -262,14 +284,16 @@ class BattleDataRetriever:
         Dict[str, pd.DataFrame]
             A dictionary containing all data about the battle.
         """
-        battle_data = {}
-        battle_data["battle_info"] = self.get_battle_info(battle_id)
-        battle_data["teams"] = self.get_teams(battle_id)
-        battle_data["actions"] = self.get_actions(battle_id)
-        battle_data["damages"] = self.get_damages(battle_id)
-        battle_data["healing"] = self.get_healing(battle_id)
-        battle_data["pivots"] = self.get_pivots(battle_id)
-        return battle_data
+        with session_scope(self.session_maker()) as session:
+            battle_row = self._get_battle_row(session, battle_id)
+            battle_data = {}
+            battle_data["battle_info"] = self._get_battle_info_df(battle_row)
+            battle_data["teams"] = self._get_teams_df(session, battle_row)
+            battle_data["actions"] = self._get_child_df(session, actions, battle_row.id)
+            battle_data["damages"] = self._get_child_df(session, damages, battle_row.id)
+            battle_data["healing"] = self._get_child_df(session, healing, battle_row.id)
+            battle_data["pivots"] = self._get_child_df(session, pivots, battle_row.id)
+            return battle_data
 
     def check_if_battle_exists(self, battle_id: str) -> bool:
         """
@@ -2,11 +2,23 @@ from typing import Dict, List
 from contextlib import contextmanager
 import re
 from ninjackalytics.protocols.battle_parsing.protocols import BattleParser
+from ninjackalytics.services.battle_parsing.battle_columns import BattleColumns
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 from ninjackalytics.database import get_sessionlocal
 from ninjackalytics.database.models import *
 
 
+# the per battle tables, keyed by their name in BattleColumns.tables
+DETAIL_TABLES = {
+    "actions": actions,
+    "damages": damages,
+    "healing": healing,
+    "pivots": pivots,
+}
+
+
 @contextmanager
 def session_scope(session):
     """Provide a transactional scope around a series of operations."""
@@ -98,6 +110,32 @@ class BattleDataUploader:
         ----------
         parser : BattleParser
             An instance of the BattleParser class containing the battle data
+    upload_battles(parsers: List[BattleParser], batch_size: int = 100) -> int:
+        Uploads many parsed battles using multi-row inserts, one transaction per batch
+
+        Parameters
+        ----------
+        parsers : List[BattleParser]
+            BattleParser instances that have already analyzed their battles
+        batch_size : int
+            The number of battles written per transaction
+
+        Returns
+        -------
+        int
+            The number of battles that were newly uploaded
+    upload_columns(columns: BattleColumns) -> int:
+        Uploads the column oriented output of many battles in a single transaction
+
+        Parameters
+        ----------
+        columns : BattleColumns
+            The analyzed battles, concatenated as columns
+
+        Returns
+        -------
+        int
+            The number of battles that were newly uploaded
     """
 
     def __init__(self, *, engine: object = None):
@@ -116,7 +154,8 @@ class BattleDataUploader:
 
     def _upload_teams(self, session, teams_list: List[List[object]]) -> int:
         """
-        Uploads the teams to the database and returns the id of player 2's team
+        Uploads the teams to the database, reusing any identical composition already stored, and
+        returns the id of player 2's team
 
         Parameters
         ----------
@@ -128,24 +167,33 @@ class BattleDataUploader:
         int
             The id of player 2's team in the database
         """
-        for pnum, team in enumerate(teams_list):
-            mon_names = [mon.real_name for mon in team.pokemon]
-            mon_names.sort()
-            # create the team dictionary
-            team_dict = {}
-            for i, mon in enumerate(mon_names):
-                team_dict[f"Pok{i+1}"] = mon
-
-            team_db = teams(**team_dict)
-            session.add(team_db)
-            session.commit()
-            session.refresh(team_db)
-            if pnum == 0:
-                self.p1_team_id = team_db.id
-            else:
-                self.p2_team_id = team_db.id
+        team_rows = [self._get_team_dict(team) for team in teams_list]
+        team_ids = self._get_or_create_teams(session, team_rows)
+        self.p1_team_id = team_ids[0]
+        self.p2_team_id = team_ids[-1]
         return self.p2_team_id
 
+    def _get_team_dict(self, team: object) -> Dict[str, str]:
+        """
+        Returns the teams table row for a team, with the mon names sorted alphabetically into
+        Pok1 through Pok6 and the composition's Fingerprint
+
+        Parameters
+        ----------
+        team : object
+            A Team object containing the Pokemon objects for a player
+
+        Returns
+        -------
+        Dict[str, str]
+            A dictionary of Pok1...PokN to the real names of the mons plus Fingerprint
+        """
+        mon_names = [mon.real_name for mon in team.pokemon]
+        mon_names.sort()
+        team_dict = {f"Pok{i+1}": mon for i, mon in enumerate(mon_names)}
+        team_dict["Fingerprint"] = teams.make_fingerprint(mon_names)
+        return team_dict
+
     def _check_if_battle_exists(self, session, general_info: Dict[str, str]) -> bool:
         """
         Checks if the battle already exists in the database
@@ -274,6 +322,313 @@ class BattleDataUploader:
                 self._upload_healing(session, parser.heals_info)
                 self._upload_pivots(session, parser.pivot_info)
 
+    def upload_battles(self, parsers: List[BattleParser], batch_size: int = 100) -> int:
+        """
+        Uploads many parsed battles to the database. Each batch of battles is written in a single
+        transaction using multi-row inserts (one statement per table) instead of one ORM object and
+        commit per row. Battles already in the database, or repeated within parsers, are skipped.
+
+        If any battle in a batch fails to insert the whole batch is rolled back.
+
+        Parameters
+        ----------
+        parsers : List[BattleParser]
+            BattleParser instances that have already analyzed their battles
+        batch_size : int
+            The number of battles written per transaction
+
+        Returns
+        -------
+        int
+            The number of battles that were newly uploaded
+        """
+        uploaded = 0
+        for start in range(0, len(parsers), batch_size):
+            batch = parsers[start : start + batch_size]
+            with session_scope(self.session_maker()) as session:
+                uploaded += self._upload_battle_batch(session, batch)
+        return uploaded
+
+    def _upload_battle_batch(self, session, parsers: List[BattleParser]) -> int:
+        """
+        Writes a batch of battles within the provided session without committing
+
+        Parameters
+        ----------
+        parsers : List[BattleParser]
+            BattleParser instances that have already analyzed their battles
+
+        Returns
+        -------
+        int
+            The number of battles that were newly uploaded
+        """
+        parsers = self._get_new_parsers(session, parsers)
+        if not parsers:
+            return 0
+        return self._insert_columns(session, BattleColumns(parsers))
+
+    def upload_columns(self, columns: BattleColumns) -> int:
+        """
+        Uploads the column oriented output of many battles, e.g. BattleColumns concatenated from
+        several parse batches, in a single transaction. The per battle tables are written straight
+        from their columns with one executemany per table. Battles already in the database are
+        skipped.
+
+        Parameters
+        ----------
+        columns : BattleColumns
+            The analyzed battles, concatenated as columns
+
+        Returns
+        -------
+        int
+            The number of battles that were newly uploaded
+        """
+        with session_scope(self.session_maker()) as session:
+            existing = self._select_existing_battle_ids(session, columns.battle_ids())
+            if existing:
+                columns = columns.select(set(columns.battle_ids()) - existing)
+            if not len(columns):
+                return 0
+            return self._insert_columns(session, columns)
+
+    def _insert_columns(self, session, columns: BattleColumns) -> int:
+        """
+        Writes battles that are not yet in the database within the provided session without
+        committing
+
+        Parameters
+        ----------
+        columns : BattleColumns
+            The analyzed battles, concatenated as columns
+
+        Returns
+        -------
+        int
+            The number of battles that were uploaded
+        """
+        # ------ teams: two per battle, p1 then p2 ------
+        team_rows = [
+            self._get_team_dict(team)
+            for battle_teams in columns.teams
+            for team in battle_teams
+        ]
+        team_ids = self._get_or_create_teams(session, team_rows)
+
+        # ------ battle_info: resolve ids by the unique Battle_ID ------
+        battle_rows = []
+        for i, general_info in enumerate(columns.general_info):
+            battle_row = dict(general_info)
+            battle_row["P1_team"] = team_ids[2 * i]
+            battle_row["P2_team"] = team_ids[2 * i + 1]
+            battle_rows.append(battle_row)
+        session.execute(insert(battle_info), battle_rows)
+
+        db_ids = self._select_db_ids(session, columns.battle_ids())
+
+        # ------ child tables: one executemany per table ------
+        self._insert_detail_columns(session, columns, db_ids)
+        return len(columns)
+
+    def upload_details(self, columns: BattleColumns) -> int:
+        """
+        Uploads the actions, damages, healing and pivots of battles whose general info and teams
+        are already stored, e.g. battles ingested ahead with HeaderParser and parsed in full later.
+        Battles that are not in battle_info, or that already have rows in any of these tables, are
+        skipped.
+
+        Parameters
+        ----------
+        columns : BattleColumns
+            The fully analyzed battles, concatenated as columns
+
+        Returns
+        -------
+        int
+            The number of battles whose details were uploaded
+        """
+        with session_scope(self.session_maker()) as session:
+            db_ids = self._select_db_ids(session, columns.battle_ids())
+            with_details = self._select_battles_with_details(
+                session, set(db_ids.values())
+            )
+            battle_ids = {
+                battle_id
+                for battle_id, db_id in db_ids.items()
+                if db_id not in with_details
+            }
+            if not battle_ids:
+                return 0
+            columns = columns.select(battle_ids)
+            self._insert_detail_columns(session, columns, db_ids)
+            return len(columns)
+
+    def _insert_detail_columns(
+        self, session, columns: BattleColumns, db_ids: Dict[str, int]
+    ) -> None:
+        """
+        Writes the per battle tables of battles already in battle_info within the provided session
+        without committing, one executemany per table
+
+        Parameters
+        ----------
+        columns : BattleColumns
+            The analyzed battles, concatenated as columns
+        db_ids : Dict[str, int]
+            Battle_ID -> battle_info.id of every battle in columns
+        """
+        for name, table in DETAIL_TABLES.items():
+            table_columns = dict(columns.tables[name])
+            table_columns["Battle_ID"] = [
+                db_ids[battle_id] for battle_id in table_columns["Battle_ID"]
+            ]
+            self._execute_columns(session, table, table_columns)
+
+    def _execute_columns(self, session, table, columns: Dict[str, list]) -> None:
+        """
+        Inserts a dictionary of columns into table with a single executemany. With a positional
+        driver (sqlite, mysqlclient) the rows are sent as tuples zipped from the columns, without
+        building a dictionary per row. Every column is first passed through the bind processor of
+        its column type (e.g. Decimal to float on sqlite), as a Core insert would.
+        """
+        if not columns["Battle_ID"]:
+            return
+        connection = session.connection()
+        dialect = connection.dialect
+        statement = insert(table)
+        compiled = statement.compile(dialect=dialect, column_keys=list(columns))
+        if compiled.positiontup is None:
+            rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+            session.execute(statement, rows)
+            return
+
+        values = []
+        for key in compiled.positiontup:
+            column_type = statement.table.c[key].type
+            processor = column_type.dialect_impl(dialect).bind_processor(dialect)
+            if processor is None:
+                values.append(columns[key])
+            else:
+                values.append([processor(value) for value in columns[key]])
+        connection.exec_driver_sql(compiled.string, list(zip(*values)))
+
+    def _get_new_parsers(
+        self, session, parsers: List[BattleParser]
+    ) -> List[BattleParser]:
+        """
+        Returns only the parsers whose battles are not yet in the database, dropping repeats of the
+        same Battle_ID within parsers
+        """
+        existing = self._select_existing_battle_ids(
+            session, [parser.general_info["Battle_ID"] for parser in parsers]
+        )
+        new_parsers = []
+        for parser in parsers:
+            battle_id = parser.general_info["Battle_ID"]
+            if battle_id not in existing:
+                existing.add(battle_id)
+                new_parsers.append(parser)
+        return new_parsers
+
+    def _select_existing_battle_ids(self, session, battle_ids: List[str]) -> set:
+        """
+        Returns the battle_ids that are already stored in battle_info
+        """
+        return set(
+            session.execute(
+                select(battle_info.Battle_ID).where(
+                    battle_info.Battle_ID.in_(set(battle_ids))
+                )
+            ).scalars()
+        )
+
+    def _select_db_ids(self, session, battle_ids: List[str]) -> Dict[str, int]:
+        """
+        Returns a dictionary of Battle_ID to battle_info.id for the battle_ids already stored
+        """
+        return dict(
+            session.execute(
+                select(battle_info.Battle_ID, battle_info.id).where(
+                    battle_info.Battle_ID.in_(set(battle_ids))
+                )
+            ).all()
+        )
+
+    def _select_battles_with_details(self, session, db_ids: set) -> set:
+        """
+        Returns the battle_info ids in db_ids that have rows in any of the per battle tables
+        """
+        with_details = set()
+        for table in DETAIL_TABLES.values():
+            with_details.update(
+                session.execute(
+                    select(table.Battle_ID).where(table.Battle_ID.in_(db_ids)).distinct()
+                ).scalars()
+            )
+        return with_details
+
+    def _get_or_create_teams(
+        self, session, team_rows: List[Dict[str, str]]
+    ) -> List[int]:
+        """
+        Returns the ids of the teams in team_rows, in the same order, inserting only the compositions
+        that are not already stored. Existing teams are looked up by Fingerprint in one query and the
+        missing ones are written with a single multi-row insert.
+
+        If a concurrent writer stores one of the same compositions first, the unique index on
+        Fingerprint rejects the batch insert; the missing teams are then inserted one at a time, each
+        in its own savepoint, and any that collide are simply read back.
+
+        Parameters
+        ----------
+        team_rows : List[Dict[str, str]]
+            teams table rows as returned by _get_team_dict
+
+        Returns
+        -------
+        List[int]
+            The teams.id of each row in team_rows
+        """
+        team_ids = self._select_team_ids(
+            session, {row["Fingerprint"] for row in team_rows}
+        )
+        missing = {
+            row["Fingerprint"]: row
+            for row in team_rows
+            if row["Fingerprint"] not in team_ids
+        }
+        if missing:
+            try:
+                with session.begin_nested():
+                    session.execute(insert(teams), list(missing.values()))
+            except IntegrityError:
+                for row in missing.values():
+                    try:
+                        with session.begin_nested():
+                            session.execute(insert(teams), [row])
+                    except IntegrityError:
+                        continue
+            # locking read so rows committed by another writer after our first read are visible
+            team_ids.update(
+                self._select_team_ids(session, set(missing), for_update=True)
+            )
+
+        return [team_ids[row["Fingerprint"]] for row in team_rows]
+
+    def _select_team_ids(
+        self, session, fingerprints: set, for_update: bool = False
+    ) -> Dict[str, int]:
+        """
+        Returns a dictionary of Fingerprint to teams.id for the fingerprints already stored
+        """
+        query = select(teams.Fingerprint, teams.id).where(
+            teams.Fingerprint.in_(fingerprints)
+        )
+        if for_update:
+            query = query.with_for_update(read=True)
+        return dict(session.execute(query).all())
+
     def upload_error(self, battle_url, error_message, traceback, function) -> None:
         """
         Uploads the error to the database
@@ -0,0 +1,317 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from ninjackalytics.database import get_sessionlocal
+from ninjackalytics.database.models import actions, battle_info, damages, healing, pivots
+from ninjackalytics.services.battle_parsing.battle_parser import (
+    BattleError,
+    BattleParser,
+    ParseResult,
+)
+from ninjackalytics.services.replay_store import ReplayStore
+
+
+# per battle tables that are re-derived, with the BattleParser attribute holding their rows
+REPARSED_TABLES = {
+    "actions": (actions, "action_info"),
+    "damages": (damages, "damages_info"),
+    "healing": (healing, "heals_info"),
+    "pivots": (pivots, "pivot_info"),
+}
+
+# number of values bound into a single IN (...) clause
+CHUNK_SIZE = 500
+
+
+@contextmanager
+def session_scope(session):
+    """Provide a transactional scope around a series of operations."""
+    try:
+        yield session
+        session.commit()
+    except:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _normalize(value):
+    # Numeric(5, 2) columns come back as Decimal while the parser produces floats
+    if isinstance(value, (float, Decimal)):
+        return round(float(value), 2)
+    return value
+
+
+def _row_key(row: Dict, columns: List[str]) -> tuple:
+    return tuple(_normalize(row.get(column)) for column in columns)
+
+
+class ReparseProgress:
+    """
+    Checkpoint of a reparse run stored as json, so an interrupted run resumes after the last battle
+    it applied. Battles are processed in Battle_ID order, so a single id is enough.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.last_battle_id = None
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.last_battle_id = json.load(f).get("last_battle_id")
+
+    def save(self, last_battle_id: str) -> None:
+        self.last_battle_id = last_battle_id
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"last_battle_id": last_battle_id}, f)
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        self.last_battle_id = None
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class BattleReparser:
+    """
+    Re-derives the actions, damages, healing and pivots of already uploaded battles from the raw
+    replays in the ReplayStore, e.g. after fixing a bug in one of the parsing models.
+
+    Battles are parsed on a process pool and handled in batches. For every batch the stored rows are
+    read with one query per table, compared with the new rows (as multisets, ignoring row ids) and
+    only the tables that changed are rewritten, all in a single transaction per batch. Progress is
+    checkpointed after every batch so a run can be resumed.
+
+    Parameters
+    ----------
+    store : ReplayStore
+        Store holding the raw replays, defaults to the configured one
+    engine : object
+        Optional engine to use instead of the FLASK_ENV based one
+    workers : int
+        Number of parse processes, defaults to the number of cores
+    batch_size : int
+        Number of battles diffed and applied per transaction
+    progress_path : str
+        Optional json file used to checkpoint and resume the run
+    """
+
+    def __init__(
+        self,
+        store: Optional[ReplayStore] = None,
+        *,
+        engine: object = None,
+        workers: Optional[int] = None,
+        batch_size: int = 100,
+        progress_path: Optional[str] = None,
+    ):
+        self.store = store if store is not None else ReplayStore()
+        if engine is None:
+            self.session_maker = get_sessionlocal
+        else:
+            sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            self.session_maker = lambda: sessionlocal()
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.progress = ReparseProgress(progress_path)
+        self._reset_report()
+
+    def _reset_report(self) -> None:
+        self.report = {
+            "processed": 0,
+            "changed": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "rows_deleted": 0,
+            "rows_inserted": 0,
+            "tables_changed": Counter(),
+            "elapsed": 0.0,
+            "per_second": 0.0,
+        }
+        self.failures = {}
+
+    # ----------------- selection -----------------
+    def get_battle_ids(self) -> List[str]:
+        """
+        Returns, in order, the stored battles that are in battle_info and after the checkpoint.
+        """
+        stored_ids = sorted(self.store.battle_ids())
+        if self.progress.last_battle_id is not None:
+            stored_ids = [
+                battle_id
+                for battle_id in stored_ids
+                if battle_id > self.progress.last_battle_id
+            ]
+        with session_scope(self.session_maker()) as session:
+            uploaded = set()
+            for start in range(0, len(stored_ids), CHUNK_SIZE):
+                chunk = stored_ids[start : start + CHUNK_SIZE]
+                uploaded.update(
+                    session.execute(
+                        select(battle_info.Battle_ID).where(
+                            battle_info.Battle_ID.in_(chunk)
+                        )
+                    ).scalars()
+                )
+        return [battle_id for battle_id in stored_ids if battle_id in uploaded]
+
+    # ----------------- diff / apply -----------------
+    def _get_stored_rows(self, session, table, db_ids: List[int], columns) -> Dict:
+        rows = {db_id: Counter() for db_id in db_ids}
+        result = session.execute(
+            select(table.Battle_ID, *[getattr(table, c) for c in columns]).where(
+                table.Battle_ID.in_(db_ids)
+            )
+        )
+        for row in result:
+            rows[row[0]][tuple(_normalize(value) for value in row[1:])] += 1
+        return rows
+
+    def _apply_batch(self, results: List[ParseResult]) -> None:
+        parsed = [result for result in results if result.error is None]
+        for result in results:
+            if result.error is not None:
+                self.failures[result.url] = result.error.message
+                self.report["failed"] += 1
+        if not parsed:
+            return
+
+        with session_scope(self.session_maker()) as session:
+            db_ids = dict(
+                session.execute(
+                    select(battle_info.Battle_ID, battle_info.id).where(
+                        battle_info.Battle_ID.in_([result.url for result in parsed])
+                    )
+                ).all()
+            )
+            for result in parsed:
+                if result.url not in db_ids:
+                    self.failures[result.url] = "Battle is not in battle_info"
+                    self.report["failed"] += 1
+            parsed = [result for result in parsed if result.url in db_ids]
+
+            changed_battles = set()
+            for table_name, (table, attribute) in REPARSED_TABLES.items():
+                columns = [
+                    column.name
+                    for column in table.__table__.columns
+                    if column.name not in ("id", "Battle_ID")
+                ]
+                stored = self._get_stored_rows(
+                    session, table, list(db_ids.values()), columns
+                )
+
+                changed_ids = []
+                new_rows = []
+                for result in parsed:
+                    db_id = db_ids[result.url]
+                    rows = getattr(result.parsed, attribute)
+                    if Counter(_row_key(row, columns) for row in rows) == stored[db_id]:
+                        continue
+                    changed_ids.append(db_id)
+                    changed_battles.add(db_id)
+                    new_rows.extend({**row, "Battle_ID": db_id} for row in rows)
+
+                if not changed_ids:
+                    continue
+                self.report["tables_changed"][table_name] += len(changed_ids)
+                self.report["rows_deleted"] += sum(
+                    sum(stored[db_id].values()) for db_id in changed_ids
+                )
+                session.execute(delete(table).where(table.Battle_ID.in_(changed_ids)))
+                if new_rows:
+                    session.execute(insert(table), new_rows)
+                    self.report["rows_inserted"] += len(new_rows)
+
+        self.report["changed"] += len(changed_battles)
+        self.report["unchanged"] += len(parsed) - len(changed_battles)
+
+    # ----------------- run -----------------
+    def _parse_batch(
+        self, battle_ids: List[str], pool, chunksize: int
+    ) -> List[ParseResult]:
+        """
+        Loads a batch of battles from the replay store and parses them with
+        BattleParser.parse_many. Results are in battle_ids order, which the checkpoint relies on,
+        and their url is the Battle_ID so they can be matched to battle_info rows.
+        """
+        results = {}
+        replays = {}
+        for battle_id in battle_ids:
+            try:
+                replays[battle_id] = self.store.get(battle_id)
+            except Exception as e:
+                results[battle_id] = ParseResult(
+                    battle_id, error=BattleError.from_exception(e)
+                )
+        parsed = BattleParser.parse_many(
+            replays.values(),
+            workers=self.workers,
+            chunksize=chunksize,
+            urls=replays.keys(),
+            pool=pool,
+        )
+        results.update((result.url, result) for result in parsed)
+        return [results[battle_id] for battle_id in battle_ids]
+
+    def reparse(
+        self, battle_ids: Optional[Iterable[str]] = None, progress_callback=None
+    ) -> Dict:
+        """
+        Reparses the stored battles and applies the changed ones.
+
+        Parameters
+        ----------
+        battle_ids : Iterable[str]
+            Battles to reparse, defaults to get_battle_ids()
+        progress_callback : callable
+            Optional function called with the number of battles handled after every batch
+
+        Returns
+        -------
+        Dict
+            The run report: processed, changed, unchanged and failed battles, rows deleted and
+            inserted, the number of battles changed per table, elapsed seconds and battles per second
+        """
+        self._reset_report()
+        battle_ids = sorted(battle_ids) if battle_ids is not None else self.get_battle_ids()
+        chunksize = max(1, min(50, self.batch_size // (self.workers * 4) or 1))
+
+        start = time.monotonic()
+        pool = BattleParser.create_pool(self.workers) if self.workers > 1 else None
+        try:
+            for batch_start in range(0, len(battle_ids), self.batch_size):
+                batch_ids = battle_ids[batch_start : batch_start + self.batch_size]
+                self._finish_batch(
+                    self._parse_batch(batch_ids, pool, chunksize), progress_callback
+                )
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.report["tables_changed"] = dict(self.report["tables_changed"])
+        self.report["elapsed"] = time.monotonic() - start
+        if self.report["elapsed"]:
+            self.report["per_second"] = self.report["processed"] / self.report["elapsed"]
+        return self.report
+
+    def _finish_batch(self, batch: List[ParseResult], progress_callback) -> None:
+        if not batch:
+            return
+        self._apply_batch(batch)
+        self.report["processed"] += len(batch)
+        self.progress.save(batch[-1].url)
+        if progress_callback is not None:
+            progress_callback(len(batch))
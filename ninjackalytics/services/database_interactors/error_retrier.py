@@ -0,0 +1,278 @@
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from ninjackalytics.database import get_sessionlocal
+from ninjackalytics.database.models import errors
+from ninjackalytics.services.battle_parsing.battle_parser import (
+    BattleError,
+    BattleParser,
+    ParseResult,
+)
+from ninjackalytics.services.auto_replay_pulls.replay_fetcher import ReplayFetcher
+from ninjackalytics.services.replay_store import ReplayStore
+from .battle_data_uploader import BattleDataUploader
+
+
+# outcomes of retrying an error
+DELETED = "deleted"  # the battle now parses and was uploaded, the error row is removed
+CHANGED = "changed"  # the battle fails with a different error, the error row is updated
+UNCHANGED = "unchanged"  # the battle fails with the same error message
+
+
+@contextmanager
+def session_scope(session):
+    """Provide a transactional scope around a series of operations."""
+    try:
+        yield session
+        session.commit()
+    except:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+class ErrorRetrier:
+    """
+    Retries the battles in the errors table after a parser fix.
+
+    Errors are grouped by signature, the (Function, Error_Message) pair, so a fix can be validated
+    against just the failures it targets. Battles are fetched in batches on the ReplayFetcher's
+    threads (straight from the store for stored replays), parsed on a pool of worker processes with
+    BattleParser.parse_many, and the outcomes are written back per batch:
+
+    - deleted: the battle parses, it is uploaded with upload_battles and its error row removed
+    - changed: the battle fails differently, its error row is updated with the new error
+    - unchanged: the battle fails with the same message, nothing is written
+
+    Parameters
+    ----------
+    store : ReplayStore
+        Store replays are read from (and downloaded replays added to), defaults to the configured
+        one
+    engine : object
+        Optional engine to use instead of the FLASK_ENV based one
+    workers : int
+        Number of worker processes, defaults to the number of cores
+    batch_size : int
+        Number of outcomes written per transaction
+    """
+
+    def __init__(
+        self,
+        store: Optional[ReplayStore] = None,
+        *,
+        engine: object = None,
+        workers: Optional[int] = None,
+        batch_size: int = 100,
+    ):
+        self.store = store if store is not None else ReplayStore()
+        if engine is None:
+            self.session_maker = get_sessionlocal
+            self.uploader = BattleDataUploader()
+        else:
+            sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            self.session_maker = lambda: sessionlocal()
+            self.uploader = BattleDataUploader(engine=engine)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+
+    def get_signatures(self) -> List[Tuple[str, str, int]]:
+        """
+        Returns every error signature with its number of errors, most common first.
+
+        Returns
+        -------
+        List[Tuple[str, str, int]]
+            (Function, Error_Message, count) tuples
+        """
+        with session_scope(self.session_maker()) as session:
+            rows = session.execute(
+                select(errors.Function, errors.Error_Message, func.count())
+                .group_by(errors.Function, errors.Error_Message)
+                .order_by(func.count().desc())
+            ).all()
+            return [tuple(row) for row in rows]
+
+    def get_errors(
+        self, function: Optional[str] = None, message: Optional[str] = None
+    ) -> Dict[str, Tuple[str, str]]:
+        """
+        Returns the errors to retry, optionally limited to a Function and/or Error_Message.
+
+        Returns
+        -------
+        Dict[str, Tuple[str, str]]
+            Battle_URL -> (Function, Error_Message)
+        """
+        query = select(errors.Battle_URL, errors.Function, errors.Error_Message)
+        if function is not None:
+            query = query.where(errors.Function == function)
+        if message is not None:
+            query = query.where(errors.Error_Message == message)
+        with session_scope(self.session_maker()) as session:
+            return {
+                url: (error_function, error_message)
+                for url, error_function, error_message in session.execute(query)
+            }
+
+    def _classify(self, result: ParseResult, old_message: str) -> str:
+        if result.error is None:
+            return DELETED
+        if result.error.message == old_message:
+            return UNCHANGED
+        return CHANGED
+
+    def _write_outcomes(self, batch: List[Tuple[ParseResult, Tuple]], report: Dict) -> None:
+        """
+        Uploads the battles that now parse, then deletes or updates their error rows in one
+        transaction. batch holds (result, (Function, Error_Message) of the original error) pairs.
+        """
+        outcomes = {
+            result.url: self._classify(result, signature[1]) for result, signature in batch
+        }
+        deleted = [result for result, _ in batch if outcomes[result.url] == DELETED]
+
+        if deleted:
+            try:
+                self.uploader.upload_battles(
+                    [result.parsed for result in deleted], batch_size=len(deleted)
+                )
+            except Exception:
+                # isolate the battles that fail to upload, they become changed errors
+                for result in deleted:
+                    try:
+                        self.uploader.upload_battles([result.parsed])
+                    except Exception as e:
+                        result.error = BattleError.from_exception(e)
+                        outcomes[result.url] = CHANGED
+                deleted = [result for result in deleted if outcomes[result.url] == DELETED]
+        changed = [result for result, _ in batch if outcomes[result.url] == CHANGED]
+
+        with session_scope(self.session_maker()) as session:
+            if deleted:
+                session.execute(
+                    delete(errors).where(
+                        errors.Battle_URL.in_([result.url for result in deleted])
+                    )
+                )
+            if changed:
+                # Core update (not the ORM one) so the rows are matched on Battle_URL in a
+                # single executemany
+                errors_table = errors.__table__
+                session.execute(
+                    update(errors_table)
+                    .where(errors_table.c.Battle_URL == bindparam("url"))
+                    .values(
+                        Error_Message=bindparam("message"),
+                        Traceback=bindparam("traceback"),
+                        Function=bindparam("function"),
+                    ),
+                    [
+                        {
+                            "url": result.url,
+                            "message": result.error.message,
+                            "traceback": result.error.traceback,
+                            "function": result.error.function,
+                        }
+                        for result in changed
+                    ],
+                )
+
+        for result, signature in batch:
+            outcome = outcomes[result.url]
+            report[outcome] += 1
+            report["signatures"].setdefault(signature, Counter())[outcome] += 1
+
+    def _retry_batch(
+        self, fetcher: ReplayFetcher, urls: List[str], pool, chunksize: int
+    ) -> List[ParseResult]:
+        """
+        Fetches a batch of battles (from the replay store when they are in it) on the fetcher's
+        threads and parses them with BattleParser.parse_many.
+        """
+        results = []
+        fetched = []
+        for fetch_result in fetcher.fetch_all(urls):
+            if fetch_result.ok:
+                fetched.append(fetch_result)
+            else:
+                results.append(
+                    ParseResult(
+                        fetch_result.url,
+                        error=BattleError.from_exception(fetch_result.error),
+                    )
+                )
+        results.extend(
+            BattleParser.parse_many(
+                [fetch_result.data for fetch_result in fetched],
+                workers=self.workers,
+                chunksize=chunksize,
+                urls=[fetch_result.url for fetch_result in fetched],
+                pool=pool,
+            )
+        )
+        return results
+
+    def retry(
+        self,
+        function: Optional[str] = None,
+        message: Optional[str] = None,
+        progress_callback=None,
+    ) -> Dict:
+        """
+        Retries the errors, optionally only those of one signature.
+
+        Parameters
+        ----------
+        function : str
+            Only retry errors raised in this Function
+        message : str
+            Only retry errors with this Error_Message
+        progress_callback : callable
+            Optional function called with the number of errors handled after every batch
+
+        Returns
+        -------
+        Dict
+            The number of deleted, changed and unchanged errors, the outcomes per signature,
+            elapsed seconds and errors retried per second
+        """
+        to_retry = self.get_errors(function, message)
+        report = {DELETED: 0, CHANGED: 0, UNCHANGED: 0, "signatures": {}}
+
+        start = time.monotonic()
+        urls = sorted(to_retry)
+        chunksize = max(1, min(20, self.batch_size // (self.workers * 4) or 1))
+        pool = BattleParser.create_pool(self.workers) if self.workers > 1 else None
+        try:
+            with ReplayFetcher(store=self.store) as fetcher:
+                for batch_start in range(0, len(urls), self.batch_size):
+                    batch_urls = urls[batch_start : batch_start + self.batch_size]
+                    batch = [
+                        (result, to_retry[result.url])
+                        for result in self._retry_batch(
+                            fetcher, batch_urls, pool, chunksize
+                        )
+                    ]
+                    self._write_outcomes(batch, report)
+                    if progress_callback is not None:
+                        progress_callback(len(batch))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        report["signatures"] = {
+            signature: dict(outcomes)
+            for signature, outcomes in report["signatures"].items()
+        }
+        report["elapsed"] = time.monotonic() - start
+        report["per_second"] = len(urls) / report["elapsed"] if report["elapsed"] else 0.0
+        return report
@@ -3,7 +3,8 @@ from ninjackalytics.database import get_sessionlocal
 from sqlalchemy.orm import sessionmaker
 from ninjackalytics.database.models import *
 from contextlib import contextmanager
-from typing import Dict
+from typing import Dict, Iterable, List, Set
+from sqlalchemy import select
 
 
 @contextmanager
@@ -19,6 +20,10 @@ def session_scope(session):
         session.close()
 
 
+# number of values bound into a single IN (...) clause. sqlite caps bound parameters per statement
+DEFAULT_CHUNK_SIZE = 500
+
+
 class TableAccessor:
     def __init__(self, *, engine: object = None):
         # prepare a session_maker either by the get_sessionlocal function (which handles engine creation
@@ -103,6 +108,84 @@ class TableAccessor:
                 query = self._add_conditions(query, pvpmetadata, conditions)
             return pd.read_sql(query.statement, session.bind)
 
+    def get_unseen_battle_ids(
+        self, battle_ids: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> List[str]:
+        """
+        Returns the Battle_IDs from battle_ids that are not yet in battle_info, in their original order
+        and without repeats. Only the candidates are looked up (in chunks, against the unique
+        Battle_ID index) so the cost does not grow with the size of the table.
+
+        Parameters
+        ----------
+        battle_ids : Iterable[str]
+            candidate Battle_IDs
+        chunk_size : int
+            maximum number of ids sent in a single IN query
+
+        Returns
+        -------
+        List[str]
+            the candidates that have not been uploaded
+        """
+        battle_ids = list(dict.fromkeys(battle_ids))
+        with session_scope(self.session_maker()) as session:
+            seen = self._get_existing_values(
+                session, battle_info.Battle_ID, battle_ids, chunk_size
+            )
+        return [battle_id for battle_id in battle_ids if battle_id not in seen]
+
+    def get_unseen_battle_urls(
+        self, urls: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> List[str]:
+        """
+        Returns the replay urls that have neither been uploaded (battle_info.Battle_ID) nor already
+        failed (errors.Battle_URL), in their original order and without repeats.
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            candidate replay urls, e.g. https://replay.pokemonshowdown.com/gen9ou-1968330098
+        chunk_size : int
+            maximum number of values sent in a single IN query
+
+        Returns
+        -------
+        List[str]
+            the candidate urls that still need to be processed
+        """
+        urls = list(dict.fromkeys(urls))
+        url_battle_ids = {url: url.rstrip("/").split("/")[-1] for url in urls}
+        with session_scope(self.session_maker()) as session:
+            seen_ids = self._get_existing_values(
+                session,
+                battle_info.Battle_ID,
+                list(url_battle_ids.values()),
+                chunk_size,
+            )
+            seen_urls = self._get_existing_values(
+                session, errors.Battle_URL, urls, chunk_size
+            )
+        return [
+            url
+            for url in urls
+            if url not in seen_urls and url_battle_ids[url] not in seen_ids
+        ]
+
+    def _get_existing_values(
+        self, session, column, values: List, chunk_size: int
+    ) -> Set:
+        """
+        Returns the subset of values that are present in column, querying chunk_size values at a time
+        """
+        existing = set()
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start : start + chunk_size]
+            existing.update(
+                session.execute(select(column).where(column.in_(chunk))).scalars()
+            )
+        return existing
+
     def _add_conditions(self, query, table_obj, conditions: Dict):
         """
         conditions_format = {
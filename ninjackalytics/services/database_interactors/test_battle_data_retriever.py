@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import Mock
 from datetime import datetime
 import os
+import pandas as pd
 
 os.environ["FLASK_ENV"] = "testing"
 
@@ -51,7 +52,7 @@ class testBattleDataRetriever(unittest.TestCase):
         self.session.rollback()  # rollback the transaction
 
     def test_get_battle_info(self):
-        battle_id = self.uploader.battle_id
+        battle_id = self.battle_parser.general_info["Battle_ID"]
         battle_info = self.retriever.get_battle_info(battle_id)
         self.assertEqual(battle_info["Battle_ID"][0], battle_id)
         self.assertEqual(battle_info["Format"][0], "gen9ou")
@@ -61,7 +62,7 @@ class testBattleDataRetriever(unittest.TestCase):
         self.assertEqual(battle_info["Winner"][0], "massivesket")
 
     def test_get_teams(self):
-        battle_id = self.uploader.battle_id
+        battle_id = self.battle_parser.general_info["Battle_ID"]
         teams = self.retriever.get_teams(battle_id)
         self.assertEqual(teams["Pok1"][0], "Azumarill")
         self.assertEqual(teams["Pok2"][0], "Garganacl")
@@ -77,7 +78,7 @@ class testBattleDataRetriever(unittest.TestCase):
         self.assertEqual(teams["Pok6"][1], "Slowking-Galar")
 
     def test_get_actions(self):
-        battle_id = self.uploader.battle_id
+        battle_id = self.battle_parser.general_info["Battle_ID"]
         allactions = self.retriever.get_actions(battle_id)
         # found actions in turn 1 for p1 and p2 but not going to be overly rigorous
         self.assertEqual(
@@ -94,7 +95,7 @@ class testBattleDataRetriever(unittest.TestCase):
         )
 
     def test_get_damages(self):
-        battle_id = self.uploader.battle_id
+        battle_id = self.battle_parser.general_info["Battle_ID"]
         alldamages = self.retriever.get_damages(battle_id)
         # found damages in turn 1 and 2 for p1 and p2 but not going to be overly rigorous
         self.assertEqual(
@@ -115,7 +116,7 @@ class testBattleDataRetriever(unittest.TestCase):
         )
 
     def test_get_healing(self):
-        battle_id = self.uploader.battle_id
+        battle_id = self.battle_parser.general_info["Battle_ID"]
         allhealing = self.retriever.get_healing(battle_id)
         # found healing in turn 1 for p1 (only healing in battle)
         self.assertEqual(
@@ -128,7 +129,7 @@ class testBattleDataRetriever(unittest.TestCase):
         )
 
     def test_get_pivots(self):
-        battle_id = self.uploader.battle_id
+        battle_id = self.battle_parser.general_info["Battle_ID"]
         allpivots = self.retriever.get_pivots(battle_id)
         # found pivots in turn 1 for p2 (only pivot in battle)
         pivot = allpivots.loc[
@@ -139,6 +140,62 @@ class testBattleDataRetriever(unittest.TestCase):
         self.assertEqual(pivot["Source_Name"], "action")
         self.assertEqual(pivot["Turn"], 1)
 
+    def test_get_battle_data(self):
+        battle_id = self.battle_parser.general_info["Battle_ID"]
+        battle_data = self.retriever.get_battle_data(battle_id)
+        self.assertEqual(
+            list(battle_data.keys()),
+            ["battle_info", "teams", "actions", "damages", "healing", "pivots"],
+        )
+        for df in battle_data.values():
+            self.assertNotIn("_sa_instance_state", df.columns)
+
+        # same data as the individual getters
+        getters = {
+            "battle_info": self.retriever.get_battle_info,
+            "teams": self.retriever.get_teams,
+            "actions": self.retriever.get_actions,
+            "damages": self.retriever.get_damages,
+            "healing": self.retriever.get_healing,
+            "pivots": self.retriever.get_pivots,
+        }
+        for key, getter in getters.items():
+            self.assertTrue(battle_data[key].equals(getter(battle_id)), key)
+
+        self.assertEqual(battle_data["battle_info"]["Winner"][0], "massivesket")
+        self.assertEqual(battle_data["teams"]["Pok1"][0], "Azumarill")
+        self.assertEqual(battle_data["teams"]["Pok1"][1], "Corviknight")
+
+    def test_get_battle_data_same_team(self):
+        battle_id = self.battle_parser.general_info["Battle_ID"]
+        session = get_sessionlocal()
+        battle = session.query(battle_info).filter_by(Battle_ID=battle_id).first()
+        p2_team = battle.P2_team
+        battle.P2_team = battle.P1_team
+        session.commit()
+        try:
+            battle_teams = self.retriever.get_battle_data(battle_id)["teams"]
+        finally:
+            battle.P2_team = p2_team
+            session.commit()
+            session.close()
+
+        self.assertEqual(len(battle_teams), 2)
+        self.assertEqual(battle_teams["Pok1"][0], "Azumarill")
+        self.assertEqual(battle_teams["Pok1"][1], "Azumarill")
+
+    def test_get_battle_data_missing_battle(self):
+        with self.assertRaises(ValueError):
+            self.retriever.get_battle_data("not-a-battle")
+
+    def test_get_battle_info_missing_battle(self):
+        with self.assertRaises(ValueError):
+            self.retriever.get_battle_info("not-a-battle")
+
+    def test_drop_unwanted_attrs(self):
+        df = pd.DataFrame({"a": [1], "FAIL": [0], "_sa_instance_state": [None]})
+        self.assertEqual(list(self.retriever._drop_unwanted_attrs(df).columns), ["a"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+import unittest.mock
 from unittest.mock import Mock
 from datetime import datetime
+from decimal import Decimal
 import os
 
 os.environ["FLASK_ENV"] = "testing"
@@ -12,6 +14,11 @@ from ninjackalytics.services.database_interactors.battle_data_uploader import (
     session_scope,
 )
 from ninjackalytics.services.battle_parsing import BattleParser
+from ninjackalytics.services.battle_parsing.battle_columns import BattleColumns
+from ninjackalytics.services.battle_parsing.header_parser import (
+    BattleHeader,
+    HeaderParser,
+)
 from ninjackalytics.services.battle_parsing.battle_data.battle_pokemon import (
     BattlePokemon,
 )
@@ -28,6 +35,9 @@ from ninjackalytics.database.models import (
 from ninjackalytics.test_utilities.preppared_battle_objects.base_battle import (
     TestBattle,
 )
+from ninjackalytics.test_utilities.preppared_battle_objects.dash_battle import (
+    TestBattle as DashTestBattle,
+)
 
 
 class TestBattleDataUploader(unittest.TestCase):
@@ -236,6 +246,215 @@ class TestBattleDataUploader(unittest.TestCase):
             self.assertEqual(error_db.Traceback, traceback)
             self.assertEqual(error_db.Function, function)
 
+    def _get_base_parser(self):
+        battle = TestBattle()
+        battle_parser = BattleParser(battle, BattlePokemon(battle))
+        battle_parser.analyze_battle()
+        return battle_parser
+
+    def _get_dash_parser(self):
+        battle = DashTestBattle()
+        battle_parser = BattleParser(battle, BattlePokemon(battle))
+        battle_parser.analyze_battle()
+        return battle_parser
+
+    def _count_rows(self, table):
+        return self.session.query(table).count()
+
+    def test_upload_battles(self):
+        dash_parser = self._get_dash_parser()
+        uploaded = self.battle_data_uploader.upload_battles(
+            [self.mock_parser, dash_parser], batch_size=1
+        )
+        self.assertEqual(uploaded, 2)
+
+        self.assertEqual(self._count_rows(battle_info), 2)
+        self.assertEqual(self._count_rows(teams), 4)
+        self.assertEqual(
+            self._count_rows(damages),
+            len(self.mock_parser.damages_info) + len(dash_parser.damages_info),
+        )
+        self.assertEqual(
+            self._count_rows(healing),
+            len(self.mock_parser.heals_info) + len(dash_parser.heals_info),
+        )
+        self.assertEqual(
+            self._count_rows(pivots),
+            len(self.mock_parser.pivot_info) + len(dash_parser.pivot_info),
+        )
+        self.assertEqual(
+            self._count_rows(actions),
+            len(self.mock_parser.action_info) + len(dash_parser.action_info),
+        )
+
+        # foreign keys point at the right battle and teams
+        battle = (
+            self.session.query(battle_info)
+            .filter(battle_info.Battle_ID == dash_parser.general_info["Battle_ID"])
+            .first()
+        )
+        self.assertEqual(battle.team_as_P1.Pok1, "Cinderace")
+        self.assertEqual(battle.team_as_P2.Pok1, "Hatterene")
+        self.assertEqual(len(battle.damages), len(dash_parser.damages_info))
+
+    def test_upload_battles_matches_upload_battle(self):
+        self.battle_data_uploader.upload_battles([self.mock_parser])
+        damage = self.session.query(damages).first()
+        self.assertEqual(damage.Damage, 50)
+        self.assertEqual(damage.Dealer, "Azumarill")
+        self.assertEqual(damage.Source_Name, "Belly Drum")
+        battle = self.session.query(battle_info).first()
+        self.assertEqual(battle.P1_team, 1)
+        self.assertEqual(battle.P2_team, 2)
+        self.assertEqual(battle.Rank, 1337)
+
+    def test_upload_battles_skips_existing(self):
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        uploaded = self.battle_data_uploader.upload_battles(
+            [self.mock_parser, self.mock_parser, self._get_dash_parser()]
+        )
+        self.assertEqual(uploaded, 1)
+        self.assertEqual(self._count_rows(battle_info), 2)
+
+    def test_same_team_reused(self):
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        rematch = self._get_base_parser()
+        rematch.general_info["Battle_ID"] = "gen9ou-rematch"
+        self.battle_data_uploader.upload_battles([rematch])
+
+        self.assertEqual(self._count_rows(battle_info), 2)
+        self.assertEqual(self._count_rows(teams), 2)
+        battle = (
+            self.session.query(battle_info)
+            .filter(battle_info.Battle_ID == "gen9ou-rematch")
+            .first()
+        )
+        self.assertEqual(battle.P1_team, 1)
+        self.assertEqual(battle.P2_team, 2)
+
+    def test_team_fingerprint(self):
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        team1 = self.session.query(teams).filter(teams.id == 1).first()
+        self.assertEqual(
+            team1.Fingerprint,
+            teams.make_fingerprint([getattr(team1, f"Pok{i}") for i in range(1, 7)]),
+        )
+        # order of the mons does not matter
+        self.assertEqual(
+            teams.make_fingerprint(["b", "a"]), teams.make_fingerprint(["a", "b"])
+        )
+
+    def test_team_inserted_concurrently(self):
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        rematch = self._get_base_parser()
+        rematch.general_info["Battle_ID"] = "gen9ou-rematch"
+
+        # pretend another writer stored the teams between our lookup and our insert
+        select_team_ids = self.battle_data_uploader._select_team_ids
+        lookups = []
+
+        def stale_select(session, fingerprints, for_update=False):
+            lookups.append(for_update)
+            if len(lookups) == 1:
+                return {}
+            return select_team_ids(session, fingerprints, for_update)
+
+        with unittest.mock.patch.object(
+            self.battle_data_uploader, "_select_team_ids", side_effect=stale_select
+        ):
+            self.battle_data_uploader.upload_battles([rematch])
+
+        self.assertEqual(self._count_rows(teams), 2)
+        self.assertEqual(self._count_rows(battle_info), 2)
+
+    def _get_child_rows(self, table, columns):
+        return sorted(
+            tuple(getattr(row, column) for column in columns)
+            for row in self.session.query(table)
+        )
+
+    def test_upload_columns(self):
+        dash_parser = self._get_dash_parser()
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        uploaded = self.battle_data_uploader.upload_columns(
+            BattleColumns([self.mock_parser, dash_parser])
+        )
+        # the battle uploaded earlier is skipped
+        self.assertEqual(uploaded, 1)
+        self.assertEqual(self._count_rows(battle_info), 2)
+        self.assertEqual(self._count_rows(teams), 4)
+
+        battle = (
+            self.session.query(battle_info)
+            .filter(battle_info.Battle_ID == dash_parser.general_info["Battle_ID"])
+            .first()
+        )
+        self.assertEqual(battle.team_as_P1.Pok1, "Cinderace")
+        self.assertEqual(len(battle.damages), len(dash_parser.damages_info))
+        self.assertEqual(len(battle.healing), len(dash_parser.heals_info))
+        self.assertEqual(len(battle.pivots), len(dash_parser.pivot_info))
+        self.assertEqual(len(battle.actions), len(dash_parser.action_info))
+
+    def test_upload_columns_matches_upload_battle(self):
+        damage_columns = ["Battle_ID", "Damage", "Dealer", "Source_Name", "Turn"]
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        expected = self._get_child_rows(damages, damage_columns)
+
+        Base.metadata.drop_all(bind=get_engine())
+        Base.metadata.create_all(bind=get_engine())
+        self.battle_data_uploader.upload_columns(
+            BattleColumns([self._get_base_parser()])
+        )
+        self.assertEqual(self._get_child_rows(damages, damage_columns), expected)
+
+    def test_upload_columns_decimal_values(self):
+        for damage in self.mock_parser.damages_info:
+            damage["Damage"] = Decimal(str(damage["Damage"]))
+        self.battle_data_uploader.upload_columns(BattleColumns([self.mock_parser]))
+
+        self.assertEqual(
+            sorted(row.Damage for row in self.session.query(damages)),
+            sorted(damage["Damage"] for damage in self.mock_parser.damages_info),
+        )
+
+    def test_upload_columns_nothing_new(self):
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        self.assertEqual(
+            self.battle_data_uploader.upload_columns(BattleColumns([self.mock_parser])),
+            0,
+        )
+        self.assertEqual(self.battle_data_uploader.upload_columns(BattleColumns()), 0)
+
+
+    def _get_header_parser(self):
+        battle = TestBattle()
+        header = BattleHeader(battle.get_id(), battle.get_format(), battle.get_log())
+        header_parser = HeaderParser(header)
+        header_parser.analyze_battle()
+        return header_parser
+
+    def test_upload_details(self):
+        damage_columns = ["Battle_ID", "Damage", "Dealer", "Source_Name", "Turn"]
+        self.battle_data_uploader.upload_battle(self.mock_parser)
+        expected = self._get_child_rows(damages, damage_columns)
+
+        Base.metadata.drop_all(bind=get_engine())
+        Base.metadata.create_all(bind=get_engine())
+        self.battle_data_uploader.upload_columns(
+            BattleColumns([self._get_header_parser()])
+        )
+        self.assertEqual(self._count_rows(damages), 0)
+
+        columns = BattleColumns([self.mock_parser, self._get_dash_parser()])
+        # the dash battle is not in battle_info, it is left to upload_columns
+        self.assertEqual(self.battle_data_uploader.upload_details(columns), 1)
+        self.assertEqual(self._count_rows(battle_info), 1)
+        self.assertEqual(self._get_child_rows(damages, damage_columns), expected)
+        self.assertEqual(self._count_rows(actions), len(self.mock_parser.action_info))
+
+        # the details are only uploaded once
+        self.assertEqual(self.battle_data_uploader.upload_details(columns), 0)
+        self.assertEqual(self._get_child_rows(damages, damage_columns), expected)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+os.environ["FLASK_ENV"] = "testing"
+
+from sqlalchemy import create_engine, delete, func, select, update
+
+from ninjackalytics.database import Base
+from ninjackalytics.database.models import battle_info, damages, healing, pivots
+from ninjackalytics.services.battle_parsing import Battle, BattleParser, BattlePokemon
+from ninjackalytics.services.database_interactors import BattleDataUploader
+from ninjackalytics.services.database_interactors.battle_reparser import (
+    BattleReparser,
+)
+from ninjackalytics.services.replay_store import ReplayStore
+from ninjackalytics.test_utilities.preppared_battle_objects.battle_vars import (
+    log,
+    b_format,
+)
+
+
+class TestBattleReparser(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp_dir, 'test.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.store = ReplayStore(os.path.join(self.tmp_dir, "store"))
+        self.progress_path = os.path.join(self.tmp_dir, "progress.json")
+
+        # upload a few battles and keep their raw replays in the store
+        self.battle_ids = [f"gen9ou-{i}" for i in range(5)]
+        uploader = BattleDataUploader(engine=self.engine)
+        for battle_id in self.battle_ids:
+            replay = {"id": battle_id, "format": b_format, "log": log}
+            self.store.put(replay)
+            battle = Battle.from_json(replay)
+            parser = BattleParser(battle, BattlePokemon(battle))
+            parser.analyze_battle()
+            uploader.upload_battle(parser)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def get_reparser(self, **kwargs) -> BattleReparser:
+        kwargs.setdefault("workers", 2)
+        kwargs.setdefault("batch_size", 2)
+        return BattleReparser(self.store, engine=self.engine, **kwargs)
+
+    def get_db_id(self, battle_id: str) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(battle_info.id).where(battle_info.Battle_ID == battle_id)
+            ).scalar()
+
+    def count(self, table, db_id: int) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(func.count()).select_from(table).where(table.Battle_ID == db_id)
+            ).scalar()
+
+    def test_unchanged(self):
+        report = self.get_reparser().reparse()
+        self.assertEqual(report["processed"], 5)
+        self.assertEqual(report["unchanged"], 5)
+        self.assertEqual(report["changed"], 0)
+        self.assertEqual(report["rows_inserted"], 0)
+
+    def test_changed_battles_applied(self):
+        db_id = self.get_db_id("gen9ou-2")
+        damage_count = self.count(damages, db_id)
+        pivot_count = self.count(pivots, db_id)
+        # simulate rows produced by an older, buggy parser
+        with self.engine.begin() as conn:
+            first_damage = conn.execute(
+                select(damages.id).where(damages.Battle_ID == db_id)
+            ).scalar()
+            conn.execute(delete(damages).where(damages.id == first_damage))
+            conn.execute(
+                update(healing)
+                .where(healing.Battle_ID == db_id)
+                .values(Source_Name="old source")
+            )
+
+        report = self.get_reparser().reparse()
+        self.assertEqual(report["changed"], 1)
+        self.assertEqual(report["unchanged"], 4)
+        self.assertEqual(report["tables_changed"], {"damages": 1, "healing": 1})
+        self.assertEqual(self.count(damages, db_id), damage_count)
+        self.assertEqual(self.count(pivots, db_id), pivot_count)
+        with self.engine.connect() as conn:
+            sources = conn.execute(
+                select(healing.Source_Name).where(healing.Battle_ID == db_id)
+            ).scalars()
+            self.assertNotIn("old source", list(sources))
+
+        # applying again finds nothing to change
+        self.assertEqual(self.get_reparser().reparse()["changed"], 0)
+
+    def test_resume(self):
+        reparser = self.get_reparser(progress_path=self.progress_path)
+        self.assertEqual(reparser.get_battle_ids(), sorted(self.battle_ids))
+        reparser.reparse(sorted(self.battle_ids)[:3])
+
+        resumed = self.get_reparser(progress_path=self.progress_path)
+        self.assertEqual(resumed.get_battle_ids(), sorted(self.battle_ids)[3:])
+        self.assertEqual(resumed.reparse()["processed"], 2)
+
+        resumed.progress.reset()
+        self.assertEqual(resumed.get_battle_ids(), sorted(self.battle_ids))
+
+    def test_failures(self):
+        # stored but never uploaded, and a replay that can no longer be parsed
+        self.store.put({"id": "gen9ou-new", "format": b_format, "log": log})
+        self.store.put({"id": "gen9ou-1", "format": b_format})
+
+        reparser = self.get_reparser(workers=1)
+        self.assertNotIn("gen9ou-new", reparser.get_battle_ids())
+        report = reparser.reparse(self.battle_ids + ["gen9ou-new"])
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual(report["unchanged"], 4)
+        self.assertEqual(sorted(reparser.failures), ["gen9ou-1", "gen9ou-new"])
+        # the failed battle keeps its rows
+        self.assertGreater(self.count(damages, self.get_db_id("gen9ou-1")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
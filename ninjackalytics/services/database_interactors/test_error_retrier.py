@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+os.environ["FLASK_ENV"] = "testing"
+
+from sqlalchemy import create_engine, insert, select
+
+from ninjackalytics.database import Base
+from ninjackalytics.database.models import battle_info, errors
+from ninjackalytics.services.database_interactors.error_retrier import ErrorRetrier
+from ninjackalytics.services.replay_store import ReplayStore
+from ninjackalytics.test_utilities.preppared_battle_objects.battle_vars import (
+    log,
+    b_format,
+)
+
+REPLAY_URL = "https://replay.pokemonshowdown.com/"
+
+
+class TestErrorRetrier(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp_dir, 'test.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.store = ReplayStore(os.path.join(self.tmp_dir, "store"))
+
+        # fixed: parses now. broken-*: the stored replay has no log and fails with KeyError('log')
+        self.store.put({"id": "gen9ou-fixed", "format": b_format, "log": log})
+        for battle_id in ["gen9ou-broken-1", "gen9ou-broken-2", "gen9ou-broken-3"]:
+            self.store.put({"id": battle_id, "format": b_format})
+
+        self.add_errors(
+            [
+                ("gen9ou-fixed", "get_source", "old message"),
+                ("gen9ou-broken-1", "__init__", "'log'"),
+                ("gen9ou-broken-2", "get_source", "old message"),
+                ("gen9ou-broken-3", "get_heal", "another message"),
+            ]
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def add_errors(self, rows):
+        with self.engine.begin() as conn:
+            conn.execute(
+                insert(errors),
+                [
+                    {
+                        "Battle_URL": f"{REPLAY_URL}{battle_id}",
+                        "Function": function,
+                        "Error_Message": message,
+                        "Traceback": "",
+                    }
+                    for battle_id, function, message in rows
+                ],
+            )
+
+    def get_errors(self):
+        with self.engine.connect() as conn:
+            return {
+                url.split("/")[-1]: message
+                for url, message in conn.execute(
+                    select(errors.Battle_URL, errors.Error_Message)
+                )
+            }
+
+    def get_retrier(self) -> ErrorRetrier:
+        return ErrorRetrier(self.store, engine=self.engine, workers=2, batch_size=2)
+
+    def test_get_signatures(self):
+        self.assertEqual(
+            self.get_retrier().get_signatures(),
+            [
+                ("get_source", "old message", 2),
+                ("__init__", "'log'", 1),
+                ("get_heal", "another message", 1),
+            ],
+        )
+
+    def test_retry(self):
+        report = self.get_retrier().retry()
+        self.assertEqual(report["deleted"], 1)
+        self.assertEqual(report["changed"], 2)
+        self.assertEqual(report["unchanged"], 1)
+        self.assertEqual(
+            report["signatures"][("get_source", "old message")],
+            {"deleted": 1, "changed": 1},
+        )
+
+        # the fixed battle was uploaded and its error removed, the others hold the new error
+        self.assertEqual(
+            self.get_errors(),
+            {
+                "gen9ou-broken-1": "'log'",
+                "gen9ou-broken-2": "'log'",
+                "gen9ou-broken-3": "'log'",
+            },
+        )
+        with self.engine.connect() as conn:
+            uploaded = conn.execute(select(battle_info.Battle_ID)).scalars().all()
+        self.assertEqual(uploaded, ["gen9ou-fixed"])
+
+    def test_retry_signature(self):
+        report = self.get_retrier().retry(function="get_source", message="old message")
+        self.assertEqual(report["deleted"], 1)
+        self.assertEqual(report["changed"], 1)
+        self.assertEqual(report["unchanged"], 0)
+        # errors with other signatures were not touched
+        self.assertEqual(self.get_errors()["gen9ou-broken-3"], "another message")
+
+
+if __name__ == "__main__":
+    unittest.main()
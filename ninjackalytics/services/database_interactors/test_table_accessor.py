@@ -19,6 +19,7 @@ from ninjackalytics.services.battle_parsing.battle_data.battle_pokemon import (
     BattlePokemon,
 )
 from ninjackalytics.services.database_interactors.table_accessor import TableAccessor
+from ninjackalytics.database.models import errors
 
 
 class testTableAccessor(unittest.TestCase):
@@ -98,3 +99,37 @@ class testTableAccessor(unittest.TestCase):
         # the others prove the conditional queries are working so all is
         # fine right now. Assume same behavior applies to get_pivots
         self.assertTrue(True)
+
+    def test_get_unseen_battle_ids(self):
+        battle_id = self.battle_parser.general_info["Battle_ID"]
+        candidates = ["gen9ou-1", battle_id, "gen9ou-2", "gen9ou-1"]
+        self.assertEqual(
+            self.ta.get_unseen_battle_ids(candidates), ["gen9ou-1", "gen9ou-2"]
+        )
+        # chunking does not change the result
+        self.assertEqual(
+            self.ta.get_unseen_battle_ids(candidates, chunk_size=1),
+            ["gen9ou-1", "gen9ou-2"],
+        )
+        self.assertEqual(self.ta.get_unseen_battle_ids([]), [])
+
+    def test_get_unseen_battle_urls(self):
+        battle_id = self.battle_parser.general_info["Battle_ID"]
+        uploaded_url = f"https://replay.pokemonshowdown.com/{battle_id}"
+        error_url = "https://replay.pokemonshowdown.com/gen9ou-404"
+        new_url = "https://replay.pokemonshowdown.com/gen9ou-1"
+
+        BattleDataUploader().upload_error(error_url, "error", "traceback", "function")
+        try:
+            for chunk_size in [1, 500]:
+                self.assertEqual(
+                    self.ta.get_unseen_battle_urls(
+                        [uploaded_url, new_url, error_url, new_url],
+                        chunk_size=chunk_size,
+                    ),
+                    [new_url],
+                )
+        finally:
+            with get_sessionlocal() as session:
+                session.query(errors).filter(errors.Battle_URL == error_url).delete()
+                session.commit()
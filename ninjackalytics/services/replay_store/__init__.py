@@ -0,0 +1 @@
+from .replay_store import ReplayStore
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterator, Optional
+
+
+# default location of the store, used when the active config does not set REPLAY_STORE_DIR
+DEFAULT_STORE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "replay_store")
+)
+
+
+def get_default_store_dir() -> str:
+    # imported here so the store can be used without a database config (e.g. in parse workers)
+    try:
+        from ninjackalytics.database.database import config
+    except ImportError:
+        return DEFAULT_STORE_DIR
+    return getattr(config, "REPLAY_STORE_DIR", DEFAULT_STORE_DIR)
+
+
+class ReplayStore:
+    """
+    Local, content-addressed store of raw replay json so battles can be reparsed or retried without
+    downloading them again.
+
+    Every replay is stored once, gzip compressed, under the sha256 of its canonical json:
+
+        objects/<hash[:2]>/<hash[2:]>.json.gz
+
+    and each Battle_ID points at its current replay through a small ref file:
+
+        refs/<sha256(battle_id)[:2]>/<battle_id>
+
+    Both directories are sharded on two hex characters to keep directory sizes small. Files are
+    written to a temporary name and renamed into place, so concurrent writers (fetch threads or
+    processes) never expose partial files.
+
+    Parameters
+    ----------
+    root : str
+        Directory of the store, defaults to the config's REPLAY_STORE_DIR
+    compresslevel : int
+        gzip compression level used for new replays
+    """
+
+    def __init__(self, root: Optional[str] = None, compresslevel: int = 6):
+        self.root = root if root is not None else get_default_store_dir()
+        self.compresslevel = compresslevel
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.refs_dir = os.path.join(self.root, "refs")
+
+    # ----------------- paths -----------------
+    def _object_path(self, content_hash: str) -> str:
+        return os.path.join(
+            self.objects_dir, content_hash[:2], f"{content_hash[2:]}.json.gz"
+        )
+
+    def _ref_path(self, battle_id: str) -> str:
+        if not battle_id or "/" in battle_id or battle_id.startswith("."):
+            raise ValueError(f"Invalid battle id: {battle_id!r}")
+        shard = hashlib.sha256(battle_id.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(self.refs_dir, shard, battle_id)
+
+    def _write_atomic(self, path: str, content: bytes) -> None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    # ----------------- api -----------------
+    def put(self, replay: dict) -> str:
+        """
+        Stores a replay and points its Battle_ID (replay["id"]) at it.
+
+        Parameters
+        ----------
+        replay : dict
+            The replay json as returned by showdown
+
+        Returns
+        -------
+        str
+            The content hash of the replay
+        """
+        content = json.dumps(replay, sort_keys=True, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        object_path = self._object_path(content_hash)
+        if not os.path.exists(object_path):
+            # mtime=0 keeps the compressed bytes identical for identical replays
+            self._write_atomic(
+                object_path,
+                gzip.compress(content, compresslevel=self.compresslevel, mtime=0),
+            )
+        self._write_atomic(
+            self._ref_path(replay["id"]), content_hash.encode("ascii")
+        )
+        return content_hash
+
+    def get_hash(self, battle_id: str) -> str:
+        """
+        Returns the content hash a Battle_ID points at.
+
+        Raises
+        ------
+        KeyError
+            If the battle is not in the store
+        """
+        try:
+            with open(self._ref_path(battle_id), "rb") as f:
+                return f.read().decode("ascii")
+        except FileNotFoundError:
+            raise KeyError(battle_id)
+
+    def get(self, battle_id: str) -> dict:
+        """
+        Returns the stored replay json of a battle.
+
+        Raises
+        ------
+        KeyError
+            If the battle is not in the store
+        """
+        content_hash = self.get_hash(battle_id)
+        with open(self._object_path(content_hash), "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def __contains__(self, battle_id: str) -> bool:
+        try:
+            return os.path.exists(self._ref_path(battle_id))
+        except ValueError:
+            return False
+
+    def battle_ids(self) -> Iterator[str]:
+        """
+        Yields the Battle_ID of every stored replay, in no particular order.
+        """
+        if not os.path.isdir(self.refs_dir):
+            return
+        for shard in os.listdir(self.refs_dir):
+            for battle_id in os.listdir(os.path.join(self.refs_dir, shard)):
+                if not battle_id.startswith(".tmp-"):
+                    yield battle_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.battle_ids())
@@ -0,0 +1,94 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from ninjackalytics.services.replay_store import ReplayStore
+from ninjackalytics.services.battle_parsing import Battle
+from ninjackalytics.test_utilities.preppared_battle_objects.battle_vars import (
+    log,
+    b_id,
+    b_format,
+)
+
+
+class TestReplayStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = ReplayStore(self.root)
+        self.replay = {"id": b_id, "format": b_format, "log": log}
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def count_objects(self) -> int:
+        return sum(
+            len(files) for _, _, files in os.walk(os.path.join(self.root, "objects"))
+        )
+
+    def test_put_get(self):
+        content_hash = self.store.put(self.replay)
+        self.assertEqual(self.store.get(b_id), self.replay)
+        self.assertEqual(self.store.get_hash(b_id), content_hash)
+        self.assertIn(b_id, self.store)
+        self.assertNotIn("gen9ou-1", self.store)
+        with self.assertRaises(KeyError):
+            self.store.get("gen9ou-1")
+
+    def test_compressed(self):
+        content_hash = self.store.put(self.replay)
+        path = self.store._object_path(content_hash)
+        self.assertTrue(path.startswith(os.path.join(self.root, "objects", content_hash[:2])))
+        with open(path, "rb") as f:
+            compressed = f.read()
+        self.assertLess(len(compressed), len(log) / 2)
+        self.assertIn(b_id.encode(), gzip.decompress(compressed))
+
+    def test_content_addressed(self):
+        # the same replay is stored once, whatever its key order
+        self.store.put(self.replay)
+        self.store.put(dict(reversed(list(self.replay.items()))))
+        self.assertEqual(self.count_objects(), 1)
+
+        # a changed replay is a new object and the battle points at it
+        changed = dict(self.replay, log=log + "\n|win|massivesket")
+        self.store.put(changed)
+        self.assertEqual(self.count_objects(), 2)
+        self.assertEqual(self.store.get(b_id), changed)
+
+    def test_battle_ids(self):
+        for i in range(20):
+            self.store.put(dict(self.replay, id=f"gen9ou-{i}"))
+        self.assertEqual(
+            sorted(self.store.battle_ids()), sorted(f"gen9ou-{i}" for i in range(20))
+        )
+        self.assertEqual(len(self.store), 20)
+        self.assertEqual(len(ReplayStore(os.path.join(self.root, "empty"))), 0)
+
+    def test_concurrent_puts(self):
+        replays = [dict(self.replay, id=f"gen9ou-{i % 5}") for i in range(50)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self.store.put, replays))
+        self.assertEqual(len(self.store), 5)
+        for i in range(5):
+            self.assertEqual(self.store.get(f"gen9ou-{i}")["id"], f"gen9ou-{i}")
+
+    def test_invalid_battle_id(self):
+        with self.assertRaises(ValueError):
+            self.store.put(dict(self.replay, id="../escape"))
+        self.assertNotIn("../escape", self.store)
+
+    def test_battle_from_store(self):
+        self.store.put(self.replay)
+        battle = Battle.from_store(b_id, store=self.store)
+        self.assertEqual(battle.get_id(), b_id)
+        self.assertEqual(battle.get_format(), b_format)
+        self.assertEqual(battle.get_log(), log)
+        with self.assertRaises(KeyError):
+            Battle.from_store("gen9ou-1", store=self.store)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,9 @@ from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules.turn
 from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules.line import (
     Line,
 )
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules.event import (
+    tokenize_turns,
+)
 from .battle_vars import log, b_id, b_format
 
 
@@ -47,6 +50,7 @@ class TestResponse:
             ]
         except:
             self.turns = []
+        self.events = tokenize_turns(self.turns)
 
     @property
     def battle_id(self) -> str:
@@ -145,6 +149,17 @@ class TestBattle:
         """
         return self.response.turns
 
+    def get_events(self) -> list:
+        """
+        Get the tokenized event stream of the battle.
+
+        Returns:
+        --------
+        List[Event]:
+            One event per Line, in the order they occur in the battle.
+        """
+        return self.response.events
+
     def get_id(self) -> str:
         """
         Get the battle ID.
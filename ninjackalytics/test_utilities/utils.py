@@ -1,3 +1,10 @@
+from typing import Tuple
+
+from ninjackalytics.services.battle_parsing.battle_data.battle.sub_modules import (
+    tokenize_turns,
+)
+
+
 class MockBattlePokemon:
     def __init__(self):
         self.mon_hps = {}
@@ -30,10 +37,23 @@ class MockBattlePokemon:
         return self.mon_hps[raw_name]
 
 
+class MockLine:
+    def __init__(self, number: int, text: str):
+        self.number = number
+        self.text = text
+
+
 class MockTurn:
     def __init__(self, number: int, text: str):
         self.number = number
         self.text = strip_leading_spaces(text)
+        self.lines = [
+            MockLine(line_num, line_str)
+            for line_num, line_str in enumerate(self.text.split("\n"), start=1)
+        ]
+
+    def source_range(self) -> Tuple[str, int, int]:
+        return self.text, 0, len(self.text)
 
 
 class MockBattle:
@@ -45,6 +65,9 @@ class MockBattle:
     def get_turns(self) -> list:
         return self.turns
 
+    def get_events(self) -> list:
+        return tokenize_turns(self.turns)
+
     def get_log(self) -> str:
         return self.log
 